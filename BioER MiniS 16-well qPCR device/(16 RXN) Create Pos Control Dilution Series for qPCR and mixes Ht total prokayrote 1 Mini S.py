@@ -1,5 +1,6 @@
 from opentrons import protocol_api
 from opentrons.commands.commands import dispense, drop_tip
+from otlib.mixing import adaptive_mix
 
 # metadata
 metadata = {
@@ -77,9 +78,7 @@ def run(protocol: protocol_api.ProtocolContext):
     for i in range(len(std_wells)-1): 
         h_mix = 20
         p300.pick_up_tip()
-        p300.mix(2, 200, std_wells[i].bottom(8)) # mix low
-        p300.mix(2, 200, std_wells[i].bottom(14)) # mix mid
-        p300.mix(5, 200, std_wells[i].bottom(h_mix)) #mix hi
+        adaptive_mix(p300, std_wells[i], '1.5ml', 1000) # 900ul water + 100ul carried over
         p300.aspirate(100, std_wells[i].bottom(h_mix), rate=0.4)
         p300.touch_tip()
         p300.dispense(100, std_wells[i+1].bottom(14)) # better mixing with mid dispense
@@ -87,9 +86,7 @@ def run(protocol: protocol_api.ProtocolContext):
         p300.drop_tip()
         if i==len(std_wells)-2: # last tube
             p300.pick_up_tip()
-            p300.mix(2, 200, std_wells[i+1].bottom(8)) # mix low
-            p300.mix(2, 200, std_wells[i+1].bottom(14)) # mix mid
-            p300.mix(5, 200, std_wells[i+1].bottom(h_mix)) #mix hi
+            adaptive_mix(p300, std_wells[i+1], '1.5ml', 1000) # 900ul water + 100ul carried over
             p300.blow_out(std_wells[i+1].bottom(h_mix))# blow out just below the surface
     p300.drop_tip()
 
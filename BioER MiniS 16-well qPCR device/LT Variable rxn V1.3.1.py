@@ -1,6 +1,8 @@
 from operator import countOf
 from opentrons import protocol_api
 from opentrons.commands.commands import dispense, drop_tip
+from otlib.clearance import Clearance
+from otlib.touchtip import TouchTipPolicy
 
 # metadata
 metadata = {
@@ -79,6 +81,11 @@ def run(protocol: protocol_api.ProtocolContext):
     p300 = protocol.load_instrument(
         'p300_single_gen2', 'left', tip_racks=[tiprack300]
     )
+    # arcs over the open strip tube caps on its own; no bottom(40) hop before each dispense
+    p300 = Clearance(protocol, caps={'8wstriptubesonfilterracks_96_aluminumblock_250ul': 10}).guard(p300)
+    # touch at the source and after the last dispense of each aspiration, not after every well
+    touch = TouchTipPolicy('last_dispense')
+    p300 = touch.guard(p300)
     # p20 = protocol.load_instrument(
     #     'p20_single_gen2', 'right', tip_racks=[tiprack20]
     # )
@@ -187,7 +194,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(int(vol/2), water.bottom(waterH[5*i+h]))
             p300.touch_tip()
             for col in cols[int(rxn_coeff/2):int(rxn_coeff)]:
-                p300.move_to(holder_1[row + str(col)].bottom(40))
                 p300.dispense(20, holder_1[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_1[row + str(col)].top())
@@ -202,7 +208,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(int(vol/2), std_conc[count])
             p300.touch_tip()
             for col in cols[int(rxn_coeff/2):int(rxn_coeff)]:
-                p300.move_to(holder_1[row + str(col)].bottom(40))
                 p300.dispense(20, holder_1[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_1[row + str(col)].top())
@@ -218,7 +223,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(vol, std_conc[count])
             p300.touch_tip()
             for col in cols[:rxn_coeff]:
-                p300.move_to(holder_1[row + str(col)].bottom(40))
                 p300.dispense(20, holder_1[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_1[row + str(col)].top())
@@ -234,7 +238,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(int(vol/2), std_conc[count])
             p300.touch_tip()
             for col in cols[:int(rxn_coeff/2)]:
-                p300.move_to(holder_1[row + str(col)].bottom(40))
                 p300.dispense(20, holder_1[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_1[row + str(col)].top())
@@ -253,7 +256,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(int(vol/2), water.bottom(waterH[5*i+h]))
             p300.touch_tip()
             for col in cols[int(rxn_coeff/2):int(rxn_coeff)]:
-                p300.move_to(holder_1[row + str(col)].bottom(40))
                 p300.dispense(20, holder_1[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_1[row + str(col)].top())
@@ -268,7 +270,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(int(vol/2), std_conc[count])
             p300.touch_tip()
             for col in cols[int(rxn_coeff/2):int(rxn_coeff)]:
-                p300.move_to(holder_1[row + str(col)].bottom(40))
                 p300.dispense(20, holder_1[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_1[row + str(col)].top())
@@ -284,7 +285,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(vol, std_conc[count])
             p300.touch_tip()
             for col in cols[:rxn_coeff]:
-                p300.move_to(holder_1[row + str(col)].bottom(40))
                 p300.dispense(20, holder_1[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_1[row + str(col)].top())
@@ -300,7 +300,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(int(vol/2), std_conc[count])
             p300.touch_tip()
             for col in cols[:int(rxn_coeff/2)]:
-                p300.move_to(holder_1[row + str(col)].bottom(40))
                 p300.dispense(20, holder_1[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_1[row + str(col)].top())
@@ -319,7 +318,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(int(vol/2), water.bottom(waterH[5*i+h]))
             p300.touch_tip()
             for col in cols[int(rxn_coeff/2):int(rxn_coeff)]:
-                p300.move_to(holder_2[row + str(col)].bottom(40))
                 p300.dispense(20, holder_2[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_2[row + str(col)].top())
@@ -334,7 +332,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(int(vol/2), std_conc[count])
             p300.touch_tip()
             for col in cols[int(rxn_coeff/2):int(rxn_coeff)]:
-                p300.move_to(holder_2[row + str(col)].bottom(40))
                 p300.dispense(20, holder_2[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_2[row + str(col)].top())
@@ -350,7 +347,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(vol, std_conc[count])
             p300.touch_tip()
             for col in cols[:rxn_coeff]:
-                p300.move_to(holder_2[row + str(col)].bottom(40))
                 p300.dispense(20, holder_2[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_2[row + str(col)].top())
@@ -366,7 +362,6 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.aspirate(int(vol/2), std_conc[count])
             p300.touch_tip()
             for col in cols[:int(rxn_coeff/2)]:
-                p300.move_to(holder_2[row + str(col)].bottom(40))
                 p300.dispense(20, holder_2[row + str(col)].bottom(6), rate=0.75)
                 p300.touch_tip()
                 p300.move_to(holder_2[row + str(col)].top())
@@ -376,4 +371,5 @@ def run(protocol: protocol_api.ProtocolContext):
             count += 1 
     
     
-  
\ No newline at end of file
+  
+    protocol.comment(touch.summary())
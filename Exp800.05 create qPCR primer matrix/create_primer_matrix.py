@@ -1,5 +1,10 @@
 # imports
 from opentrons import protocol_api
+from otlib.log import get_log
+from otlib.matrix import PrimerMatrix
+from otlib.temperature import TempSchedule
+from otlib.trace import trace
+from otlib.volumes import plan_transfer
 
 # metadata
 metadata = {
@@ -37,22 +42,9 @@ def tip_heights(init_vol, steps, vol_dec):
             heights.append(round(h, 1))
     return heights
 
-# splits aspiration volume into equal parts 
-def split_asp(tot, max_vol):
-    n =1
-    if tot/n > max_vol: # if total greater than max
-       while tot/n > max_vol: # increment n until some tot/n < max_vol
-            n+=1
-            if tot/n == max_vol: # if tot evently divided e.g. 1000
-                subvol = tot/n
-                return [subvol]*n
-            if tot/(n+1) < max_vol: # if tot <> evenly divided e.g. 417.3
-                subvol = tot/(n+1)
-                return [subvol]*(n+1) # return # aspiration steps
-    else: # if total less than max
-        return [tot/n]
-
 def run(protocol: protocol_api.ProtocolContext):
+    tracer = trace(protocol) # command timings when OTLIB_TRACE is set, see otlib.trace
+    log = get_log('primer matrix') # OTLIB_LOG=debug for all mix volumes
 
     # LABWARE
     fuge_rack = protocol.load_labware('vwr_24_tuberack_1500ul', '1')
@@ -70,6 +62,11 @@ def run(protocol: protocol_api.ProtocolContext):
     p20 = protocol.load_instrument(
         'p20_single_gen2', 'right', tip_racks=[tiprack20]
     )
+    # start chilling the plate now; reagent prep runs during the ramp and
+    # chill.wait() before the first plate-bound draw waits for 4C
+    chill = TempSchedule(tempdeck, 4).start()
+    p300 = chill.guard(p300)
+    p20 = chill.guard(p20)
      
     # REAGENTS
     # sds_rack
@@ -127,29 +124,14 @@ def run(protocol: protocol_api.ProtocolContext):
     std_F_conc = 300 # What is the constant F primer concentration for standards? This should be guess or from literature. (in nM)
     std_R_cond = 300 # What is the constant R primer concentration for standards? This should be guess or from literature. (in nM)
     P_conc = 300 # What is the probe concentration? This should be constant throughout experiment.
-    tot_stds = 21 # How many wells of standards will be run? (in # wells)
-    tot_NTCs = 3 # How many wells of NTCs will be run? (in # wells)
-    tot_samp = 72 # How many samples with varying conditions will be run? (in # wells)
+    std_levels = 7 # How many standards (std_1..std_7)? Each runs std_NTC_reps wells, plus std_NTC_reps NTC wells. (int)
     rxn_base = 11.2 # Everything in PCR buffer (Mg2+, dNTPs, polymerase, enhancers, stabilizers, sugars, etc.). (in uL)
     tot_rxn_vol = 20 # What is total volume of PCR reaction in plate/tube? (in ul)
-    # F_concs = [50, 100, 200, 400, 600, 800] # What are the F primer concentrations? (a list in nM)
-    # R_concs = [50, 100, 200, 400, 600, 800] # What are the R primer concentrations? (a list in nM)
-    F_50 = 50 # F primer at lowest concentration. (in nM)
-    F_100 = 100 # F primer at concentration. (in nM)
-    F_200 = 200 # F primer at concentration. (in nM)
-    F_400 = 400 # F primer at concentration. (in nM)
-    F_600 = 600 # F primer at concentration. (in nM)
-    F_800 = 800 # F primer at highest concentration. (in nM)
-    R_50 = 50 # R primer at lowest concentration. (in nM)
-    R_100 = 100 # R primer at concentration. (in nM)
-    R_200 = 200 # R primer at concentration. (in nM)
-    R_400 = 400 # R primer at concentration. (in nM)
-    R_600 = 600 # R primer at concentration. (in nM)
-    R_800 = 800 # R primer at highest concentration. (in nM)
+    F_concs = [50, 100, 200, 400, 600, 800] # What are the F primer concentrations? (a list in nM)
+    R_concs = [50, 100, 200, 400, 600, 800] # What are the R primer concentrations? (a list in nM)
     dna_per_rxn = 2 # How much standard, positive control or NTC to add per well. 
     std_NTC_reps = 3 # How many standard and NTC replicates? (int)
-    R_reps = 12 # How many wells will use R primer at particular concentration? (int)
-    # F_reps = 12 # How many wells will use F primer at particular concentration? (int)
+    cell_reps = 2 # How many adjacent wells per F, R combination? (int)
     F_int_vol = 100 # What is the volume of F intermediate primer in new tube? (in ul)
     percent_waste =  0.20 # What percentage waste? (decimal)
     sN_mix_waste_offset = 0.025  # How much percent_waste offset should sN_mix use? This calculated as percent_waste-sN_mix_overage = percent_waste for sN_mix_overage e.g. (20-7=13%) Should not be 0 otherwise offset = percent_waste. (decimal)
@@ -158,137 +140,76 @@ def run(protocol: protocol_api.ProtocolContext):
     bpw_waste_offset = 0.032 # How much percent_waste offset should bpw_waste use? (decimal)
     p300_max_vol = 200
 
+    # the command section below is hand-tuned for this one shape (plate rows A-F,
+    # std_wells, fwd_1..6/R_mix_1..6, 2 wells per cell); pipette other shapes
+    # with otlib.matrix.run_plan(m.transfers(), ...)
+    shape = (len(F_concs), len(R_concs), cell_reps, std_levels, std_NTC_reps)
+    if shape != (6, 6, 2, 7, 3):
+        raise ValueError('this script only supports 6 F x 6 R concs, cell_reps=2, 7 stds x 3 reps; '
+            'got {0} F x {1} R, cell_reps={2}, {3} stds x {4} reps. For any other single-assay '
+            'shape that fits a plate (R concs <= 8 rows, F concs x cell_reps <= 12 columns, '
+            'stds and NTCs in the wells left) use otlib.matrix.run_plan'.format(*shape))
 
-    # calcs
-    tot_rxns = tot_stds+tot_NTCs+tot_samp # Calc what is total # rxns. (int)
-    tot_sds_NTC = tot_stds+tot_NTCs # Calc number of standards and nontemplate controls. (int)
-    rxn_vol_no_dna = tot_rxn_vol-dna_per_rxn # Calc what is volume of PCR rxn with no DNA added. (in ul)
-    P_per_rxn = P_conc/1000*tot_rxn_vol/orig_P_conc # Calc this constant probe is needed per pcr reaction. (in ul)
-    max_vol_F_per_rxn = F_800/1000*tot_rxn_vol/orig_F_conc # Calc greatest vol added from starting F primer conc to rxn to satisfy max test F conc? (in ul)
-    max_vol_R_per_rxn = R_800/1000*tot_rxn_vol/orig_R_conc # Calc greatest vol added from starting R primer conc to rxn to satisfy max test R conc? (in ul)
-    water_per_rxn =  rxn_vol_no_dna-rxn_base-P_per_rxn-max_vol_F_per_rxn-max_vol_R_per_rxn # Calc this is water added per rxn such that greatest F, R primer conc can be accommodated in total rxn vol. (in ul)
-    std_vol_F_per_rxn =  std_F_conc/1000*tot_rxn_vol/orig_F_conc# Calc adding this much F primer to each std rxn
-    std_vol_R_per_rxn =  std_R_cond/1000*tot_rxn_vol/orig_R_conc# Calc adding this much F primer to each std rxn
-    BPW_rxn =  rxn_base+P_per_rxn+water_per_rxn# Mix base + probe + water (no DNA, F, R primer). (in ul)
-    std_woff_per_sN_rxn =  max_vol_F_per_rxn-std_vol_F_per_rxn+max_vol_R_per_rxn-std_vol_R_per_rxn# Calc how much water to add to offset diff in max vol F,R primer per reaction. (Max-Std)*2 (in ul)
-    BPW_sN_rxn =  BPW_rxn+std_vol_F_per_rxn+std_vol_R_per_rxn+std_woff_per_sN_rxn# Mix base + probe + water+F,R primer at std conc+water_offset(no DNA). (in ul)
-    BWP_mix_xfer_sN_mix = tot_sds_NTC*(1+percent_waste-sN_mix_waste_offset)*BPW_rxn # Calc how much tot_BPW_mix to move to make new tube for stds and NTC. (in ul)
-    std_woff_add_to_sN_mix = std_woff_per_sN_rxn*tot_sds_NTC*(1+percent_waste-sN_mix_waste_offset) # Calc how much water to add to sdd_NTC mmix with waste
-    F_add_to_sN_mix = tot_sds_NTC*(1+percent_waste-sN_mix_waste_offset)*std_vol_F_per_rxn # Calc how much F primer to add to std_NTC mmix with waste
-    R_add_to_sN_mix =  tot_sds_NTC*(1+percent_waste-sN_mix_waste_offset)*std_vol_R_per_rxn# Calc how much R primer to add to std_NTC mmix with waste
-    sN_mix_xfer_to_stds_mix = BPW_sN_rxn*std_NTC_reps*(1+percent_waste-std_NTC_waste_offset)  # Calc how much sn_mix to aliquot to tube in preparation for std DNA mixing. (in ul)
-    std_DNA_xfer_to_stds_mix =  dna_per_rxn*std_NTC_reps*(1+percent_waste-std_NTC_waste_offset)# Calc how much DNA from each standard adding to stds_mix with waste. (in ul)
-    bpw_mix_xfer_bpwd_mix =  tot_samp*BPW_rxn*(1+percent_waste-bpw_waste_offset)# Calc how much bpw_mix needed in new tube for # total samples
-    std_DNA_xfer_to_bpwd_mix = dna_per_rxn*tot_samp*(1+percent_waste-bpw_waste_offset) # Calc how much DNA to add to bpw_mix for template in PCR rxns.
-    dna_per_rxn_10x = 0.2 # dna_per_rxn_10x =  # 10x concentrated DNA to add to reactions to avoid using too much std sample
-    water_per_rxn_bpwd_mix = 2-dna_per_rxn_10x# water_per_rxn_bpwd_mix =  # Water to add to bpwd mix to offset 2ul to 0.2ul DNA addition.
-    dna_XFR_bpwd_mix = tot_samp*dna_per_rxn_10x*(1+percent_waste-bpw_waste_offset) # dna_XFR_bpwd_mix =  # The amount of DNA to transfer from a std tube to the bpwd_mix
-    water_XFR_bpwd_mix = tot_samp*water_per_rxn_bpwd_mix*(1+percent_waste-bpw_waste_offset) # water_XFR_bpwd_mix =  # The amount of water to transfer to the bpwd_mix to offset lower DNA vol addition
-    bpwd_rxn = BPW_rxn+dna_per_rxn  # Calc vol of bpw reaction + DNA vol
-    bpwd_mix_xfer_R_mix = bpwd_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how muc bpwd_mix to transfer to each tube for specific R conc. Less than 12% to avoid missing vol.
-    R_50_rxn = R_50/1000*tot_rxn_vol/orig_R_conc # Calc how much R primer at lowest concentration to add per reaction? (e.g. 50nM) (in ul)
-    R_50_mix =  R_50_rxn*R_reps*(1+percent_waste-R_mix_waste_offset)# Calc how much R primer to add to R_50 mix. (in ul)
-    R_50_woff_rxn = max_vol_R_per_rxn-R_50_rxn# Calc how much water offset to add to each rxn. (in ul)
-    R_50_woff_mix = R_50_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much water offset to add to R_50 mix. (in ul)
-    R_100_rxn = R_100/1000*tot_rxn_vol/orig_R_conc # Calc how much R primer at concentration to add. (in ul)
-    R_100_mix =  R_100_rxn*R_reps*(1+percent_waste-R_mix_waste_offset)# Calc how much R primer to add to add. (in ul)
-    R_100_woff_rxn = max_vol_R_per_rxn-R_100_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_100_woff_mix =  R_100_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset)# Calc how much water offset to add to mix. (in ul)
-    R_200_rxn = R_200/1000*tot_rxn_vol/orig_R_conc  # Calc how much R primer at concentration to add. (in ul)
-    R_200_mix = R_200_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much R primer to add to add. (in ul)
-    R_200_woff_rxn = max_vol_R_per_rxn-R_200_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_200_woff_mix =  R_200_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset)# Calc how much water offset to add to mix. (in ul)
-    R_400_rxn = R_400/1000*tot_rxn_vol/orig_R_conc # Calc how much R primer at concentration to add. (in ul)
-    R_400_mix = R_400_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much R primer to add to add. (in ul)
-    R_400_woff_rxn = max_vol_R_per_rxn-R_400_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_400_woff_mix = R_400_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much water offset to add to mix. (in ul)
-    R_600_rxn =  R_600/1000*tot_rxn_vol/orig_R_conc  # Calc how much R primer at concentration to add. (in ul)
-    R_600_mix = R_600_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much R primer to add to add. (in ul)
-    R_600_woff_rxn = max_vol_R_per_rxn-R_600_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_600_woff_mix =  R_600_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much water offset to add to mix. (in ul)
-    R_800_rxn = R_800/1000*tot_rxn_vol/orig_R_conc  # Calc how much R primer at concentration to add. (in ul)
-    R_800_mix = R_800_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much R primer to add to add. (in ul)
-    R_800_woff_rxn = max_vol_R_per_rxn-R_800_rxn # Calc how much water offset to add to each rxn. (in ul)
-    R_800_woff_mix = R_800_woff_rxn*R_reps*(1+percent_waste-R_mix_waste_offset) # Calc how much water offset to add to mix. (in ul)
-    F_50_int_conc = F_50/1000*tot_rxn_vol/max_vol_F_per_rxn # What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_100_int_conc = F_100/1000*tot_rxn_vol/max_vol_F_per_rxn # What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_200_int_conc =  F_200/1000*tot_rxn_vol/max_vol_F_per_rxn# What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_400_int_conc =  F_400/1000*tot_rxn_vol/max_vol_F_per_rxn# What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_600_int_conc =  F_600/1000*tot_rxn_vol/max_vol_F_per_rxn# What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_800_int_conc =  F_800/1000*tot_rxn_vol/max_vol_F_per_rxn# What intermediate (int) concentration of F primer is needed such that by adding 1.6ul I obtain a final F primer concentration of 50, 100, 200…etc in rxn well? (in uM)
-    F_50_int_primer = F_50_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_50_int_water =  F_int_vol-F_50_int_primer# What amount of water should be added to generate int F primer conc? (in ul)
-    F_100_int_primer = F_100_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_100_int_water = F_int_vol-F_100_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    F_200_int_primer = F_200_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_200_int_water = F_int_vol-F_200_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    F_400_int_primer = F_400_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_400_int_water = F_int_vol-F_400_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    F_600_int_primer = F_600_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_600_int_water = F_int_vol-F_600_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    F_800_int_primer =  F_800_int_conc*F_int_vol/orig_F_conc # What amount of primer should be added to generate int F primer conc? (in ul)
-    F_800_int_water = F_int_vol-F_800_int_primer # What amount of water should be added to generate int F primer conc? (in ul)
-    R_mix_rxn = bpwd_rxn+R_50_rxn+R_50_woff_rxn # What is the rxn vol that should be aliquoted to plate wells after R primer addition? (in ul e.g.18.4)
-
-    # more lists
-    R_mix_primer=[R_50_mix, R_100_mix, R_200_mix, R_400_mix, R_600_mix, R_800_mix]
-    R_mix_water=[R_50_woff_mix, R_100_woff_mix, R_200_woff_mix, R_400_woff_mix, R_600_woff_mix, R_800_woff_mix]
-    F_mix_primer=[F_50_int_primer, F_100_int_primer, F_200_int_primer, F_400_int_primer, F_600_int_primer, F_800_int_primer]
-    F_mix_water=[F_50_int_water, F_100_int_water, F_200_int_water, F_400_int_water, F_600_int_water, F_800_int_water]
+    # calcs; see otlib.matrix for the formulas
+    m = PrimerMatrix(F_concs, R_concs, orig_F_conc=orig_F_conc, orig_R_conc=orig_R_conc,
+        orig_P_conc=orig_P_conc, P_conc=P_conc, std_F_conc=std_F_conc, std_R_conc=std_R_cond,
+        rxn_base=rxn_base, tot_rxn_vol=tot_rxn_vol, dna_per_rxn=dna_per_rxn, dna_per_rxn_10x=0.2,
+        cell_reps=cell_reps, std_levels=std_levels, std_NTC_reps=std_NTC_reps, F_int_vol=F_int_vol,
+        percent_waste=percent_waste,
+        waste_offsets={'sN_mix': sN_mix_waste_offset, 'R_mix': R_mix_waste_offset,
+                       'std_NTC': std_NTC_waste_offset, 'bpw': bpw_waste_offset})
+    BPW_rxn = m.BPW_rxn # Mix base + probe + water (no DNA, F, R primer). (in ul)
+    bpwd_rxn = m.bpwd_rxn # bpw reaction + DNA vol. (in ul)
+    std_vol_F_per_rxn = m.std_vol_F_per_rxn # F primer added to each std rxn. (in ul)
+    std_vol_R_per_rxn = m.std_vol_R_per_rxn # R primer added to each std rxn. (in ul)
+    std_woff_per_sN_rxn = m.std_woff_per_sN_rxn # water offsetting max-std F, R primer per rxn. (in ul)
+    BWP_mix_xfer_sN_mix = m.BWP_mix_xfer_sN_mix # BPW_mix moved to sN_mix for stds and NTC. (in ul)
+    std_woff_add_to_sN_mix = m.std_woff_add_to_sN_mix # water added to sN_mix. (in ul)
+    F_add_to_sN_mix = m.F_add_to_sN_mix # F primer added to sN_mix. (in ul)
+    R_add_to_sN_mix = m.R_add_to_sN_mix # R primer added to sN_mix. (in ul)
+    sN_mix_xfer_to_stds_mix = m.sN_mix_xfer_to_stds_mix # sN_mix aliquoted to each std_mix tube. (in ul)
+    std_DNA_xfer_to_stds_mix = m.std_DNA_xfer_to_stds_mix # std DNA added to each std_mix tube. (in ul)
+    bpw_mix_xfer_bpwd_mix = m.bpw_mix_xfer_bpwd_mix # BPW_mix moved to bpwd_mix for samples. (in ul)
+    dna_XFR_bpwd_mix = m.dna_XFR_bpwd_mix # 10x DNA added to bpwd_mix. (in ul)
+    water_XFR_bpwd_mix = m.water_XFR_bpwd_mix # water offsetting the 10x DNA. (in ul)
+    bpwd_mix_xfer_R_mix = m.bpwd_mix_xfer_R_mix # bpwd_mix moved to each R_mix tube. (in ul)
+    R_mix_rxn = m.R_mix_rxn # R_mix per plate well, before F primer. (in ul e.g. 18.4)
+    R_mix_primer = m.R_mix_primer # R primer into each R_mix tube. (list, in ul)
+    R_mix_water = m.R_mix_water # water into each R_mix tube. (list, in ul)
+    F_mix_primer = m.F_mix_primer # F primer into each F intermediate tube. (list, in ul)
+    F_mix_water = m.F_mix_water # water into each F intermediate tube. (list, in ul)
 
     # Mixes
-    BPW_mix_tot = BPW_rxn*(1+percent_waste)*tot_rxns  # Mix = base + probe + water (no DNA, F, R primer)*96*waste. (in ul)
-    sN_mix_tot = BWP_mix_xfer_sN_mix+std_woff_add_to_sN_mix+F_add_to_sN_mix+R_add_to_sN_mix # Mix = base + probe + water + F,R primers at std conc + water offset (no DNA) * number stds_NTC * waste
-    bpwd_mix_tot = bpw_mix_xfer_bpwd_mix+std_DNA_xfer_to_bpwd_mix # Mix = base + probe + DNA (no F, R primer) 
-    R_50_mix = bpwd_mix_xfer_R_mix+R_50_mix+R_50_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_100_mix = bpwd_mix_xfer_R_mix+R_100_mix+R_100_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_200_mix = bpwd_mix_xfer_R_mix+R_200_mix+R_200_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_400_mix = bpwd_mix_xfer_R_mix+R_400_mix+R_400_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_600_mix = bpwd_mix_xfer_R_mix+R_600_mix+R_600_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
-    R_800_mix = bpwd_mix_xfer_R_mix+R_800_mix+R_800_woff_mix # Mix = base + probe + DNA+ R primer (No F primer)
+    BPW_mix_tot = m.BPW_mix_tot # Mix = base + probe + water (no DNA, F, R primer)*96*waste. (in ul)
+    sN_mix_tot = m.sN_mix_tot # Mix = base + probe + water + F,R primers at std conc + water offset (no DNA) * number stds_NTC * waste
+    bpwd_mix_tot = m.bpwd_mix_tot # Mix = base + probe + DNA (no F, R primer)
     
-    print ("BWP_mix_xfer_sN_mix", BWP_mix_xfer_sN_mix)
-    print ("bpw_mix_xfer_bpwd_mix", bpw_mix_xfer_bpwd_mix)
-    print("BWP_mix_xfer_sN_mix", BWP_mix_xfer_sN_mix)
-    print("F_add_to_sN_mix", F_add_to_sN_mix)
-    print("R_add_to_sN_mix", R_add_to_sN_mix)
-    print("std_woff_add_to_sN_mix", std_woff_add_to_sN_mix)
-    print("std_woff_per_sN_rxn", std_woff_per_sN_rxn)
-    print("tot_rxn_vol", tot_rxn_vol)
-    print("BPW_rxn", BPW_rxn)
-    print("BPW_mix_tot", BPW_mix_tot)
-    print("std_vol_F_per_rxn", std_vol_F_per_rxn)
-    print("std_vol_R_per_rxn", std_vol_R_per_rxn)
-    print("sN_mix_tot", sN_mix_tot)
-    print("sN_mix_xfer_to_stds_mix", sN_mix_xfer_to_stds_mix)
-    print("std_DNA_xfer_to_stds_mix", std_DNA_xfer_to_stds_mix)
-    print("bpw_mix_xfer_bpwd_mix", bpw_mix_xfer_bpwd_mix)
-    # print(split_asp(BWP_mix_xfer_sN_mix, p300_max_vol))
-    # print(split_asp(bpw_mix_xfer_bpwd_mix, p300_max_vol))
-    print("dna_XFR_bpwd_mix", dna_XFR_bpwd_mix)
-    print("bpwd_mix_tot", bpwd_mix_tot)
-    print("bpw_mix_xfer_bpwd_mix", bpw_mix_xfer_bpwd_mix)
-    print("bpwd_mix_tot", bpwd_mix_tot)
-    print("*"*50)
-    print("R_mix_primer", R_mix_primer)
-    print("R_mix_water", R_mix_water)
-    print("bpwd_mix_xfer_R_mix", bpwd_mix_xfer_R_mix)
-    print("bpwd_rxn", bpwd_rxn)
-    print("R_mix_rxn", R_mix_rxn)
-    print("F_mix_primer", F_mix_primer)
-    print("F_mix_water", F_mix_water)
+    # aspirations for the two large BPW_mix moves; computed once, used in the loops below
+    sN_plan = plan_transfer(BWP_mix_xfer_sN_mix, p300, max_vols=[p300_max_vol])
+    bpwd_plan = plan_transfer(bpw_mix_xfer_bpwd_mix, p300, max_vols=[p300_max_vol])
+    log.info('mixes', BPW_mix_tot=BPW_mix_tot, sN_mix_tot=sN_mix_tot, bpwd_mix_tot=bpwd_mix_tot,
+        sN_plan=lambda: '{0}x{1:.1f}'.format(sN_plan.n, sN_plan.part),
+        bpwd_plan=lambda: '{0}x{1:.1f}'.format(bpwd_plan.n, bpwd_plan.part))
+    log.debug('sN_mix', BWP_mix_xfer_sN_mix=BWP_mix_xfer_sN_mix, F_add_to_sN_mix=F_add_to_sN_mix,
+        R_add_to_sN_mix=R_add_to_sN_mix, std_woff_add_to_sN_mix=std_woff_add_to_sN_mix,
+        std_woff_per_sN_rxn=std_woff_per_sN_rxn, tot_rxn_vol=tot_rxn_vol, BPW_rxn=BPW_rxn,
+        std_vol_F_per_rxn=std_vol_F_per_rxn, std_vol_R_per_rxn=std_vol_R_per_rxn,
+        sN_mix_xfer_to_stds_mix=sN_mix_xfer_to_stds_mix, std_DNA_xfer_to_stds_mix=std_DNA_xfer_to_stds_mix)
+    log.debug('bpwd_mix', bpw_mix_xfer_bpwd_mix=bpw_mix_xfer_bpwd_mix, dna_XFR_bpwd_mix=dna_XFR_bpwd_mix)
+    log.debug('R/F mixes', R_mix_primer=R_mix_primer, R_mix_water=R_mix_water,
+        bpwd_mix_xfer_R_mix=bpwd_mix_xfer_R_mix, bpwd_rxn=bpwd_rxn, R_mix_rxn=R_mix_rxn,
+        F_mix_primer=F_mix_primer, F_mix_water=F_mix_water)
    
    
     # ##### COMMANDS ######
     # prepare sN_mix
     # add BPW_mix to sN_mix tube
     p300.pick_up_tip()
-    bpw_heights = tip_heights(BPW_mix_tot, len(split_asp(BWP_mix_xfer_sN_mix, p300_max_vol)), split_asp(BWP_mix_xfer_sN_mix, p300_max_vol)[0])
+    bpw_heights = tip_heights(BPW_mix_tot, sN_plan.n, sN_plan.part)
     p300.mix(3, 200, BPW_mix.bottom(bpw_heights[0]))
     # p300.flow_rate.aspirate = 40 #default
     # p300.flow_rate.dispense = 40 #default
-    for j in range(len(split_asp(BWP_mix_xfer_sN_mix, p300_max_vol))):
-        amt = split_asp(BWP_mix_xfer_sN_mix, p300_max_vol)[j]
+    for j, amt in enumerate(sN_plan.parts):
         p300.aspirate(amt, BPW_mix.bottom(bpw_heights[j]), rate=0.4)
         protocol.delay(seconds=1) #equilibrate
         h = tip_heights(amt+amt*j, 1, 0)[0]
@@ -342,6 +263,7 @@ def run(protocol: protocol_api.ProtocolContext):
     # p300.well_bottom_clearance.aspirate = 1 #mm default
    
     # transfer std DNA into intermediate std_mixes tubes and then to plate
+    chill.wait() # plate at 4C before p20 holds 20ul for it, not during the dispense
     for std, intTube, well in zip(std_tubes, std_mixes, std_wells):
         p20.pick_up_tip()
         p300.pick_up_tip()
@@ -383,10 +305,9 @@ def run(protocol: protocol_api.ProtocolContext):
     # First, add bpw_mix to a new tube
     p300.pick_up_tip()
     # tip_heights is a function using total_vol, # steps, and aliquot (vol decrement) amt as parameters.
-    bpwd_xfer_h = tip_heights(BPW_mix_tot-BWP_mix_xfer_sN_mix, len(split_asp(bpw_mix_xfer_bpwd_mix, p300_max_vol)), split_asp(bpw_mix_xfer_bpwd_mix, p300_max_vol)[0])
+    bpwd_xfer_h = tip_heights(BPW_mix_tot-BWP_mix_xfer_sN_mix, bpwd_plan.n, bpwd_plan.part)
     p300.mix(3, 200, BPW_mix.bottom(bpwd_xfer_h[0]))
-    for j in range(len(split_asp(bpw_mix_xfer_bpwd_mix, p300_max_vol))): # split_asp is a function that returns equally divided aspirations
-        amt = split_asp(bpw_mix_xfer_bpwd_mix, p300_max_vol)[j]
+    for j, amt in enumerate(bpwd_plan.parts): # equally divided aspirations from plan_transfer
         p300.aspirate(amt, BPW_mix.bottom(bpwd_xfer_h[j]), rate=0.8)
         protocol.delay(seconds=2)
         h = tip_heights(amt+amt*j, 1, 0)[0] # adjust tip height depending on dispenses
@@ -464,7 +385,7 @@ def run(protocol: protocol_api.ProtocolContext):
                 p300.touch_tip()
         p300.drop_tip()
 
-    # now that PCR reactions are chillin' at 4C, make F_primer int tubes
+    # PCR reactions are chillin' at 4C, make F_primer int tubes
     # Mix 100ul 'Fwd' dilutions in tube by adding water and "fwd 10uM" tube as shown in schedule
     # p20.well_bottom_clearance.aspirate=2
     # p20.well_bottom_clearance.dispense=8
@@ -548,4 +469,5 @@ def run(protocol: protocol_api.ProtocolContext):
         p300.drop_tip()
         p20.drop_tip()
 
-  
\ No newline at end of file
+    if tracer:
+        tracer.close()
@@ -0,0 +1,84 @@
+# imports
+from opentrons import protocol_api
+from otlib.ledger import VolumeLedger
+from otlib.matrix import run_plan
+from otlib.temperature import TempSchedule
+from otlib.titration import Titration, full_factorial, latin_square
+
+# metadata
+metadata = {
+    'protocolName': 'F x R x P Primer/Probe Titration',
+    'author': 'Harley King <harley.king@luminultra.com>',
+    'description': 'Titrate F, R primer and probe together in one run; intermediate and mix tubes are planned once for all plates.',
+    'apiLevel': '2.11'
+}
+
+def run(protocol: protocol_api.ProtocolContext):
+
+    # user inputs
+    F_concs = [300, 400, 500] # F primer concentrations. (a list in nM)
+    R_concs = [300, 400, 500] # R primer concentrations. (a list in nM)
+    P_concs = [50, 100, 200, 300] # Probe concentrations. (a list in nM)
+    latin = False # Latin square (n*n runs, needs equal number of levels) instead of full factorial? (bool)
+    reps = 2 # How many adjacent wells per F, R, P combination? (int)
+    orig_F_conc = 10 # starting F primer concentration. (in uM)
+    orig_R_conc = 10 # starting R primer concentration. (in uM)
+    orig_P_conc = 10 # starting probe concentration. (in uM)
+    rxn_base_plus_water = 14.8 # base mix per rxn; water is topped up so every rxn is tot_rxn_vol. (in ul)
+    tot_rxn_vol = 20 # total volume of PCR reaction. (in ul)
+    dna_per_rxn = 2 # DNA per rxn, premixed into the mix tubes. (in ul)
+    percent_waste = 0.20 # (decimal)
+
+    design = latin_square if latin else full_factorial
+    t = Titration(design(F_concs, R_concs, P_concs), reps=reps,
+        stocks={'F': orig_F_conc, 'R': orig_R_conc, 'P': orig_P_conc},
+        rxn_base=rxn_base_plus_water, tot_rxn_vol=tot_rxn_vol, dna_per_rxn=dna_per_rxn,
+        percent_waste=percent_waste)
+    steps = t.transfers()
+
+    # LABWARE
+    fuge_racks = [protocol.load_labware('vwr_24_tuberack_1500ul', slot) for slot in ['1', '2']]
+    tiprack300 = protocol.load_labware('opentrons_96_filtertiprack_200ul', '8')
+    tiprack20 = [protocol.load_labware('opentrons_96_filtertiprack_20ul', slot) for slot in ['9', '6']]
+    tempdeck = protocol.load_module('tempdeck', '10')
+    plates = [tempdeck.load_labware('abi_96_wellplate_250ul')]
+    for slot in ['3', '4', '5'][:t.plates()-1]:
+        plates.append(protocol.load_labware('abi_96_wellplate_250ul', slot))
+
+    # PIPETTES
+    p300 = protocol.load_instrument(
+        'p300_single_gen2', 'left', tip_racks=[tiprack300]
+    )
+    p20 = protocol.load_instrument(
+        'p20_single_gen2', 'right', tip_racks=tiprack20
+    )
+
+    # REAGENTS
+    # stocks and base mix first, then the tubes the robot fills
+    names = sorted(t.stocks_needed()) + list(t.tubes())
+    tube_wells = [w for rack in fuge_racks for w in rack.wells()]
+    if len(names) > len(tube_wells):
+        raise ValueError('{0} tubes but only {1} rack positions'.format(len(names), len(tube_wells)))
+    tubes = dict(zip(names, tube_wells))
+    # stocks_needed() and the mix tube totals already include percent_waste
+    needed = dict(t.stocks_needed(), **{name: total for name, (_, total) in t.tubes().items()})
+    for name, vol in sorted(needed.items()):
+        if vol > tubes[name].max_volume:
+            raise ValueError('{0} needs {1:.1f}ul but {2} holds {3:.0f}ul'.format(
+                name, vol, tubes[name], tubes[name].max_volume))
+    ledger = VolumeLedger() # aspiration heights follow the level in each tube
+    for name, vol in sorted(t.stocks_needed().items()):
+        ledger.track(tubes[name], vol)
+        protocol.comment('{0}: {1} ({2:.1f}ul needed)'.format(tubes[name], name, vol))
+    for name in t.tubes():
+        protocol.comment('{0}: {1} (empty)'.format(tubes[name], name))
+
+    def resolve(endpoint):
+        if isinstance(endpoint, tuple): # plate well
+            return plates[endpoint[2]][endpoint[1]]
+        return tubes[endpoint]
+
+    # #### COMMANDS ######
+    # tube prep runs while the block ramps; the first plate-bound draw waits for 4C
+    chill = TempSchedule(tempdeck, 4).start()
+    run_plan(steps, resolve, {'p20': chill.guard(p20), 'p300': chill.guard(p300)}, ledger=ledger)
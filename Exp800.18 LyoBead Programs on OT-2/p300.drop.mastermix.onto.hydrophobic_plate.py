@@ -1,5 +1,6 @@
 # imports
 from opentrons import protocol_api
+from otlib.checkpoint import Checkpoint
 
 # metadata
 metadata = {
@@ -145,17 +146,26 @@ def run(protocol: protocol_api.ProtocolContext):
     # turn on robot rail lights
     protocol.set_rail_lights(True) # turn on lights if not on
 
+    # one step per aspiration (3 per row, 4 wells each); a restart after a
+    # fault carries on with the first unfilled set of wells
+    ckpt = Checkpoint(protocol, 'p300.drop.mastermix.onto.hydrophobic_plate', pipette=p300)
+    sets = ['{0}{1}-{0}{2}'.format(row, r*4+1, r*4+4) for row in rows for r in range(3)]
+    start = len(sets)-len(ckpt.pending(sets))
+
     p300.pick_up_tip()
     contH = 0 # how many mm above tuberack height is the container height? 110mm is max.
     # mmixH = fifty_ml_heights(17500, 20, 200) 
     mmixH = tip_heightsEpp(mmixVol, 3*8, dispVol*4) # each row goes to mix 3 times * 8 rows = 24 times
     print (mmixH)#mix volume, total steps = totalPipetteRefills in dispVol*4 pipette volume  
     # prewetting step for tip
-    p300.mix(3, 200, mmix.bottom(mmixH[4])) # need to go down a little because 200ul and don't want it to dry aspirate
+    p300.mix(3, 200, mmix.bottom(mmixH[min(start+4, len(mmixH)-1)])) # need to go down a little because 200ul and don't want it to dry aspirate
     # for i in range(int(totalPipetteRefills)):  
     i = 0 # height counter
     for row in rows: # loops through sliced or all rows on plate
         for r in range (3): # three sets of four across a row
+            if i < start: # filled before the restart
+                i+=1
+                continue
             p300.aspirate(dispVol*10, mmix.bottom(mmixH[i]))
             p300.move_to(mmix.bottom(mmixH[i]+20))
             protocol.delay(seconds=4)
@@ -175,7 +185,9 @@ def run(protocol: protocol_api.ProtocolContext):
             p300.dispense((200-9*dispVol-4*dispVol), mmix.bottom(mmixH[i]+10))
             p300.blow_out(mmix.bottom(mmixH[i]+4))
             p300.move_to(mmix.bottom(mmixH[i])) # touch tip to fluid to remove residual mmix on tubes
+            ckpt.save(sets[i])
             i+=1 # increment height counter
     p300.drop_tip()
+    ckpt.finish()
 
  
\ No newline at end of file
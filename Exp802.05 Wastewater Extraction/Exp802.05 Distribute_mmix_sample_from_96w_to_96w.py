@@ -1,5 +1,7 @@
 # imports
 from opentrons import protocol_api
+from otlib.liquids import LiquidPipette
+from otlib.multichannel import column_transfer
 
 # metadata
 metadata = {
@@ -50,6 +52,13 @@ def run(protocol: protocol_api.ProtocolContext):
     p20 = protocol.load_instrument(
         'p20_single_gen2', 'right', tip_racks=[tiprack20]
     )
+    use_multi = False # p20_multi_gen2 on the left mount for the sample columns? (bool)
+    p20m = None
+    if use_multi:
+        tiprack20m = protocol.load_labware('opentrons_96_filtertiprack_20ul', '6')
+        p20m = protocol.load_instrument(
+            'p20_multi_gen2', 'left', tip_racks=[tiprack20m]
+        )
     
     # REAGENTS   
     LU_Mix = fuge_rack['A1'] # LU MasterMix
@@ -80,19 +89,13 @@ def run(protocol: protocol_api.ProtocolContext):
             well_num += 1
     p20.drop_tip()
     # pipette well-to-well from BioER to PCR plate
-    # use same tip for tech replicates (in columns)
+    # whole columns go with the multi-channel if loaded; otherwise well by
+    # well with the same tip for tech replicates (in columns)
+    # 'dna' liquid class: slow aspirate, 2s equilibrate, touch tip, blow out at 8mm, touch tip
+    def xfer_sample(pip, source, dest):
+        pip.aspirate(5, source.bottom(1), liquid='dna')
+        pip.dispense(5, dest.bottom(1), liquid='dna')
     for x, ww_plate in enumerate(tot_ww_plates):
-        for col in range(1,13):
-            p20.pick_up_tip()
-            for row in rows:
-                source = row + str(col) #A5, B5, C5
-                dest = row + str(col) #A1, #A2, #A3
-                p20.aspirate(5, ww_plate[source].bottom(1), rate=0.75)
-                protocol.delay(seconds=2) #equilibrate
-                p20.touch_tip()
-                p20.dispense(5, pcr_plate[dest].bottom(1))
-                p20.blow_out(pcr_plate[dest].bottom(8))
-                p20.touch_tip()
-            p20.drop_tip()
-
-
+        column_transfer(ww_plate.wells(), pcr_plate.wells(), xfer_sample,
+            multi=p20m and LiquidPipette(p20m, protocol), single=LiquidPipette(p20, protocol),
+            new_tip='column')
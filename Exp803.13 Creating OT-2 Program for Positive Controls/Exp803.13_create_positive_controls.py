@@ -1,5 +1,8 @@
 # imports
 from opentrons import protocol_api
+from otlib.checkpoint import Checkpoint
+from otlib.ledger import VolumeLedger, TrackedPipette
+from otlib.log import get_log
 
 # metadata
 metadata = {
@@ -8,58 +11,6 @@ metadata = {
     'description': 'Create a 15, 50mL positive control mix and distribute to 9 racks x 24 tubes.',
     'apiLevel': '2.12'
 }
-##########################
-# functions
-# Calc heights for 50mL conical tubes
-def fifty_ml_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Exp803..."
-    b = 0
-    m = 0.0024
-    if init_vol > 51000:
-        offset = 14  # model out of range; see sheet
-    else:
-        offset = 15  # mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = m*x+b
-        h = h-offset
-        if h < 17.5:  # If less than 5mL remain in 50mL tube, go to bottom for asp
-            h = 2
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-
-   # calculates ideal tip height for entering liquid in 15mL tube
-def fifteen_ml_heights(init_vol, steps, vol_dec):
-    vols = []
-    heights = []
-    # these values originate from Excel spreadsheet "Volume.heights.in.15.0mL.conical.tube"
-    p0 = 6.52
-    p1 = 0.013
-    p2 = -2.11E-6
-    p3 = 3.02E-10
-    p4 = -1.95E-14
-    p5 = 4.65E-19
-    if init_vol > 1500:  # where tube begins to cone
-        offset = 5  # ensure tip contacts fluid
-    else:  # if in cone portion
-        offset = 5  # mm Need to add offset to ensure tip reaches below liquid level
-    for i in range(steps):
-        x = init_vol-vol_dec*i
-        vols.append(x)
-        h = p5*x**5+p4*x**4+p3*x**3+p2*x**2+p1*x**1 + p0
-        h = h-offset
-        if h < 8:  # prevent negative heights; go to bottom to avoid air aspirant above certain height
-            h = 1
-            heights.append(h)
-        else:
-            heights.append(round(h, 1))
-    return heights
-
 def run(protocol: protocol_api.ProtocolContext):
 
     # LABWARE
@@ -96,32 +47,42 @@ def run(protocol: protocol_api.ProtocolContext):
 
     # ##### COMMANDS ######
     # distribute positive controls to tubes on racks
-    h=0
-    # height = fifty_ml_heights(pos_control_begin_vol, 3*len(all_racks)*num_of_rounds, 160) #3 aspirants per rack; 9 racks; # rounds
-    height = fifteen_ml_heights(pos_control_begin_vol, 3*len(all_racks)*num_of_rounds, 160) #3 aspirants per rack; 9 racks; # rounds
-    print (height)
+    log = get_log('Exp803.13') # OTLIB_LOG=debug for refill heights
+    ledger = VolumeLedger() # tracks the pos control volume; picks aspiration heights
+    ledger.track(pos_control, pos_control_begin_vol, tube='15ml')
+    p300 = TrackedPipette(p300, ledger)
+    # a restarted run skips the tubes already filled and carries on
+    ckpt = Checkpoint(protocol, 'Exp803.13_create_positive_controls', ledger=ledger, pipette=p300)
     for r in range(1, num_of_rounds+1):
-        p300.pick_up_tip()
-        for rack in all_racks:
+        round_name = 'round {0}'.format(r)
         #p300 pipette will unorthodoxly move top to bottom instead of l to r
         #more efficient for pipetting, refill every 8 vs 12
-            for i in range(0,6): # columns
-                if i == 0 or i==2 or i==4: # refill every 8
-                    print ("height is: ", h)
-                    p300.aspirate(pos_control_vol*8, pos_control.bottom(height[h]))
-                    p300.move_to(pos_control.bottom(height[h]+20))
-                    protocol.delay(seconds=2)
-                    p300.move_to(pos_control.bottom(height[h])) # touch tip in solution
-                    h+=1
-                for j in range(0,4): # rows
-                    dest = rack[rack_rows[j] + rack_cols[i]]
+        dests = [rack[row + col] for rack in all_racks for col in rack_cols for row in rack_rows]
+        todo = ckpt.pending(dests, round_name)
+        if todo: # empty if the round finished before the restart
+            p300.pick_up_tip()
+            for k in range(0, len(dests), 8): # refill every 8
+                group = [dest for dest in dests[k:k+8] if dest in todo]
+                if not group:
+                    continue
+                h = ledger.height(pos_control)
+                log.debug('refill', h=h, ul=ledger.volume(pos_control))
+                p300.aspirate(pos_control_vol*len(group), pos_control)
+                p300.move_to(pos_control.bottom(h+20))
+                protocol.delay(seconds=2)
+                p300.move_to(pos_control.bottom(h)) # touch tip in solution
+                for dest in group:
                     p300.dispense(pos_control_vol, dest.bottom(2))  # dispense to each well
-        p300.drop_tip()
+                    ckpt.save(dest, round_name)
+            p300.drop_tip()
+        # the pause is a step too: a restart during it pauses again before the racks are reused
+        if not ckpt.pending(['pause'], round_name):
+            continue
         if r == num_of_rounds:
             protocol.pause(msg='Round {0} is complete. That was the last round!'.format(r))
             # print ("Round {0} is complete. That was the last round!".format(r))
         else:
             protocol.pause(msg='Round {0} is complete. Clear and resume to begin round {1}.'.format(r, r+1))
             # print ("Round {0} is complete. Clear and resume to begin round {1}!".format(r, r+1))
-
-
+        ckpt.save('pause', round_name)
+    ckpt.finish()
@@ -1,5 +1,8 @@
 # imports
+from itertools import islice
 from opentrons import protocol_api
+from otlib.checkpoint import Checkpoint
+from otlib.multidispense import plan_multi_dispense
 
 # metadata
 metadata = {
@@ -131,6 +134,13 @@ def run(protocol: protocol_api.ProtocolContext):
     dispVol = 20 # this is the volume dispensed into each well min = 14.5, max = 20
     mmixVol = 2208 # this is the total volume in 15mL tube. Probably listed on recipe sheet. For 14.5ul in 96w plate = 14.5*96 = *1.15= 1600.8ul; For 20ul in 96w plate = 20*96 = *1.15= 2208ul
     rows = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
+    # how many wells each 200ul aspiration can serve, keeping one dispVol to condition the tip and one in reserve
+    plan = plan_multi_dispense(200, dispVol, 96, min_dispense=14.5)
+    wells = iter(plate.wells()) # A1..H1, A2..
+    groups = [list(islice(wells, asp.wells)) for asp in plan] # wells served by each aspiration
+    # a restart after a fault carries on with the first unfilled group
+    ckpt = Checkpoint(protocol, 'p300.aliquot.mastermix.to.BioER.plate', pipette=p300)
+    start = len(groups)-len(ckpt.pending([dests[-1] for dests in groups]))
 
     
     #### COMMANDS ######
@@ -138,21 +148,20 @@ def run(protocol: protocol_api.ProtocolContext):
     protocol.set_rail_lights(True) # turn on lights if not on
 
     p300.pick_up_tip()
-    mmixH = fifteen_ml_heights(mmixVol, 12, dispVol*8) # each column gets dispensed 8x. each row goes to mix 3 times * 8 rows = 24 times
+    mmixH = fifteen_ml_heights(mmixVol, len(plan), plan[0].wells*dispVol) # one height per aspiration
     # prewetting step for tip
     print (mmixH)
-    p300.mix(2, 200, mmix.bottom(mmixH[0])) # a pre-moistened tip is more accurate. 
-    i = 0 # height counter
-    for col in range(12):# loops through sliced or all columns on plate
-        p300.aspirate(200, mmix.bottom(mmixH[i])) # could aspirate dispVol*10
+    p300.mix(2, 200, mmix.bottom(mmixH[start])) # a pre-moistened tip is more accurate. 
+    for i in range(start, len(plan)): # one aspiration per group of asp.wells wells; i is the height counter
+        asp = plan[i]
+        p300.aspirate(asp.volume, mmix.bottom(mmixH[i])) # could aspirate dispVol*10
         p300.move_to(mmix.bottom(mmixH[i]+20))
         protocol.delay(seconds=3)
-        p300.dispense(dispVol, mmix.bottom(mmixH[i]+20)) # dispense dispVol to improve volume accuracy in subsequent dispenses
+        p300.dispense(asp.condition, mmix.bottom(mmixH[i]+20)) # dispense dispVol to improve volume accuracy in subsequent dispenses
         protocol.delay(seconds=3) # tip for drops to coalesce
         p300.move_to(mmix.bottom(mmixH[i])) # touch tip to remove droplets
         p300.touch_tip(mmix, v_offset=-5, speed=20)
-        for dispNo in range(8): # how many dispenses? (200-dispVol (15.8)= 184.2/15.8 = 11 )
-            dest = plate[rows[dispNo]+str(col+1)] # destination well
+        for dest in groups[i]: # how many dispenses? (200-dispVol (15.8)= 184.2/15.8 = 11 )
             p300.move_to(dest.bottom(40)) # move to destination and pause for a few seconds to remove lateral motion
             # protocol.delay(seconds=1)
             p300.dispense(dispVol, dest.bottom(2), rate = 0.75) # want height to above parafilm, but not too high
@@ -161,10 +170,11 @@ def run(protocol: protocol_api.ProtocolContext):
             protocol.delay(seconds=1)
             p300.move_to(dest.bottom(3)) # remove excess fluid from tip
         p300.move_to(mmix.bottom(mmixH[i]+10)) # drop waste mix back into tube
-        p300.dispense((200-9*dispVol), mmix.bottom(mmixH[i]+10))
+        p300.dispense(asp.reserve, mmix.bottom(mmixH[i]+10))
         p300.blow_out(mmix.bottom(mmixH[i]+4))
         p300.move_to(mmix.bottom(mmixH[i])) # touch tip to fluid to remove residual mmix on tubes
-        i+=1 # increment height counter
+        ckpt.save(groups[i][-1])
     p300.drop_tip()
+    ckpt.finish()
 
  
\ No newline at end of file
@@ -1,5 +1,6 @@
 # imports
 from opentrons import protocol_api
+from otlib.ordering import refill_groups
 
 # metadata
 metadata = {
@@ -135,6 +136,7 @@ def run(protocol: protocol_api.ProtocolContext):
     rows = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']
     dispNumberWells = 96 # number of wells to dispense into
     dispNumberColumns =dispNumberWells//8 # number of columns to dispense into
+    dispWells = plate.wells()[:dispNumberColumns*8] # full columns, A1..H1, A2..
     
     #### COMMANDS ######
     # turn on robot rail lights
@@ -146,7 +148,7 @@ def run(protocol: protocol_api.ProtocolContext):
     print (mmixH)
     p300.mix(2, 200, mmix.bottom(mmixH[0])) # a pre-moistened tip is more accurate. 
     i = 0 # height counter
-    for col in range(dispNumberColumns):# loops through sliced or all columns on plate
+    for group in refill_groups(dispWells, mmix, 8): # 8 wells per aspiration, visited in shortest-travel order
         # aspirate and prepare tip and remove residual droplets
         p300.aspirate(200, mmix.bottom(mmixH[i]), rate=0.65) # could aspirate dispVol*10
         protocol.delay(seconds=2) #equilibrate
@@ -154,9 +156,8 @@ def run(protocol: protocol_api.ProtocolContext):
         protocol.delay(seconds=1) #equilibrate
         # p300.touch_tip(mmix, v_offset=-3, speed=60)
         p300.touch_tip(mmix, v_offset=-5, speed=20)
-        # dispense in column-wise manner
-        for dispNo in range(8): # how many dispenses? (200-dispVol (15.8)= 184.2/15.8 = 11 )
-            dest = plate[rows[dispNo]+str(col+1)] # destination well
+        # dispense to the wells in this group
+        for dest in group: # how many dispenses? (200-dispVol (15.8)= 184.2/15.8 = 11 )
             p300.move_to(dest.bottom(40)) # move to destination and pause for a few seconds to remove lateral motion
             # protocol.delay(seconds=1)
             p300.dispense(dispVol, dest.bottom(2), rate = 0.75) # want height to above parafilm, but not too high
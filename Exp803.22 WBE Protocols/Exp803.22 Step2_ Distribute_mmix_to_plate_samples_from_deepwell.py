@@ -1,5 +1,7 @@
 # imports
 from opentrons import protocol_api
+from otlib.log import get_log
+from otlib.tips import Transfer, plan_tips
 
 # metadata
 metadata = {
@@ -37,6 +39,7 @@ def tip_heights(init_vol, steps, vol_dec):
     return heights
 
 def run(protocol: protocol_api.ProtocolContext):
+    log = get_log('WBE Step2') # OTLIB_LOG=debug for per-well heights
 
     # LABWARE
     mix_rack = protocol.load_labware('opentrons_24_tuberack_eppendorf_2ml_safelock_snapcap', '11')
@@ -84,22 +87,24 @@ def run(protocol: protocol_api.ProtocolContext):
     # #### COMMANDS ######    
     # aspirate mmix to 32 wells in 96w plate; 15*32*1.2 = 578ul, 600ul
     h_list = tip_heights(600, 32, 15)
-    well_num = 1
-    p20.pick_up_tip()
-    p20.mix(2, 20, LU_Mix.bottom(h_list[0]))
-    for row in rows: #8 rows
-        for col in range(4): #12 cols
-            dest = row+str(2*col+col_offset) #A3, A5, A7, A9
-            print (h_list[well_num-1])
-            p20.aspirate(15, LU_Mix.bottom(h_list[well_num-1]), rate=0.75)
-            protocol.delay(seconds=1) #head vol for more accurate pipetting
-            p20.move_to(LU_Mix.bottom(38))
-            protocol.delay(seconds=1) #equilibrate
-            p20.touch_tip(v_offset=-4)
-            p20.dispense(15, pcr_plate[dest].bottom(1))
-            p20.blow_out(pcr_plate[dest].bottom(8))
-            p20.touch_tip()
-            well_num += 1
+    dests = [row+str(2*col+col_offset) for row in rows for col in range(4)] #A3, A5, A7, A9; 8 rows x 4 cols
+    # mmix only goes into empty wells, so plan_tips keeps one tip for all of them
+    tip_plan = plan_tips([Transfer(LU_Mix, dest, 15, 'mmix', 'p20') for dest in dests])
+    for well_num, dest in enumerate(dests, 1):
+        if tip_plan.new_tip[well_num-1]:
+            if p20.has_tip:
+                p20.drop_tip()
+            p20.pick_up_tip()
+            p20.mix(2, 20, LU_Mix.bottom(h_list[well_num-1]))
+        log.debug('mmix', well=dest, h=h_list[well_num-1])
+        p20.aspirate(15, LU_Mix.bottom(h_list[well_num-1]), rate=0.75)
+        protocol.delay(seconds=1) #head vol for more accurate pipetting
+        p20.move_to(LU_Mix.bottom(38))
+        protocol.delay(seconds=1) #equilibrate
+        p20.touch_tip(v_offset=-4)
+        p20.dispense(15, pcr_plate[dest].bottom(1))
+        p20.blow_out(pcr_plate[dest].bottom(8))
+        p20.touch_tip()
     p20.drop_tip()
 
     # pipette from 1.5mL tube containing samples from deepwell plate
@@ -0,0 +1,4 @@
+# otlib: shared helpers for the OT-2 protocols in this repo.
+# Protocols import what they need, e.g.
+#   from otlib.heights import tip_heights, fifty_ml_heights
+# The repo root has to be on the python path (see README).
@@ -0,0 +1,105 @@
+# Simulate many protocols at once.
+#
+#   python -m otlib.batch                      # every protocol in the repo
+#   python -m otlib.batch "Exp803.22 WBE Protocols" -j 8
+#   python -m otlib.batch --json results.json
+#
+# Each worker process imports opentrons and reads Labware/*/*.json once,
+# then simulates protocols back to back. Prints pass/fail, command count
+# and wall time per protocol.
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+from otlib import sim
+
+_timeout = 0
+
+
+def _init(root, timeout):
+    global _timeout
+    _timeout = timeout
+    if root not in sys.path:
+        sys.path.insert(0, root)  # protocols import otlib
+    sys.stdin = open(os.devnull)  # input() in a protocol fails instead of hanging
+    sim.warm_up(root)
+
+
+def _alarm(signum, frame):
+    raise TimeoutError('no result after {0}s'.format(_timeout))
+
+
+def _run(path):
+    if _timeout and hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, _alarm)
+        signal.alarm(_timeout)
+    try:
+        result = sim.simulate_file(path)
+    finally:
+        if _timeout and hasattr(signal, 'SIGALRM'):
+            signal.alarm(0)
+    result['output'] = result['output'][-2000:]  # keep the tail for failures
+    return result
+
+
+def expand(paths, root=sim.ROOT):
+    """Protocol files for a mix of files and directories (all of them if empty)."""
+    if not paths:
+        return sim.find_protocols(root)
+    found = []
+    for p in paths:
+        if os.path.isdir(p):
+            found.extend(sim.find_protocols(os.path.abspath(p)))
+        else:
+            found.append(os.path.abspath(p))
+    return found
+
+
+def run_batch(paths, jobs=None, timeout=120, root=sim.ROOT, keep_commands=True):
+    """Simulate `paths` over a process pool; yields results as they finish."""
+    jobs = jobs or os.cpu_count() or 1
+    with multiprocessing.Pool(jobs, initializer=_init, initargs=(root, timeout)) as pool:
+        for result in pool.imap_unordered(_run, paths):
+            if not keep_commands:
+                result['n_commands'] = len(result['commands'])
+                result['commands'] = []
+            yield result
+
+
+def summary(result, root=sim.ROOT):
+    n = result.get('n_commands', len(result['commands']))
+    status = 'ok  ' if result['ok'] else 'FAIL'
+    line = '{0} {1:6d} cmds {2:6.2f}s  {3}'.format(status, n, result['wall_time'], os.path.relpath(result['path'], root))
+    if not result['ok']:
+        line += '\n     ' + result['error']
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate protocols in parallel.')
+    parser.add_argument('paths', nargs='*', help='protocol files or folders (default: whole repo)')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: cpu count)')
+    parser.add_argument('--timeout', type=int, default=120, help='seconds per protocol, 0 for none')
+    parser.add_argument('--json', help='write per-protocol results to this file')
+    args = parser.parse_args(argv)
+
+    paths = expand(args.paths)
+    start = time.perf_counter()
+    results = []
+    for result in run_batch(paths, args.jobs, args.timeout, keep_commands=False):
+        print(summary(result))
+        results.append(result)
+    failed = [r for r in results if not r['ok']]
+    print('{0} protocols, {1} failed, {2:.1f}s'.format(len(results), len(failed), time.perf_counter()-start))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(sorted(results, key=lambda r: r['path']), f, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
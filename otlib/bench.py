@@ -0,0 +1,124 @@
+# Throughput benchmarks: simulated deck time, tips, commands and gantry
+# travel for a fixed set of representative protocols.
+#
+#   python -m otlib.bench --save       # record the baseline in benchmarks.json
+#   python -m otlib.bench              # compare; exit 1 on a regression or missing baseline
+#
+# A regression is deck time up more than TOLERANCE, or more tips than the
+# baseline; e.g. a delay added inside a 96-well loop shows up here as
+# minutes, not a week later on the deck. A protocol with no baseline
+# fails too: run --save first.
+#
+# No benchmarks.json is shipped: saving one is the required first step, on
+# the tree before the change and with the robot's opentrons package, e.g.
+#
+#   git stash && python -m otlib.bench --save && git stash pop
+#   python -m otlib.bench
+#
+# Without a baseline file a compare run stops with that hint and exit 1.
+import argparse
+import json
+import os
+import sys
+
+from otlib import decktime, sim
+from otlib.batch import run_batch
+
+BENCHMARKS = [
+    'Exp800.05 create qPCR primer matrix/create_primer_matrix.py',
+    'Exp803.16 CleanRoom OT-2R Programs/p300.aliquot.mastermix.to.BioER.plate.py',
+    'Exp803.13 Creating OT-2 Program for Positive Controls/Exp803.13_create_positive_controls.py',
+    'Exp803.10 Make Reagent in 48 5mL Tubes with Mag Beads/Exp803.10 Make Reagent in 48 5mL Tubes with Mag Beads.py',
+    'Exp803.11 ddPCR protocols/Exp803.11_dPCR_from_2_TubeRacks_1_nanoPlate.py',
+    'Exp803.22 WBE Protocols/Exp803.22 Step1_SARS_dil_series_and_Distribute_mmix_to_plate_samples_from_deepwell.py',
+    'Exp803.22 WBE Protocols/Exp803.22 Step2_ Distribute_mmix_to_plate_samples_from_deepwell.py',
+    'Exp803.22 WBE Protocols/Exp803.22 Step3_OC43_dil_series_and_Distribute_mmix_to_plate_samples_from_deepwell.py',
+    'Exp803.22 WBE Protocols/Exp803.22 Step4_PMMOV_dil_series_and_Distribute_mmix_to_plate_samples_from_deepwell.py',
+]
+RESULTS = os.path.join(sim.ROOT, 'benchmarks.json')
+TOLERANCE = 0.02  # fraction of deck time
+
+
+def measure(result):
+    """Benchmark numbers for one simulate_file() result."""
+    if not result['ok']:
+        return {'error': result['error']}
+    est = decktime.estimate(result['commands'], result['deck'])
+    return {
+        'minutes': round(est['minutes'], 2),
+        'tips': est['tips'],
+        'commands': est['commands'],
+        'travel_m': round(est['travel_mm']/1000, 1),
+    }
+
+
+def run(paths=BENCHMARKS, jobs=None, timeout=120):
+    results = {}
+    for result in run_batch([os.path.join(sim.ROOT, p) for p in paths], jobs, timeout):
+        results[os.path.relpath(result['path'], sim.ROOT)] = measure(result)
+    return dict(sorted(results.items()))
+
+
+def regressions(new, old, tolerance=TOLERANCE):
+    """Protocol -> reason, for runs slower or using more tips than the baseline, or without one."""
+    found = {}
+    for path, n in new.items():
+        o = old.get(path)
+        if not o:
+            found[path] = 'no baseline; run with --save'
+            continue
+        if 'error' in o:
+            continue
+        if 'error' in n:
+            found[path] = 'simulation failed: ' + n['error']
+        elif n['minutes'] > o['minutes']*(1+tolerance):
+            found[path] = 'deck time {0:.1f} -> {1:.1f} min'.format(o['minutes'], n['minutes'])
+        elif n['tips'] > o['tips']:
+            found[path] = 'tips {0} -> {1}'.format(o['tips'], n['tips'])
+    return found
+
+
+def table(new, old):
+    lines = ['{0:>8} {1:>8} {2:>5} {3:>6} {4:>8}  {5}'.format('min', 'delta', 'tips', 'cmds', 'travel m', 'protocol')]
+    for path, n in new.items():
+        if 'error' in n:
+            lines.append('{0:>8}  {1}\n          {2}'.format('FAIL', path, n['error']))
+            continue
+        o = old.get(path, {})
+        delta = '{0:+.1f}'.format(n['minutes']-o['minutes']) if 'minutes' in o else ''
+        lines.append('{0:8.1f} {1:>8} {2:5d} {3:6d} {4:8.1f}  {5}'.format(
+            n['minutes'], delta, n['tips'], n['commands'], n['travel_m'], path))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Deck-time benchmarks for representative protocols.')
+    parser.add_argument('paths', nargs='*', help='protocols (default: BENCHMARKS)')
+    parser.add_argument('--results', default=RESULTS, help='baseline file (default: benchmarks.json)')
+    parser.add_argument('--save', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    old = {}
+    if os.path.exists(args.results):
+        with open(args.results) as f:
+            old = json.load(f)
+    elif not args.save:
+        print('no baseline in {0}; save one first on the unchanged tree: '
+              'python -m otlib.bench --save'.format(os.path.relpath(args.results)))
+        return 1
+    new = run([os.path.relpath(os.path.abspath(p), sim.ROOT) for p in args.paths] or BENCHMARKS, args.jobs)
+    print(table(new, old))
+    if args.save:
+        with open(args.results, 'w') as f:
+            json.dump(dict(old, **new), f, indent=1, sort_keys=True)
+        return 0
+    slower = regressions(new, old, args.tolerance)
+    for path, reason in slower.items():
+        print('FAIL {0}: {1}'.format(path, reason))
+    return 1 if slower else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
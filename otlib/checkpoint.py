@@ -0,0 +1,133 @@
+# Resume a long run where it stopped instead of from the first tube.
+# Each finished step (usually a filled well) is written to a JSON file
+# together with the source volumes of a VolumeLedger and the pipette's
+# next tip; a restarted run skips the steps already done, puts the ledger
+# and tips back and carries on:
+#
+#   ledger.track(pos_control, 4000, tube='15ml')       # track sources first
+#   ckpt = Checkpoint(protocol, 'positive controls', ledger=ledger, pipette=p300)
+#   for dest in ckpt.pending(dests, 'round 1'):
+#       p300.dispense(20, dest.bottom(2))
+#       ckpt.save(dest, 'round 1')
+#   if ckpt.pending(['pause'], 'round 1'):              # a pause is a step too,
+#       protocol.pause('Swap racks')                    # so a restart during it
+#       ckpt.save('pause', 'round 1')                   # pauses again
+#   ckpt.finish()                                       # run complete: forget it
+#
+# The file is CHECKPOINT_DIR/<name>.json on the robot; nothing is read or
+# written when simulating unless OTLIB_CHECKPOINT names a file. Steps are
+# matched by position, so a restart must run the same protocol with the
+# same inputs; the step label stored with the last one is checked. A run
+# that finds a checkpoint pauses first, naming the resume point and the
+# file: resume to carry on, or cancel and delete the file to start over.
+# Liquid in the tip when the run stopped counts as used: the resumed
+# ledger errs low, which only puts the tip deeper.
+import json
+import os
+import time
+
+from otlib.log import get_log
+
+CHECKPOINT_DIR = '/data/user_storage/checkpoints'
+
+log = get_log('checkpoint')
+
+
+def _instrument(pipette):
+    """The InstrumentContext behind TrackedPipette/ChilledPipette/... wrappers."""
+    while getattr(pipette, '_pipette', None) is not None:
+        pipette = pipette._pipette
+    return pipette
+
+
+def _label(item, prefix=None):
+    # wells by name: str() of labware on a module can differ between runs
+    item = getattr(item, 'well_name', None) or item
+    return '{0}: {1}'.format(prefix, item) if prefix else str(item)
+
+
+class Checkpoint:
+    """Completed steps, source volumes and the next tip of a run, kept in a file."""
+
+    def __init__(self, protocol, name, ledger=None, pipette=None, path=None):
+        self.protocol = protocol
+        self.ledger = ledger
+        self.pipette = pipette
+        self.path = path or os.environ.get('OTLIB_CHECKPOINT')
+        if self.path is None and not protocol.is_simulating():
+            self.path = os.path.join(CHECKPOINT_DIR, '{0}.json'.format(name))
+        self._wells = list(ledger.volumes()) if ledger is not None else []
+        self.state = self._load()
+        self.completed = self.state.get('completed', 0)  # steps done before this run
+        self.done = self.completed
+        self._seen = 0
+        if self.completed:
+            self._resume()
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _resume(self):
+        volumes = self.state.get('volumes', {})
+        for well in self._wells:
+            if str(well) in volumes:
+                self.ledger.add(well, volumes[str(well)]-self.ledger.volume(well))
+        tip = self.state.get('tip')
+        if tip is not None and self.pipette is not None:
+            rack, well = tip
+            # set on the instrument itself: the wrappers do not forward setattr
+            instrument = _instrument(self.pipette)
+            instrument.starting_tip = instrument.tip_racks[rack][well]
+        log.info('resume', path=self.path, completed=self.completed, last=self.state.get('last'), tip=tip)
+        self.protocol.pause('Checkpoint found: resuming after {0} ({1} steps done). Resume to carry on; '
+                            'to start over, cancel and delete {2}'.format(
+                                self.state.get('last'), self.completed, self.path))
+
+    def pending(self, items, prefix=None):
+        """The `items` not finished before the restart, in order.
+
+        Call it for every step of the run, in the order the steps are run,
+        including steps that are skipped.
+        """
+        todo = []
+        for item in items:
+            self._seen += 1
+            if self._seen > self.completed:
+                todo.append(item)
+            elif self._seen == self.completed and _label(item, prefix) != self.state.get('last'):
+                raise ValueError('{0} stops at {1!r} but step {2} here is {3!r}; delete it to start over'.format(
+                    self.path, self.state.get('last'), self._seen, _label(item, prefix)))
+        return todo
+
+    def _next_tip(self):
+        for i, rack in enumerate(getattr(self.pipette, 'tip_racks', None) or []):
+            well = rack.next_tip()
+            if well is not None:
+                return [i, well.well_name]
+        return None
+
+    def save(self, item, prefix=None):
+        """Record `item` as the next finished step."""
+        self.done += 1
+        if self.path is None:
+            return
+        self.state = {
+            'completed': self.done,
+            'last': _label(item, prefix),
+            'volumes': {str(w): round(self.ledger.volume(w), 2) for w in self._wells},
+            'tip': self._next_tip() if self.pipette is not None else None,
+            'saved': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(tmp, self.path)  # a fault mid-write keeps the previous checkpoint
+
+    def finish(self):
+        """The run is complete; the next run starts from the beginning."""
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,138 @@
+# Safe travel height per move, instead of move_to(dest.bottom(40)) hops.
+# The OT-2 arcs over labware as defined, but open tube caps are not in any
+# labware definition, so scripts lift the tip by hand before nearly every
+# dispense. Clearance knows the loaded labware (and which racks have caps
+# standing up) and works out the lowest height that clears everything
+# between two wells; a guarded pipette arcs at that height on its own:
+#
+#   clear = Clearance(protocol)         # caps={load_name: mm} for other racks
+#   p300 = clear.guard(p300)
+#   p300.dispense(20, dest.bottom(2))    # no move_to(dest.bottom(40)) first
+#
+# Moves within one well, and moves the API's own arc already clears, are
+# left alone; otherwise the pipette first does move_to(location,
+# minimum_z_height=...), which never arcs lower than the API would.
+import math
+
+from otlib.ledger import well_of
+
+# pipette methods that move to the location they are given
+MOVES = ('aspirate', 'dispense', 'mix', 'blow_out', 'touch_tip', 'air_gap', 'move_to')
+
+# mm open caps stand above the tube rim, per rack
+CAP_HEIGHT = {
+    'vwr_24_tuberack_1500ul': 20,
+    'opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap': 20,
+    'opentrons_24_tuberack_eppendorf_2ml_safelock_snapcap': 20,
+    'opentrons_24_tuberack_nest_1.5ml_snapcap': 20,
+    'opentrons_24_tuberack_nest_2ml_snapcap': 20,
+}
+MARGIN = 5  # mm above the highest obstacle
+OVERHANG = 10  # mm an open cap or rim reaches past the outer well centres
+STEP = 5  # mm between sampled points along a move
+
+
+class Clearance:
+    """Lowest safe arc between two points over the loaded labware."""
+
+    def __init__(self, protocol, caps=None, margin=MARGIN):
+        self.protocol = protocol
+        self.caps = dict(CAP_HEIGHT, **(caps or {}))
+        self.margin = margin
+        self._boxes = None
+        self._loaded = None
+
+    def boxes(self):
+        """(x0, y0, x1, y1, top z) per loaded labware, cached until more is loaded."""
+        loaded = list(self.protocol.loaded_labwares.values())
+        if self._boxes is None or len(loaded) != self._loaded:
+            self._boxes = []
+            for labware in loaded:
+                points = [w.top().point for w in labware.wells()]
+                if not points:
+                    continue
+                top = labware.highest_z + self.caps.get(getattr(labware, 'load_name', ''), 0)
+                self._boxes.append((min(p.x for p in points)-OVERHANG, min(p.y for p in points)-OVERHANG,
+                                    max(p.x for p in points)+OVERHANG, max(p.y for p in points)+OVERHANG, top))
+            self._loaded = len(loaded)
+        return self._boxes
+
+    def height(self, start, end):
+        """Lowest travel z (deck coordinates) clearing everything between Points `start` and `end`."""
+        n = max(1, int(math.hypot(end.x-start.x, end.y-start.y)/STEP))
+        top = 0
+        for i in range(n+1):
+            x = start.x + (end.x-start.x)*i/n
+            y = start.y + (end.y-start.y)*i/n
+            for x0, y0, x1, y1, z in self.boxes():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    top = max(top, z+self.margin)
+        return round(top, 1)
+
+    def guard(self, pipette):
+        return ClearedPipette(pipette, self)
+
+
+def _point(location):
+    if hasattr(location, 'well_name'):
+        return location.top().point
+    return getattr(location, 'point', None)
+
+
+class ClearedPipette:
+    """InstrumentContext wrapper that arcs at the Clearance height between wells."""
+
+    def __init__(self, pipette, clearance):
+        self._pipette = pipette
+        self.clearance = clearance
+        self._at = None  # (well, point) after the last move
+
+    def __getattr__(self, name):
+        attr = getattr(self._pipette, name)
+        if name not in MOVES:
+            return attr
+
+        def cleared(*args, **kwargs):
+            location = kwargs.get('location') or next(
+                (a for a in args if _point(a) is not None), None)
+            z = self._height(location)
+            if z is not None and name == 'move_to':
+                kwargs.setdefault('minimum_z_height', z)
+            elif z is not None:
+                self._pipette.move_to(location, minimum_z_height=z)
+            result = attr(*args, **kwargs)
+            if location is not None:
+                self._at = (well_of(location), _point(location))
+            return result
+        return cleared
+
+    def _height(self, location):
+        """Arc height for moving to `location`, None for moves within a well."""
+        if location is None or _point(location) is None:
+            return None
+        well = well_of(location)
+        if self._at is None:  # start unknown (after a tip change): clear the whole deck
+            return max(box[4] for box in self.clearance.boxes()) + self.clearance.margin
+        if well is not None and well == self._at[0]:
+            return None
+        z = self.clearance.height(self._at[1], _point(location))
+        return z if z > self._api_arc(self._at[0], well) else None
+
+    def _api_arc(self, start, end):
+        # the API clears the labware's own top within one labware and every
+        # labware top between labware (taken as clearing it by the same
+        # margin); only caps need a higher arc
+        labware = [w.parent for w in (start, end) if w is not None]
+        if len(labware) == 2 and labware[0] == labware[1]:
+            top = labware[0].highest_z
+        else:
+            top = max(lw.highest_z for lw in self.clearance.protocol.loaded_labwares.values())
+        return top + self.clearance.margin
+
+    def pick_up_tip(self, *args, **kwargs):
+        self._at = None
+        return self._pipette.pick_up_tip(*args, **kwargs)
+
+    def drop_tip(self, *args, **kwargs):
+        self._at = None
+        return self._pipette.drop_tip(*args, **kwargs)
@@ -0,0 +1,164 @@
+# Deck-time estimate from a simulated command stream.
+#
+#   python -m otlib.decktime "Exp800.05 create qPCR primer matrix/create_primer_matrix.py"
+#
+# Replays the commands from otlib.sim and adds up a simple timing model:
+# gantry arcs between wells (XY and Z distance over max speed), plunger
+# travel at the recorded flow rate, delays, and fixed costs for tips,
+# touch_tip and blow_out. Only leaf commands are timed; mix/transfer are
+# covered by the aspirates and dispenses they publish.
+import argparse
+import math
+import sys
+
+# OT-2 defaults; ctx.max_speeds overrides the gantry speeds when set
+XY_SPEED = 400  # mm/s
+Z_SPEED = 125  # mm/s
+SAFE_Z_MARGIN = 10  # mm above the tallest labware when arcing between wells
+DEFAULT_SAFE_Z = 100  # mm, when the deck layout is unknown
+
+# seconds for motions the command stream doesn't describe
+FIXED = {
+    'pick_up_tip': 4.0,  # press on, shake, retract
+    'drop_tip': 3.0,
+    'return_tip': 3.0,  # as drop_tip, into the rack instead of the trash
+    'touch_tip': 2.0,  # four sides at 60mm/s plus the z moves
+    'blow_out': 1.0,
+    'air_gap': 1.0,
+    'home': 10.0,
+}
+COMMAND_OVERHEAD = 0.05  # s, per leaf command
+
+# command name -> breakdown bucket
+PHASES = {
+    'aspirate': 'plunger', 'dispense': 'plunger', 'blow_out': 'plunger', 'air_gap': 'plunger',
+    'pick_up_tip': 'tips', 'drop_tip': 'tips', 'return_tip': 'tips',
+    'touch_tip': 'touch_tip', 'delay': 'delay', 'move_to': 'moves', 'home': 'moves',
+}
+
+
+def leaves(commands):
+    """Commands that don't wrap other commands (skips mix/transfer parents)."""
+    out = []
+    for i, cmd in enumerate(commands):
+        nxt = commands[i+1] if i+1 < len(commands) else None
+        if nxt is None or nxt.get('depth', 0) <= cmd.get('depth', 0):
+            out.append(cmd)
+    return out
+
+
+def safe_z(deck):
+    heights = [lw['height'] for lw in (deck or {}).get('labware', []) if lw.get('height')]
+    return max(heights) + SAFE_Z_MARGIN if heights else DEFAULT_SAFE_Z
+
+
+class Gantry:
+    """Head position and move timing; arcs to safe z between different wells."""
+
+    def __init__(self, deck=None):
+        speeds = (deck or {}).get('max_speeds', {})
+        self.xy_speed = min(speeds.get('X', XY_SPEED), speeds.get('Y', XY_SPEED))
+        self.z_speed = min(speeds.get('Z', Z_SPEED), speeds.get('A', Z_SPEED))
+        self.safe_z = safe_z(deck)
+        self.pos = None
+        self.well = None
+        self.travel = 0.0  # mm
+
+    def move(self, point, well=None):
+        """Seconds to move to `point`; direct within a well, arc otherwise."""
+        if point is None:
+            return 0.0
+        if self.pos is None:
+            self.pos, self.well = point, well
+            return 0.0
+        x0, y0, z0 = self.pos
+        x1, y1, z1 = point
+        xy = math.hypot(x1-x0, y1-y0)
+        if well is not None and well == self.well:
+            z = abs(z1-z0)
+            t = max(xy/self.xy_speed, z/self.z_speed)
+        else:
+            top = max(self.safe_z, z0, z1)
+            z = (top-z0) + (top-z1)
+            t = xy/self.xy_speed + z/self.z_speed
+        self.travel += xy + z
+        self.pos, self.well = point, well
+        return t
+
+
+def _well_key(cmd):
+    if cmd.get('well') is None:
+        return None
+    return (cmd.get('slot'), cmd.get('labware'), cmd['well'])
+
+
+def command_time(cmd, gantry):
+    """(move seconds, action seconds) for one leaf command."""
+    name = cmd['name']
+    move = gantry.move(cmd.get('point'), _well_key(cmd))
+    if name == 'delay':
+        action = cmd.get('seconds', 0)
+    elif name in ('aspirate', 'dispense') and cmd.get('flow_rate'):
+        action = cmd.get('volume', 0)/cmd['flow_rate']
+    else:
+        action = FIXED.get(name, 0.0)
+    return move, action + COMMAND_OVERHEAD
+
+
+def estimate(commands, deck=None):
+    """Total and per-phase deck time (seconds) plus gantry travel (mm)."""
+    gantry = Gantry(deck)
+    phases = {}
+    sections = {}
+    section = 'start'
+    total = 0.0
+    for cmd in leaves(commands):
+        if cmd['name'] == 'comment':
+            section = cmd.get('text') or section
+        move, action = command_time(cmd, gantry)
+        phase = PHASES.get(cmd['name'], 'other')
+        phases['moves'] = phases.get('moves', 0.0) + move
+        phases[phase] = phases.get(phase, 0.0) + action
+        sections[section] = sections.get(section, 0.0) + move + action
+        total += move + action
+    return {
+        'seconds': total,
+        'minutes': total/60,
+        'phases': phases,
+        'sections': sections,
+        'travel_mm': gantry.travel,
+        'tips': sum(1 for c in commands if c['name'] == 'pick_up_tip'),
+        'commands': len(commands),
+    }
+
+
+def report(est, name=''):
+    lines = ['{0}: {1:.1f} min deck time, {2} tips, {3} commands, {4:.1f} m travel'.format(
+        name, est['minutes'], est['tips'], est['commands'], est['travel_mm']/1000)]
+    for phase, t in sorted(est['phases'].items(), key=lambda kv: -kv[1]):
+        lines.append('  {0:<10} {1:7.1f} min'.format(phase, t/60))
+    if len(est['sections']) > 1:
+        lines.append('  by section:')
+        for section, t in est['sections'].items():
+            lines.append('    {0:7.1f} min  {1}'.format(t/60, section))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    from otlib import sim
+    parser = argparse.ArgumentParser(description='Estimate deck time of protocols.')
+    parser.add_argument('paths', nargs='+')
+    args = parser.parse_args(argv)
+    status = 0
+    for path in args.paths:
+        result = sim.simulate_file(path)
+        if not result['ok']:
+            print('{0}: simulation failed: {1}'.format(path, result['error']))
+            status = 1
+            continue
+        print(report(estimate(result['commands'], result['deck']), path))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
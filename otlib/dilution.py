@@ -0,0 +1,108 @@
+# Serial dilutions (standard curves, ATP/luciferin series, ...).
+# DilutionSeries works out the volumes for `points` tubes diluted `factor`
+# fold each, leaving `final_vol` ul per tube; run_series() pipettes it:
+#
+#   1. diluent into every tube with one tip (several tubes per aspiration
+#      when they fit, heights from the diluent tube's model)
+#   2. stock -> tube 1 -> tube 2 ... where the tip that dispenses into a
+#      tube also mixes it, so each tube is mixed once, right before it is
+#      drawn from. With same_tip=True one tip walks the whole series.
+#
+# Mixing is sized to the tube by otlib.mixing (cycles, volume and heights
+# from the tube volume and liquid class) instead of the fixed low/mid/high
+# mix passes.
+#
+#   series = DilutionSeries(10, 15, 900)          # 100ul carried, 900ul left per tube
+#   run_series(p300, series, pos_control, std_wells, diluent=water,
+#              diluent_vol=15000, diluent_tube='15ml')
+from otlib.heights import heights, liquid_height
+from otlib.mixing import adaptive_mix
+from otlib.multidispense import plan_multi_dispense
+from otlib.volumes import capacity as tip_capacity, split_asp
+
+
+class DilutionSeries:
+    """Volumes for `points` serial `factor`-fold dilutions."""
+
+    def __init__(self, factor, points, final_vol, tube='1.5ml', same_tip=False):
+        if factor <= 1:
+            raise ValueError('dilution factor must be above 1, not {0}'.format(factor))
+        if points < 1:
+            raise ValueError('need at least one dilution point')
+        self.factor, self.points, self.tube = factor, points, tube
+        self.same_tip = same_tip
+        self.diluent_vol = final_vol  # ul put into each tube first
+        self.transfer_vol = final_vol/(factor-1)  # ul carried down the series
+        self.mixed_vol = self.diluent_vol+self.transfer_vol  # ul in a tube when it is mixed
+
+    def concentrations(self, stock_conc):
+        return [stock_conc/self.factor**(i+1) for i in range(self.points)]
+
+    def final_volumes(self):
+        """ul left in each tube after the series (the last keeps its transfer)."""
+        return [self.diluent_vol]*(self.points-1) + [self.mixed_vol]
+
+    def diluent_needed(self):
+        return self.diluent_vol*self.points
+
+
+def _above(tube, vol, mm=2):
+    """Height just above the liquid surface of `vol` ul."""
+    return max(1, round(liquid_height(tube, vol)+mm, 1))
+
+
+def prefill(pipette, series, tubes, diluent, diluent_vol=None, diluent_tube='15ml', capacity=None):
+    """Diluent into every tube with one tip (tip handling included)."""
+    capacity = capacity or tip_capacity(pipette)
+    vol = series.diluent_vol
+    # aspirations as lists of (tube, ul) dispenses
+    if vol <= capacity:
+        tubes_left = iter(tubes)
+        plan = [[(next(tubes_left), vol) for _ in range(a.wells)]
+                for a in plan_multi_dispense(capacity, vol, len(tubes), condition_vol=0, reserve=0)]
+    else:
+        plan = [[(tube, part)] for tube in tubes for part in split_asp(vol, capacity)]
+    asp_vol = sum(v for _, v in plan[0])
+    # draw each aspiration at the level it leaves behind, so the tip ends
+    # submerged (the heights list starts at the full level)
+    src_h = heights(diluent_tube, diluent_vol, len(plan)+1, asp_vol)[1:] if diluent_vol else [1]*len(plan)
+    pipette.pick_up_tip()
+    pipette.mix(2, asp_vol, diluent.bottom(src_h[0]))  # pre-wet
+    filled = {}
+    for dispenses, h in zip(plan, src_h):
+        pipette.aspirate(sum(v for _, v in dispenses), diluent.bottom(h))
+        for tube, v in dispenses:
+            filled[tube] = filled.get(tube, 0)+v
+            pipette.dispense(v, tube.bottom(_above(series.tube, filled[tube])))
+    pipette.drop_tip()
+
+
+def run_series(pipette, series, stock, tubes, diluent=None, diluent_vol=None, diluent_tube='15ml',
+               capacity=None, rate=0.4, liquid='water'):
+    """Prefill (if `diluent` is given) and run the dilution series into `tubes`.
+
+    stock: Well or Location the first transfer is drawn from
+    capacity: ul per aspiration (default: what the pipette's tips hold)
+    liquid: liquid class of the diluted sample, for otlib.mixing
+    """
+    tubes = list(tubes)
+    if len(tubes) != series.points:
+        raise ValueError('{0} tubes for {1} dilution points'.format(len(tubes), series.points))
+    capacity = capacity or tip_capacity(pipette)
+    if diluent is not None:
+        prefill(pipette, series, tubes, diluent, diluent_vol, diluent_tube, capacity)
+    parts = split_asp(series.transfer_vol, capacity)
+    mix_h = heights(series.tube, series.mixed_vol, 1, 0)[0]
+    disp_h = _above(series.tube, series.diluent_vol, -2)  # into the liquid, near the top
+    source = stock
+    for i, tube in enumerate(tubes):
+        if i == 0 or not series.same_tip:
+            pipette.pick_up_tip()
+        for part in parts:
+            pipette.aspirate(part, source, rate=rate)
+            pipette.dispense(part, tube.bottom(disp_h))
+        adaptive_mix(pipette, tube, series.tube, series.mixed_vol, liquid, capacity)
+        pipette.blow_out(tube.bottom(_above(series.tube, series.mixed_vol)))
+        if i == len(tubes)-1 or not series.same_tip:
+            pipette.drop_tip()
+        source = tube.bottom(mix_h)
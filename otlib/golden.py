@@ -0,0 +1,151 @@
+# Golden command streams: did this edit change what the robot does?
+#
+#   python -m otlib.golden --update            # record goldens for the whole repo
+#   python -m otlib.golden                     # later: diff only what changed
+#   python -m otlib.golden "Exp803.07 BCOL Luminase Testing" --update
+#
+# No goldens are shipped: recording them is the required first step, on
+# the tree *before* the change under test and with the opentrons package
+# the robot runs (its simulator defines the stream), e.g.
+#
+#   git stash && python -m otlib.golden --update && git stash pop
+#   python -m otlib.golden                     # now shows what the change did
+#
+# Without golden/index.json a check run stops with that hint and exit 1.
+#
+# Each protocol is simulated (in parallel, as otlib.batch), its command
+# stream reduced to one canonical line per command (no free text or object
+# addresses, volumes and heights rounded) and hashed. golden/index.json
+# holds the hashes; golden/<protocol path>.txt.gz the canonical lines. A
+# run only reads the .gz of protocols whose hash moved and prints a unified
+# diff of the commands for those. Exits 1 if a protocol failed to
+# simulate, or changed without --update.
+import argparse
+import difflib
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+
+from otlib import sim
+from otlib.batch import expand, run_batch
+
+GOLDEN_DIR = os.path.join(sim.ROOT, 'golden')
+INDEX = 'index.json'
+DIFF_LINES = 40  # per protocol
+
+
+def canonical(commands):
+    """One stable text line per command."""
+    lines = []
+    for c in commands:
+        parts = ['  '*c.get('depth', 0) + c['name']]
+        if c.get('pipette'):
+            parts.append(c['pipette'])
+        for key in ('volume', 'repetitions', 'rate', 'seconds'):
+            if c.get(key) is not None:
+                parts.append('{0}={1:g}'.format(key, round(c[key], 2)))
+        if c.get('well'):
+            parts.append('{0}:{1}:{2}'.format(c.get('slot'), c.get('labware'), c['well']))
+        if c.get('height') is not None:
+            parts.append('h={0:g}'.format(round(c['height'], 1)))
+        if c['name'] == 'comment':
+            parts.append(c.get('text', ''))
+        lines.append(' '.join(parts))
+    return lines
+
+
+def digest(lines):
+    return hashlib.sha1('\n'.join(lines).encode()).hexdigest()
+
+
+def _golden_path(rel, root=GOLDEN_DIR):
+    return os.path.join(root, rel + '.txt.gz')
+
+
+def load_index(root=GOLDEN_DIR):
+    try:
+        with open(os.path.join(root, INDEX)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save(rel, lines, index, root=GOLDEN_DIR):
+    path = _golden_path(rel, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    index[rel] = {'hash': digest(lines), 'commands': len(lines)}
+
+
+def load(rel, root=GOLDEN_DIR):
+    with gzip.open(_golden_path(rel, root), 'rt', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def diff(old, new, rel, limit=DIFF_LINES):
+    out = list(difflib.unified_diff(old, new, 'golden/' + rel, rel, n=1, lineterm=''))
+    if len(out) > limit:
+        out = out[:limit] + ['... {0} more diff lines'.format(len(out)-limit)]
+    return out
+
+
+def check(results, index, update=False, root=GOLDEN_DIR, limit=DIFF_LINES):
+    """Compare simulation results with the goldens; returns {status: [rel paths]}."""
+    status = {'same': [], 'changed': [], 'new': [], 'failed': []}
+    for result in sorted(results, key=lambda r: r['path']):
+        rel = os.path.relpath(result['path'], sim.ROOT)
+        if not result['ok']:
+            status['failed'].append(rel)
+            print('FAIL     {0}\n         {1}'.format(rel, result['error']))
+            continue
+        lines = canonical(result['commands'])
+        known = index.get(rel)
+        if known and known['hash'] == digest(lines):
+            status['same'].append(rel)
+            continue
+        if known is None:
+            status['new'].append(rel)
+            print('new      {0} ({1} commands)'.format(rel, len(lines)))
+        else:
+            status['changed'].append(rel)
+            print('changed  {0} ({1} -> {2} commands)'.format(rel, known['commands'], len(lines)))
+            if os.path.exists(_golden_path(rel, root)):
+                for line in diff(load(rel, root), lines, rel, limit):
+                    print('    ' + line)
+        if update:
+            save(rel, lines, index, root)
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare protocol command streams with recorded goldens.')
+    parser.add_argument('paths', nargs='*', help='protocol files or folders (default: whole repo)')
+    parser.add_argument('--update', action='store_true', help='record new and changed streams as golden')
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    parser.add_argument('--timeout', type=int, default=120)
+    parser.add_argument('--lines', type=int, default=DIFF_LINES, help='diff lines shown per protocol')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = load_index()
+    if not index and not args.update:
+        print('no goldens in {0}; record them first on the unchanged tree: '
+              'python -m otlib.golden --update'.format(os.path.relpath(GOLDEN_DIR)))
+        return 1
+    status = check(run_batch(expand(args.paths), args.jobs, args.timeout), index, args.update, limit=args.lines)
+    if args.update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(os.path.join(GOLDEN_DIR, INDEX), 'w') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+    print('{0} same, {1} changed, {2} new, {3} failed, {4:.1f}s{5}'.format(
+        len(status['same']), len(status['changed']), len(status['new']), len(status['failed']),
+        time.perf_counter()-start, ' (goldens updated)' if args.update else ''))
+    return 1 if status['failed'] or (status['changed'] and not args.update) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
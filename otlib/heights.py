@@ -0,0 +1,100 @@
+# Liquid heights for the tubes we aspirate from.
+# Replaces the tip_heights / tip_heightsEpp / fifteen_ml_heights /
+# fifty_ml_heights functions that were copied into every protocol.
+#
+# heights(tube, init_vol, steps, vol_dec) returns the same list the old
+# functions did: one .bottom() height (mm) per aspiration, starting at
+# init_vol (ul) and dropping vol_dec (ul) per step. Whole schedules are
+# computed in one pass and cached, so calling it inside a loop is free.
+from collections import namedtuple
+from functools import lru_cache
+
+# coeffs: p0..p5 of the volume (ul) -> height (mm) fit, lowest order first
+# full_vol: above this the model is out of range and offset_full is used
+# offset: mm subtracted so the tip sits below the liquid level; None when
+#   the copies disagree too much for a default (pass offset= from the
+#   protocol's own function)
+# floor: computed heights below this go straight to `bottom`
+Tube = namedtuple('Tube', 'coeffs full_vol offset offset_full floor bottom')
+
+TUBES = {
+    # 1.5mL tube; values originate from Excel spreadsheet "Exp803..."
+    '1.5ml': Tube(
+        (0.029502064, 0.084625954, -0.000174864, 2.18373E-07, -1.30599E-10, 2.97839E-14),
+        1500, 7, 14, 8, 1),
+    # 2mL Eppendorf tube; values originate from Excel spreadsheet "Exp803..."
+    # The 74 tip_heightsEpp copies agree on offset_full (12) but not on the
+    # offset: 11 (39 copies), 8 (26), 13 (6), 5 or 7; floor 3-8, bottom 0-2.
+    # No default reproduces most of them, so offset= is required.
+    '2ml': Tube(
+        (-0.272820744, 0.019767959, 2.00442E-06, -8.99691E-09, 6.72776E-12, -1.55428E-15),
+        2000, None, 12, 6, 1),
+    # 15mL conical; Excel spreadsheet "Volume.heights.in.15.0mL.conical.tube"
+    '15ml': Tube(
+        (6.52, 0.013, -2.11E-6, 3.02E-10, -1.95E-14, 4.65E-19),
+        1500, 5, 5, 8, 1),
+    # 50mL conical; linear fit, values originate from Excel spreadsheet "Exp803..."
+    '50ml': Tube(
+        (0, 0.0024),
+        51000, 5, 12, 12, 3),
+}
+
+
+def liquid_height(tube, vol):
+    """Model height (mm from tube bottom) of `vol` ul in `tube`, no offset."""
+    h = 0
+    for p in reversed(TUBES[tube].coeffs):  # Horner, highest order first
+        h = h*vol + p
+    return h
+
+
+@lru_cache(maxsize=1024)
+def _schedule(tube, init_vol, steps, vol_dec, offset, offset_full, floor, bottom):
+    t = TUBES[tube]
+    coeffs = tuple(reversed(t.coeffs))
+    off = offset_full if init_vol > t.full_vol else offset
+    sched = []
+    for i in range(steps):
+        x = init_vol-vol_dec*i
+        h = 0
+        for p in coeffs:
+            h = h*x + p
+        h = h-off
+        # prevent negative heights; go to bottom to avoid air aspirant
+        sched.append(bottom if h < floor else round(h, 1))
+    return tuple(sched)
+
+
+def heights(tube, init_vol, steps, vol_dec, offset=None, offset_full=None, floor=None, bottom=None):
+    """Aspiration heights for `steps` draws of `vol_dec` ul from `tube`.
+
+    The keyword arguments override the tube defaults; protocols that were
+    tuned with a different offset or floor pass them here.
+    """
+    t = TUBES[tube]
+    if offset is None and t.offset is None:
+        raise ValueError('{0} tubes have no default offset; pass offset= (and floor=/bottom=) '
+                         'as in the protocol\'s own height function'.format(tube))
+    return list(_schedule(
+        tube, init_vol, steps, vol_dec,
+        t.offset if offset is None else offset,
+        t.offset_full if offset_full is None else offset_full,
+        t.floor if floor is None else floor,
+        t.bottom if bottom is None else bottom))
+
+
+# drop-in replacements for the per-protocol functions
+def tip_heights(init_vol, steps, vol_dec, **kwargs):
+    return heights('1.5ml', init_vol, steps, vol_dec, **kwargs)
+
+
+def tip_heightsEpp(init_vol, steps, vol_dec, **kwargs):
+    return heights('2ml', init_vol, steps, vol_dec, **kwargs)
+
+
+def fifteen_ml_heights(init_vol, steps, vol_dec, **kwargs):
+    return heights('15ml', init_vol, steps, vol_dec, **kwargs)
+
+
+def fifty_ml_heights(init_vol, steps, vol_dec, **kwargs):
+    return heights('50ml', init_vol, steps, vol_dec, **kwargs)
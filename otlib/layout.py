@@ -0,0 +1,143 @@
+# Deck layout from how often the pipette goes between labware.
+#
+#   python -m otlib.layout "Exp803.11 ddPCR protocols/Exp803.11_dPCR_from_2_TubeRacks_1_nanoPlate.py"
+#   python -m otlib.layout <protocol> --fix 3      # keep slot 3 where it is
+#
+# Counts labware-to-labware moves in the simulated run (tip pick-ups and
+# the trash included) and searches slot assignments that minimise the
+# summed centre-to-centre distance of those moves. Slot 12 (trash) stays,
+# modules only go where their cable reaches (MODULE_SLOTS) and a
+# thermocycler stays in 7. Prints the moves to make and the travel and
+# time saved; the script itself is not changed.
+import argparse
+import itertools
+import math
+import os
+import sys
+
+from otlib.decktime import XY_SPEED, leaves
+
+SLOT_PITCH = (132.5, 90.5)  # mm between slot origins, x and y
+SLOTS = [str(n) for n in range(1, 12)]  # 12 is the fixed trash
+MODULE_SLOTS = {'1', '3', '4', '6', '7', '9', '10'}  # temperature/magnetic module positions
+EXHAUSTIVE = 200000  # layouts; above this, pair swaps from the current layout
+
+
+def slot_xy(slot):
+    n = int(slot)-1
+    return ((n % 3)*SLOT_PITCH[0], (n//3)*SLOT_PITCH[1])
+
+
+def _dist(a, b):
+    (x0, y0), (x1, y1) = slot_xy(a), slot_xy(b)
+    return math.hypot(x1-x0, y1-y0)
+
+
+def transitions(commands):
+    """{(slot a, slot b): moves} between consecutive commands on different slots."""
+    counts = {}
+    last = None
+    for cmd in leaves(commands):
+        slot = cmd.get('slot')
+        if slot is None:
+            continue
+        slot = str(slot)
+        if last is not None and slot != last:
+            pair = tuple(sorted((last, slot), key=int))
+            counts[pair] = counts.get(pair, 0) + 1
+        last = slot
+    return counts
+
+
+def travel(counts, layout):
+    """mm of slot-to-slot travel with labware moved per `layout` {old slot: new slot}."""
+    return sum(n*_dist(layout.get(a, a), layout.get(b, b)) for (a, b), n in counts.items())
+
+
+def constraints(deck, fixed=()):
+    """(slots that must stay, {slot: allowed slots}) for the labware in `deck`."""
+    stay = {'12'} | {str(s) for s in fixed}
+    allowed = {}
+    modules = {m['slot']: m['module'] for m in deck.get('modules', [])}
+    for slot, kind in modules.items():
+        if 'thermocycler' in kind.lower():
+            stay |= {'7', '8', '10', '11'}
+        else:
+            allowed[slot] = MODULE_SLOTS
+    return stay, allowed
+
+
+def optimise(counts, deck, fixed=()):
+    """Best {old slot: new slot} found, by exhaustive search when small, else pair swaps."""
+    stay, allowed = constraints(deck, fixed)
+    occupied = sorted({lw['slot'] for lw in deck.get('labware', [])} | {s for pair in counts for s in pair}, key=int)
+    movable = [s for s in occupied if s not in stay]
+    free = [s for s in SLOTS if s not in stay]
+
+    def ok(layout):
+        return all(layout[s] in allowed.get(s, free) for s in movable)
+
+    best = {s: s for s in movable}
+    best_cost = travel(counts, best)
+    if math.factorial(len(free))//math.factorial(len(free)-len(movable)) <= EXHAUSTIVE:
+        for perm in itertools.permutations(free, len(movable)):
+            layout = dict(zip(movable, perm))
+            if ok(layout):
+                cost = travel(counts, layout)
+                if cost < best_cost - 1e-6:
+                    best, best_cost = layout, cost
+        return best, best_cost
+    improved = True
+    while improved:  # move one labware to a free slot or swap two, while it helps
+        improved = False
+        for s in movable:
+            taken = {v: k for k, v in best.items()}
+            for target in free:
+                layout = dict(best)
+                other = taken.get(target)
+                layout[s] = target
+                if other is not None:
+                    layout[other] = best[s]
+                if layout != best and ok(layout):
+                    cost = travel(counts, layout)
+                    if cost < best_cost - 1e-6:
+                        best, best_cost, improved = layout, cost, True
+                        taken = {v: k for k, v in best.items()}
+    return best, best_cost
+
+
+def report(counts, deck, layout, name=''):
+    names = {lw['slot']: lw['load_name'] for lw in deck.get('labware', [])}
+    before, after = travel(counts, {}), travel(counts, layout)
+    lines = ['{0}: {1} labware moves, {2:.1f} m -> {3:.1f} m slot-to-slot travel, ~{4:.1f} min saved'.format(
+        name, sum(counts.values()), before/1000, after/1000, (before-after)/XY_SPEED/60)]
+    for old, new in sorted(layout.items(), key=lambda kv: int(kv[0])):
+        if old != new:
+            lines.append('  {0:>2} -> {1:>2}  {2}'.format(old, new, names.get(old, '')))
+    if len(lines) == 1:
+        lines.append('  current layout is already the shortest found')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    from otlib import sim
+    parser = argparse.ArgumentParser(description='Suggest slot assignments that shorten gantry travel.')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--fix', action='append', default=[], help='slot to keep as is (repeatable)')
+    args = parser.parse_args(argv)
+    status = 0
+    for path in args.paths:
+        result = sim.simulate_file(path)
+        name = os.path.relpath(path, sim.ROOT) if os.path.isabs(path) else path
+        if not result['ok']:
+            print('{0}: simulation failed: {1}'.format(name, result['error']))
+            status = 1
+            continue
+        counts = transitions(result['commands'])
+        layout, _ = optimise(counts, result['deck'], args.fix)
+        print(report(counts, result['deck'], layout, name))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# Live volume tracking for source and destination wells.
+# Instead of hand-computing init_vol/steps/vol_dec and walking a heights
+# list with a counter, register the starting volume once and let the
+# ledger pick the .bottom() height from whatever is left in the tube:
+#
+#   ledger = VolumeLedger()
+#   ledger.track(buffer, 41250, tube='50ml')
+#   p300 = TrackedPipette(p300, ledger)
+#   p300.aspirate(200, buffer)   # height follows the current volume
+#   p300.dispense(200, dest.top())
+from otlib.heights import heights
+
+
+# (min, max] well capacity in ul -> height model
+TUBE_SIZES = [(1000, 1500, '1.5ml'), (1500, 2000, '2ml'), (10000, 15000, '15ml'), (40000, 50000, '50ml')]
+
+
+def tube_for(well):
+    """Pick a height model from the well's capacity; None for plate wells etc."""
+    max_vol = getattr(well, 'max_volume', None) or 0
+    for lo, hi, tube in TUBE_SIZES:
+        if lo < max_vol <= hi:
+            return tube
+    return None
+
+
+def well_of(location):
+    """The Well behind a Well or a Location such as well.bottom(2), else None."""
+    if hasattr(location, 'well_name'):
+        return location
+    lw = getattr(location, 'labware', None)
+    if hasattr(lw, 'as_well'):  # newer API wraps the parent in a LabwareLike
+        return lw.as_well() if getattr(lw, 'is_well', False) else None
+    return lw if hasattr(lw, 'well_name') else None
+
+
+class VolumeLedger:
+    def __init__(self):
+        self._vols = {}
+        self._tubes = {}
+        self._dead = {}
+        self._kwargs = {}
+
+    def track(self, well, vol, tube=None, dead_vol=0, **height_kwargs):
+        """Start tracking `well` with `vol` ul in it.
+
+        `tube` is a key of otlib.heights.TUBES (guessed from the well when
+        omitted); height_kwargs (offset, floor, ...) are passed to heights().
+        """
+        if tube is not None:
+            heights(tube, vol, 1, 0, **height_kwargs)  # e.g. '2ml' without offset= fails here, not mid-run
+        self._vols[well] = vol
+        self._tubes[well] = tube or tube_for(well)
+        self._dead[well] = dead_vol
+        self._kwargs[well] = height_kwargs
+        return well
+
+    def volume(self, well):
+        return self._vols.get(well, 0)
+
+    def available(self, well):
+        return self.volume(well)-self._dead.get(well, 0)
+
+    def height(self, well, default=1):
+        """Aspiration height (mm from bottom) for the volume now in `well`."""
+        tube = self._tubes.get(well)
+        if tube is None:
+            return default
+        return heights(tube, self.volume(well), 1, 0, **self._kwargs[well])[0]
+
+    def bottom(self, well):
+        return well.bottom(self.height(well))
+
+    def remove(self, well, vol):
+        if well in self._vols and vol > self.available(well) + 1e-6:
+            raise ValueError('{0}: need {1}ul but only {2}ul above dead volume'.format(
+                well, round(vol, 2), round(self.available(well), 2)))
+        self._vols[well] = self.volume(well)-vol
+
+    def add(self, well, vol):
+        if well not in self._vols:
+            self.track(well, 0)
+        self._vols[well] += vol
+
+    def volumes(self):
+        return dict(self._vols)
+
+
+class TrackedPipette:
+    """InstrumentContext wrapper that books aspirate/dispense into a ledger.
+
+    Passing a bare Well to aspirate() or mix() uses the ledger height;
+    passing a Location (well.bottom(3), well.top()) keeps that position but
+    still updates the volumes. Anything else falls through to the pipette.
+    """
+
+    def __init__(self, pipette, ledger):
+        self._pipette = pipette
+        self.ledger = ledger
+
+    def __getattr__(self, name):
+        return getattr(self._pipette, name)
+
+    def _resolve(self, location):
+        if location is not None and hasattr(location, 'well_name'):
+            return location, self.ledger.bottom(location)
+        return well_of(location), location
+
+    def aspirate(self, volume=None, location=None, rate=1.0):
+        well, loc = self._resolve(location)
+        if volume is None:
+            volume = self._pipette.max_volume-self._pipette.current_volume
+        if well is not None:
+            self.ledger.remove(well, volume)
+        self._pipette.aspirate(volume, loc, rate=rate)
+        return self
+
+    def dispense(self, volume=None, location=None, rate=1.0):
+        if volume is None:
+            volume = self._pipette.current_volume
+        well = well_of(location)
+        if well is not None:
+            self.ledger.add(well, volume)
+        self._pipette.dispense(volume, location, rate=rate)
+        return self
+
+    def mix(self, repetitions=1, volume=None, location=None, rate=1.0):
+        _, loc = self._resolve(location)
+        self._pipette.mix(repetitions, volume, loc, rate=rate)
+        return self
@@ -0,0 +1,98 @@
+# Liquid classes: rates, delays, blow-out and touch-tip per liquid.
+# Instead of rate=0.4 + protocol.delay(seconds=2) + touch_tip() tuned in
+# every script, name the liquid and tune its class once here:
+#
+#   p20 = LiquidPipette(p20, protocol)
+#   p20.aspirate(5, sample.bottom(1), liquid='dna')
+#   p20.dispense(5, plate['A1'].bottom(1), liquid='dna')
+#
+# Rates are fractions of the pipette's default flow rate, as in
+# aspirate(..., rate=0.4). A rate passed explicitly still wins.
+from collections import namedtuple
+
+from otlib.ledger import well_of
+
+# aspirate_rate/dispense_rate: fraction of the default flow rate
+# aspirate_delay/dispense_delay: s to wait after the plunger stops
+# blow_out: None, 'top', or mm above the bottom of the dispense well
+# touch_tip: after aspirating / after dispensing
+LiquidClass = namedtuple('LiquidClass', [
+    'aspirate_rate', 'dispense_rate', 'aspirate_delay', 'dispense_delay',
+    'blow_out', 'touch_tip_aspirate', 'touch_tip_dispense'])
+
+# starting points taken from the most common hand-tuned values in the repo
+LIQUIDS = {
+    'water': LiquidClass(1.0, 1.0, 0, 0, None, False, False),
+    'buffer': LiquidClass(1.0, 1.0, 0, 0, None, False, False),
+    'mastermix': LiquidClass(0.4, 0.5, 2, 1, 'top', True, False),
+    'beads': LiquidClass(0.5, 0.5, 1, 1, 'top', False, False),
+    'ethanol': LiquidClass(1.0, 1.0, 0, 0, 'top', False, False),
+    'dna': LiquidClass(0.75, 1.0, 2, 0, 8, True, True),
+}
+
+
+def liquid_class(name):
+    try:
+        return LIQUIDS[name]
+    except KeyError:
+        raise ValueError('unknown liquid class {0!r}; known: {1}'.format(name, ', '.join(sorted(LIQUIDS))))
+
+
+def register(name, base=None, **fields):
+    """Add or retune a class, e.g. register('glycerol', base='mastermix', aspirate_rate=0.2)."""
+    start = liquid_class(base) if base else liquid_class(name) if name in LIQUIDS else LIQUIDS['water']
+    LIQUIDS[name] = start._replace(**fields)
+    return LIQUIDS[name]
+
+
+class LiquidPipette:
+    """InstrumentContext wrapper whose aspirate/dispense/mix take liquid=<class name>.
+
+    Without liquid= (and with default=None) calls go straight through.
+    """
+
+    def __init__(self, pipette, protocol, default=None):
+        self._pipette = pipette
+        self._protocol = protocol
+        self.default = default
+
+    def __getattr__(self, name):
+        return getattr(self._pipette, name)
+
+    def _class(self, liquid):
+        liquid = liquid or self.default
+        return liquid_class(liquid) if liquid else None
+
+    def aspirate(self, volume=None, location=None, rate=None, liquid=None):
+        lc = self._class(liquid)
+        if rate is None:
+            rate = lc.aspirate_rate if lc else 1.0
+        self._pipette.aspirate(volume, location, rate=rate)
+        if lc and lc.aspirate_delay:
+            self._protocol.delay(seconds=lc.aspirate_delay)
+        if lc and lc.touch_tip_aspirate:
+            self._pipette.touch_tip()
+        return self
+
+    def dispense(self, volume=None, location=None, rate=None, liquid=None):
+        lc = self._class(liquid)
+        if rate is None:
+            rate = lc.dispense_rate if lc else 1.0
+        self._pipette.dispense(volume, location, rate=rate)
+        if lc is None:
+            return self
+        if lc.dispense_delay:
+            self._protocol.delay(seconds=lc.dispense_delay)
+        well = well_of(location)
+        if lc.blow_out is not None and well is not None:
+            self._pipette.blow_out(well.top() if lc.blow_out == 'top' else well.bottom(lc.blow_out))
+        if lc.touch_tip_dispense:
+            self._pipette.touch_tip()
+        return self
+
+    def mix(self, repetitions=1, volume=None, location=None, rate=None, liquid=None):
+        lc = self._class(liquid)
+        if rate is None:
+            rate = min(lc.aspirate_rate, lc.dispense_rate) if lc else 1.0
+        self._pipette.mix(repetitions, volume, location, rate=rate)
+        return self
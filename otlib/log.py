@@ -0,0 +1,101 @@
+# Key/value logging for protocols, instead of print().
+#
+#   from otlib.log import get_log
+#   log = get_log('WBE Step1')
+#   log.debug('mmix height', well=dest, h=h_list[well_num-1])
+#   log.info('volumes', sN_mix_tot=sN_mix_tot, plan=lambda: plan.describe())
+#
+# prints "WBE Step1 mmix height well=A3 h=12.4". Nothing is formatted (and
+# callables are not called) unless the level is enabled, so per-well debug
+# lines cost nothing in a normal run. The level is 'info' unless OTLIB_LOG
+# says otherwise (debug, info, warning, off) and can be changed at runtime
+# with set_level(). Records go through the stdlib `logging` module under the
+# 'otlib' logger; format='json' writes one JSON object per record instead.
+import json
+import logging
+import os
+import sys
+
+LEVELS = {'debug': logging.DEBUG, 'info': logging.INFO, 'warning': logging.WARNING,
+          'error': logging.ERROR, 'off': logging.CRITICAL+1}
+
+_root = logging.getLogger('otlib')
+_config = {'json': False}
+
+
+def _value(v):
+    v = v() if callable(v) else v
+    return round(v, 2) if isinstance(v, float) else v
+
+
+class _Record:
+    """Message object formatted only when a handler emits it."""
+
+    def __init__(self, name, event, fields, as_json):
+        self.name, self.event, self.fields, self.as_json = name, event, fields, as_json
+
+    def __str__(self):
+        fields = {k: _value(v) for k, v in self.fields.items()}
+        if self.as_json:
+            return json.dumps(dict(log=self.name, event=self.event, **fields), default=str)
+        kv = ' '.join('{0}={1}'.format(k, v) for k, v in fields.items())
+        return ' '.join(s for s in (self.name, self.event, kv) if s)
+
+
+class Log:
+    def __init__(self, name):
+        self.name = name
+        self._logger = _root.getChild(name.replace('.', '_'))
+
+    def enabled(self, level='debug'):
+        return self._logger.isEnabledFor(LEVELS[level])
+
+    def _log(self, level, event, fields):
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, '%s', _Record(self.name, event, fields, _config['json']))
+
+    def debug(self, event, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event, **fields):
+        self._log(logging.WARNING, event, fields)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time (simulators redirect it)."""
+
+    def emit(self, record):
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+def set_level(level):
+    """'debug', 'info', 'warning', 'error' or 'off'."""
+    try:
+        _root.setLevel(LEVELS[level.lower()])
+    except KeyError:
+        raise ValueError('unknown log level {0!r}; known: {1}'.format(level, ', '.join(LEVELS)))
+
+
+def configure(level=None, stream=None, format='kv'):
+    """(Re)attach the handler; called once on import with the defaults."""
+    if format not in ('kv', 'json'):
+        raise ValueError('log format must be kv or json, not {0!r}'.format(format))
+    _config['json'] = format == 'json'
+    for handler in list(_root.handlers):
+        _root.removeHandler(handler)
+    handler = logging.StreamHandler(stream) if stream else _StdoutHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    _root.addHandler(handler)
+    _root.propagate = False
+    set_level(level or os.environ.get('OTLIB_LOG', 'info'))
+
+
+def get_log(name):
+    return Log(name)
+
+
+configure()
@@ -0,0 +1,285 @@
+# Forward x reverse primer concentration matrix.
+# PrimerMatrix does the calcs that create_primer_matrix*.py spell out one
+# scalar at a time (R_50_rxn, R_100_mix, F_800_int_water, ...) for any
+# number of F and R concentrations. Per-concentration values are lists in
+# the order of F_concs/R_concs; names follow the scripts.
+#
+#   m = PrimerMatrix([50, 100, 200, 400, 600, 800], [50, 100, 200, 400, 600, 800])
+#   m.R_mix_primer      # ul of 10uM rev primer into each R_mix tube
+#   m.F_mix_water       # ul of water into each F intermediate tube
+#   m.layout()          # plate well -> what goes in it
+#   m.transfers()       # the whole run as otlib.tips.Transfer steps
+#
+# Layout: one plate row per R concentration, cell_reps adjacent columns per
+# F concentration; standards and NTCs fill the free wells row by row in runs
+# of std_NTC_reps (G1-G3 = std_1, G4-G6 = std_2, ... for a 6x6 matrix).
+#
+# Supported shapes: one assay (one probe, one standard curve) per plate,
+# with len(R_concs) <= plate_rows, len(F_concs)*cell_reps <= plate_cols and
+# std_levels*std_NTC_reps + std_NTC_reps NTCs <= the wells left over;
+# layout() raises ValueError otherwise. Several assays, or standards for
+# more than one assay, on the same plate are not supported: use one
+# PrimerMatrix (and one plate) per assay.
+#
+# run_plan() pipettes a transfer list generically (split by tip capacity,
+# tips per otlib.tips.plan_tips, intermediate tubes mixed before use); the
+# hand-tuned scripts keep their own command section and only use the calcs.
+from otlib.ledger import TrackedPipette
+from otlib.tips import Transfer, plan_tips
+from otlib.volumes import capacity as tip_capacity, n_parts
+
+ROWS = 'ABCDEFGHIJKLMNOP'
+
+# percent_waste offsets per mix, as in create_primer_matrix.py
+WASTE_OFFSETS = {
+    'sN_mix': 0.025,
+    'R_mix': 0.10,
+    'std_NTC': 0.028,
+    'bpw': 0.032,
+}
+
+# volumes up to P20_MAX go to the p20, anything larger to the p300
+P20_MAX = 20
+
+
+def per_rxn(conc, stock, rxn_vol):
+    """ul of `stock` uM to add for `conc` nM in `rxn_vol` ul."""
+    return conc/1000*rxn_vol/stock
+
+
+def pipette_for(volume):
+    return 'p20' if volume <= P20_MAX else 'p300'
+
+
+def plate_well(name, plate=0):
+    """Transfer endpoint for a plate well (tubes are plain names)."""
+    return ('plate', name, plate)
+
+
+class PrimerMatrix:
+    """Volumes for an F x R primer titration with standards and NTCs."""
+
+    def __init__(self, F_concs, R_concs, orig_F_conc=10, orig_R_conc=10, orig_P_conc=10,
+                 P_conc=300, std_F_conc=300, std_R_conc=300, rxn_base=11.2, tot_rxn_vol=20,
+                 dna_per_rxn=2, dna_per_rxn_10x=0.2, cell_reps=2, std_levels=7, std_NTC_reps=3,
+                 F_int_vol=100, percent_waste=0.20, waste_offsets=None,
+                 plate_rows=8, plate_cols=12):
+        if not F_concs or not R_concs:
+            raise ValueError('need at least one F and one R concentration')
+        self.F_concs, self.R_concs = list(F_concs), list(R_concs)
+        self.cell_reps = cell_reps
+        self.std_levels, self.std_NTC_reps = std_levels, std_NTC_reps
+        self.plate_rows, self.plate_cols = plate_rows, plate_cols
+        offsets = dict(WASTE_OFFSETS, **(waste_offsets or {}))
+
+        def waste(mix):
+            return 1+percent_waste-offsets[mix]
+
+        # counts
+        self.tot_stds = std_levels*std_NTC_reps
+        self.tot_NTCs = std_NTC_reps if std_NTC_reps else 0
+        self.tot_samp = len(self.F_concs)*len(self.R_concs)*cell_reps
+        self.tot_sds_NTC = self.tot_stds+self.tot_NTCs
+        self.tot_rxns = self.tot_sds_NTC+self.tot_samp
+        self.R_reps = len(self.F_concs)*cell_reps
+
+        # per reaction
+        rxn_vol_no_dna = tot_rxn_vol-dna_per_rxn
+        self.P_per_rxn = per_rxn(P_conc, orig_P_conc, tot_rxn_vol)
+        self.max_vol_F_per_rxn = per_rxn(max(self.F_concs), orig_F_conc, tot_rxn_vol)
+        self.max_vol_R_per_rxn = per_rxn(max(self.R_concs), orig_R_conc, tot_rxn_vol)
+        self.water_per_rxn = rxn_vol_no_dna-rxn_base-self.P_per_rxn-self.max_vol_F_per_rxn-self.max_vol_R_per_rxn
+        if self.water_per_rxn < 0:
+            raise ValueError('highest F+R concentrations need {0:.2f}ul more than the reaction holds'.format(
+                -self.water_per_rxn))
+        self.std_vol_F_per_rxn = per_rxn(std_F_conc, orig_F_conc, tot_rxn_vol)
+        self.std_vol_R_per_rxn = per_rxn(std_R_conc, orig_R_conc, tot_rxn_vol)
+        self.BPW_rxn = rxn_base+self.P_per_rxn+self.water_per_rxn
+        self.std_woff_per_sN_rxn = (self.max_vol_F_per_rxn-self.std_vol_F_per_rxn
+                                    + self.max_vol_R_per_rxn-self.std_vol_R_per_rxn)
+        self.BPW_sN_rxn = self.BPW_rxn+self.std_vol_F_per_rxn+self.std_vol_R_per_rxn+self.std_woff_per_sN_rxn
+        self.bpwd_rxn = self.BPW_rxn+dna_per_rxn
+        self.std_well_vol = self.BPW_sN_rxn+dna_per_rxn
+
+        # standards and NTC mix (sN_mix) and the per-standard mixes
+        sN = self.tot_sds_NTC*waste('sN_mix')
+        self.BWP_mix_xfer_sN_mix = sN*self.BPW_rxn
+        self.std_woff_add_to_sN_mix = sN*self.std_woff_per_sN_rxn
+        self.F_add_to_sN_mix = sN*self.std_vol_F_per_rxn
+        self.R_add_to_sN_mix = sN*self.std_vol_R_per_rxn
+        self.sN_mix_xfer_to_stds_mix = self.BPW_sN_rxn*std_NTC_reps*waste('std_NTC')
+        self.std_DNA_xfer_to_stds_mix = dna_per_rxn*std_NTC_reps*waste('std_NTC')
+
+        # sample mix with DNA (bpwd_mix); DNA added 10x concentrated plus water
+        bpw = self.tot_samp*waste('bpw')
+        self.bpw_mix_xfer_bpwd_mix = bpw*self.BPW_rxn
+        self.std_DNA_xfer_to_bpwd_mix = bpw*dna_per_rxn
+        self.dna_XFR_bpwd_mix = bpw*dna_per_rxn_10x
+        self.water_XFR_bpwd_mix = bpw*(dna_per_rxn-dna_per_rxn_10x)
+
+        # one R_mix tube per R concentration
+        R_waste = self.R_reps*waste('R_mix')
+        self.bpwd_mix_xfer_R_mix = self.bpwd_rxn*R_waste
+        self.R_rxn = [per_rxn(c, orig_R_conc, tot_rxn_vol) for c in self.R_concs]
+        self.R_woff_rxn = [self.max_vol_R_per_rxn-v for v in self.R_rxn]
+        self.R_mix_primer = [v*R_waste for v in self.R_rxn]
+        self.R_mix_water = [v*R_waste for v in self.R_woff_rxn]
+        self.R_mix_rxn = self.bpwd_rxn+self.max_vol_R_per_rxn
+
+        # one F intermediate tube per F concentration; max_vol_F_per_rxn of it per well
+        self.F_int_vol = F_int_vol
+        self.F_int_conc = [c/1000*tot_rxn_vol/self.max_vol_F_per_rxn for c in self.F_concs]
+        self.F_mix_primer = [c*F_int_vol/orig_F_conc for c in self.F_int_conc]
+        self.F_mix_water = [F_int_vol-v for v in self.F_mix_primer]
+
+        # tube totals
+        self.BPW_mix_tot = self.BPW_rxn*(1+percent_waste)*self.tot_rxns
+        self.sN_mix_tot = (self.BWP_mix_xfer_sN_mix+self.std_woff_add_to_sN_mix
+                           + self.F_add_to_sN_mix+self.R_add_to_sN_mix)
+        self.bpwd_mix_tot = self.bpw_mix_xfer_bpwd_mix+self.std_DNA_xfer_to_bpwd_mix
+        self.R_mix_tot = [self.bpwd_mix_xfer_R_mix+p+w for p, w in zip(self.R_mix_primer, self.R_mix_water)]
+
+    def layout(self):
+        """Plate well name -> ('sample', R index, F index, rep) / ('std', level, rep) / ('NTC', rep)."""
+        n_R, n_cols = len(self.R_concs), len(self.F_concs)*self.cell_reps
+        if n_R > self.plate_rows or n_cols > self.plate_cols:
+            raise ValueError('{0} R x {1} columns does not fit a {2}x{3} plate'.format(
+                n_R, n_cols, self.plate_rows, self.plate_cols))
+        wells = {}
+        for i in range(n_R):
+            for j in range(len(self.F_concs)):
+                for r in range(self.cell_reps):
+                    wells[ROWS[i]+str(j*self.cell_reps+r+1)] = ('sample', i, j, r)
+        free = [ROWS[i]+str(c+1) for i in range(self.plate_rows) for c in range(self.plate_cols)
+                if ROWS[i]+str(c+1) not in wells]
+        controls = [('std', k, r) for k in range(self.std_levels) for r in range(self.std_NTC_reps)]
+        controls += [('NTC', r) for r in range(self.tot_NTCs)]
+        if len(controls) > len(free):
+            raise ValueError('{0} standard/NTC wells but only {1} free wells'.format(
+                len(controls), len(free)))
+        wells.update(zip(free, controls))
+        return wells
+
+    def R_mix_name(self, i):
+        return 'R_mix_{0}'.format(i+1)
+
+    def F_int_name(self, j):
+        return 'fwd_{0}'.format(j+1)
+
+    def _control_mixes(self):
+        """(control, intermediate tube, DNA source) for each standard and the NTC."""
+        mixes = [(('std', k), 'std_{0}mix'.format(k+1), 'std_{0}'.format(k+1)) for k in range(self.std_levels)]
+        if self.tot_NTCs:
+            mixes.append((('NTC',), 'NTC_mix', 'water'))
+        return mixes
+
+    def transfers(self):
+        """The run as Transfer steps (tubes by script name, plate wells via plate_well)."""
+        steps = []
+
+        def add(source, dest, volume, liquid=None, touches_dest=True):
+            if volume > 1e-9:
+                steps.append(Transfer(source, dest, volume, liquid or source, pipette_for(volume), touches_dest))
+
+        wells = sorted(self.layout().items(), key=lambda kv: (int(kv[0][1:]), kv[0][0]))
+        # standards/NTC mix, the per-standard tubes, then the control wells
+        if self.tot_sds_NTC:
+            add('BPW_mix', 'sN_mix', self.BWP_mix_xfer_sN_mix, touches_dest=False)
+            add('water', 'sN_mix', self.std_woff_add_to_sN_mix, touches_dest=False)
+            add('fwd_10uM', 'sN_mix', self.F_add_to_sN_mix)
+            add('rev_10uM', 'sN_mix', self.R_add_to_sN_mix)
+            for _, tube, _ in self._control_mixes():
+                add('sN_mix', tube, self.sN_mix_xfer_to_stds_mix, touches_dest=False)
+            for control, tube, dna in self._control_mixes():
+                add(dna, tube, self.std_DNA_xfer_to_stds_mix)
+                for well, what in wells:
+                    if what[:-1] == control:
+                        add(tube, plate_well(well), self.std_well_vol)
+        # sample mix with DNA, split into one R_mix tube per R concentration
+        add('BPW_mix', 'bpwd_mix', self.bpw_mix_xfer_bpwd_mix, touches_dest=False)
+        add('std_dna', 'bpwd_mix', self.dna_XFR_bpwd_mix)
+        add('water', 'bpwd_mix', self.water_XFR_bpwd_mix, touches_dest=False)
+        for i in range(len(self.R_concs)):
+            add('bpwd_mix', self.R_mix_name(i), self.bpwd_mix_xfer_R_mix, touches_dest=False)
+        for i in range(len(self.R_concs)):
+            add('rev_10uM', self.R_mix_name(i), self.R_mix_primer[i])
+        for i in range(len(self.R_concs)):
+            add('water', self.R_mix_name(i), self.R_mix_water[i])
+        # R mix into the first well of each cell
+        firsts = {}
+        for well, what in wells:
+            if what[0] == 'sample' and what[3] == 0:
+                firsts[what[1:3]] = well
+        for (i, j), well in sorted(firsts.items()):
+            add(self.R_mix_name(i), plate_well(well), self.R_mix_rxn*self.cell_reps, touches_dest=False)
+        # F intermediate tubes, then F into each cell and out to its replicates
+        for j in range(len(self.F_concs)):
+            add('water', self.F_int_name(j), self.F_mix_water[j], touches_dest=False)
+        for j in range(len(self.F_concs)):
+            add('fwd_10uM', self.F_int_name(j), self.F_mix_primer[j])
+        for j in range(len(self.F_concs)):
+            for i in range(len(self.R_concs)):
+                first = firsts[(i, j)]
+                add(self.F_int_name(j), plate_well(first), self.max_vol_F_per_rxn*self.cell_reps)
+                for well, what in wells:
+                    if what[0] == 'sample' and what[1:3] == (i, j) and what[3] > 0:
+                        add(plate_well(first), plate_well(well), self.R_mix_rxn+self.max_vol_F_per_rxn)
+        return steps
+
+    def stocks_needed(self):
+        return stocks_needed(self.transfers())
+
+
+def stocks_needed(steps):
+    """ul drawn from each tube nothing is pipetted into (stocks, water, DNA)."""
+    filled = {t.dest for t in steps}
+    need = {}
+    for t in steps:
+        if t.source not in filled:
+            need[t.source] = need.get(t.source, 0)+t.volume
+    return need
+
+
+def run_plan(steps, resolve, pipettes, mix_reps=3, capacity=None, ledger=None):
+    """Pipette `steps` (Transfer list) on the robot.
+
+    resolve: callable mapping a Transfer endpoint (tube name or
+        plate_well(name)) to a Well
+    pipettes: {'p20': p20, 'p300': p300}
+    capacity: per pipette name, ul per aspiration (default: tip capacity)
+    ledger: otlib.ledger.VolumeLedger with the hand-loaded tubes tracked;
+        aspirations and mixes then follow the liquid level instead of the
+        default 1 mm clearance (robot-filled tubes are tracked as they fill)
+    Wells that received liquid are mixed before they are first aspirated
+    from; tips follow plan_tips (kept for repeat draws from a clean source).
+    """
+    plan = plan_tips(steps)
+    capacity = capacity or {}
+    if ledger is not None:
+        pipettes = {name: TrackedPipette(pip, ledger) for name, pip in pipettes.items()}
+    received = {}  # endpoint -> ul put in so far
+    mixed = set()
+    for t, new_tip in zip(steps, plan.new_tip):
+        pip = pipettes[t.pipette]
+        if new_tip and pip.has_tip:
+            pip.drop_tip()
+        if not pip.has_tip:
+            pip.pick_up_tip()
+        source, dest = resolve(t.source), resolve(t.dest)
+        max_vol = capacity.get(t.pipette) or tip_capacity(pip)
+        if t.source in received and t.source not in mixed:
+            pip.mix(mix_reps, min(max_vol, received[t.source]*0.8), source)
+            mixed.add(t.source)
+        if hasattr(pip, 'wait_before'):  # ChilledPipette: reach temperature before drawing
+            pip.wait_before(dest)
+        n = n_parts(t.volume, max_vol)
+        for _ in range(n):
+            pip.aspirate(t.volume/n, source)
+            pip.dispense(t.volume/n, dest)
+            pip.blow_out(dest.top())
+        received[t.dest] = received.get(t.dest, 0)+t.volume
+        mixed.discard(t.dest)
+    for pip in pipettes.values():
+        if pip.has_tip:
+            pip.drop_tip()
+    return plan
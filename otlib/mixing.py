@@ -0,0 +1,83 @@
+# Mixing sized to the tube instead of fixed low/mid/high ladders.
+# mix_plan() picks cycles, mix volume and heights for `volume` ul of a
+# liquid class in a tube; adaptive_mix() runs it:
+#
+#   adaptive_mix(p300, std_wells[i], '1.5ml', 1000)            # 6 x 200ul over 3 heights
+#   adaptive_mix(p300, beads, '50ml', 30000, liquid='beads')   # as many cycles as it needs
+#
+# Model: each cycle exchanges JET x the mix volume with the rest of the tube
+# (the dispense jet entrains about as much again), scaled by the liquid
+# class's MIX_EFFICIENCY. What is left unmixed after n cycles is
+# (1 - exchanged fraction)^n; cycles are added until that is below TARGET.
+# Cycles are spread from the bottom to just under the surface.
+import math
+from collections import namedtuple
+
+from otlib.heights import liquid_height, TUBES
+from otlib.liquids import liquid_class
+from otlib.log import get_log
+from otlib.volumes import capacity as tip_capacity
+
+TARGET = 0.05  # unmixed fraction left after mixing
+JET = 2.0  # tube volume turned over per ul mixed
+MIX_FRACTION = 0.5  # largest mix volume, as a fraction of the tube volume
+MIN_CYCLES, MAX_CYCLES = 2, 30
+MIX_BOTTOM = 2  # mm, lowest mix height
+SUBMERGE = 2  # mm the tip stays under the surface while aspirating
+LEVEL_SPACING = 6  # mm between mix heights; shorter columns mix at one height
+
+log = get_log('mixing')
+
+# fraction of the ideal exchange per cycle; viscous liquids mix slower
+MIX_EFFICIENCY = {
+    'water': 1.0,
+    'buffer': 1.0,
+    'ethanol': 1.0,
+    'dna': 0.9,
+    'mastermix': 0.6,
+    'beads': 0.5,
+}
+
+# cycles per height, mix volume (ul), heights (mm from the bottom), rate,
+# and the unmixed fraction the plan reaches
+MixPlan = namedtuple('MixPlan', 'cycles volume heights rate residual')
+
+
+def mix_plan(tube, volume, capacity, liquid='water', target=TARGET):
+    """MixPlan for `volume` ul of `liquid` in `tube` (a heights.TUBES name or None for plate wells)."""
+    lc = liquid_class(liquid)
+    mix_vol = min(capacity, volume*MIX_FRACTION)
+    exchanged = min(1.0, MIX_EFFICIENCY.get(liquid, 1.0)*JET*mix_vol/volume) if volume else 1.0
+    if exchanged >= 1.0:
+        n = MIN_CYCLES
+    else:
+        n = math.ceil(math.log(target)/math.log(1-exchanged))
+    n = max(MIN_CYCLES, min(MAX_CYCLES, n))
+    residual = (1-exchanged)**n
+    top = MIX_BOTTOM
+    if tube in TUBES:
+        top = max(MIX_BOTTOM, liquid_height(tube, volume-mix_vol)-SUBMERGE)
+    levels = max(1, min(3, int((top-MIX_BOTTOM)//LEVEL_SPACING)+1, n))
+    if levels == 1:
+        heights = [MIX_BOTTOM]
+    else:
+        heights = [round(MIX_BOTTOM+(top-MIX_BOTTOM)*i/(levels-1), 1) for i in range(levels)]
+    # most cycles at the top, where the jet reaches the whole column
+    cycles = [n//levels]*levels
+    cycles[-1] += n-sum(cycles)
+    return MixPlan(cycles, round(mix_vol, 1), heights, min(lc.aspirate_rate, lc.dispense_rate), residual)
+
+
+def adaptive_mix(pipette, well, tube, volume, liquid='water', capacity=None, target=TARGET):
+    """Mix `well` holding `volume` ul per mix_plan(); returns the plan.
+
+    capacity: ul per mix cycle (default: what the pipette's tips hold)
+    """
+    plan = mix_plan(tube, volume, capacity or tip_capacity(pipette), liquid, target)
+    if plan.residual > target:
+        log.warning('target not reached', well=well, volume=volume, liquid=liquid,
+                    residual=plan.residual, cycles=sum(plan.cycles))
+    for reps, h in zip(plan.cycles, plan.heights):
+        if reps:
+            pipette.mix(reps, plan.volume, well.bottom(h), rate=plan.rate)
+    return plan
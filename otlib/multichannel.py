@@ -0,0 +1,93 @@
+# Column-wise plate-to-plate transfers with an 8-channel pipette.
+# plan_columns() pairs up source and destination wells; where a whole
+# column (A-H) goes to the same rows of one destination column it becomes
+# a single multi-channel step, everything else stays well by well for the
+# single-channel pipette.
+#
+#   def xfer(pip, source, dest):
+#       pip.aspirate(5, source.bottom(1))
+#       pip.dispense(5, dest.bottom(1))
+#   column_transfer(ww_plate.wells(), pcr_plate.wells(), xfer, multi=p20m, single=p20)
+#
+# A multi-channel step gets the top (row A) wells of the two columns, which
+# is where the OT-2 addresses an 8-channel pipette.
+import re
+from collections import namedtuple
+
+ROWS = 'ABCDEFGHIJKLMNOP'
+
+# mode: 'column' or 'single'; source/dest: wells (row A of the column for 'column')
+Step = namedtuple('Step', 'mode source dest')
+
+
+def row_col(well):
+    """('A', 1) for well A1."""
+    m = re.match(r'([A-Z]+)(\d+)$', well.well_name)
+    return m.group(1), int(m.group(2))
+
+
+def plan_columns(sources, dests, channels=8):
+    """Steps for moving sources[i] -> dests[i], full columns merged."""
+    sources, dests = list(sources), list(dests)
+    if len(sources) != len(dests):
+        raise ValueError('{0} sources for {1} destinations'.format(len(sources), len(dests)))
+    groups = {}
+    order = []
+    for src, dst in zip(sources, dests):
+        (s_row, s_col), (d_row, d_col) = row_col(src), row_col(dst)
+        key = (id(src.parent), s_col, id(dst.parent), d_col)
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append((s_row, d_row, src, dst))
+    full = list(ROWS[:channels])
+    steps = []
+    for key in order:
+        pairs = groups[key]
+        rows = [p[0] for p in pairs]
+        if channels > 1 and rows == full and all(s == d for s, d, _, _ in pairs):
+            steps.append(Step('column', pairs[0][2], pairs[0][3]))
+        else:
+            steps.extend(Step('single', src, dst) for _, _, src, dst in pairs)
+    return steps
+
+
+def column_transfer(sources, dests, step, multi=None, single=None, new_tip='always'):
+    """Run `step(pipette, source, dest)` for each planned step.
+
+    multi: 8-channel pipette for full columns; without it every well goes
+        to `single`
+    new_tip: 'always' (fresh tip(s) per step), 'column' (single-channel
+        wells of one column share a tip) or 'never' (caller handles tips)
+    Returns the plan.
+    """
+    if new_tip not in ('always', 'column', 'never'):
+        raise ValueError('new_tip must be always, column or never, not {0!r}'.format(new_tip))
+    channels = getattr(multi, 'channels', 8) if multi is not None else 1
+    plan = plan_columns(sources, dests, channels)
+    held = None  # source column the single-channel tip is still on
+    for s in plan:
+        pip = multi if s.mode == 'column' else single
+        if pip is None:
+            raise ValueError('no single-channel pipette for partial column at {0}'.format(s.source))
+        col = (id(s.source.parent), row_col(s.source)[1])
+        share = new_tip == 'column' and s.mode == 'single'
+        if held is not None and not (share and held == col):
+            single.drop_tip()
+            held = None
+        if new_tip != 'never' and held is None:
+            pip.pick_up_tip()
+        step(pip, s.source, s.dest)
+        if share:
+            held = col
+        elif new_tip != 'never':
+            pip.drop_tip()
+    if held is not None:
+        single.drop_tip()
+    return plan
+
+
+def cycles(plan):
+    """(multi-channel steps, single-channel steps) in a plan."""
+    n_col = sum(1 for s in plan if s.mode == 'column')
+    return n_col, len(plan)-n_col
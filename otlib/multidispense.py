@@ -0,0 +1,79 @@
+# Multi-dispense: one aspiration serves several wells.
+# The hand-written version in the BioER/lyobead scripts is: aspirate 200ul,
+# dispense one dispVol back to condition the tip, dispense to N wells, then
+# return what's left to the source. plan_multi_dispense() works out N from
+# the tip capacity instead of fixing it per script.
+from collections import namedtuple
+
+from otlib.ledger import well_of
+
+# volume: ul to aspirate; wells: wells served by this aspiration;
+# condition: ul dispensed back first; reserve: ul left in the tip at the end
+Aspiration = namedtuple('Aspiration', 'volume wells condition reserve')
+
+
+def wells_per_aspiration(max_vol, per_well, condition_vol=None, reserve=None):
+    condition = per_well if condition_vol is None else condition_vol
+    reserve = per_well if reserve is None else reserve
+    return int((max_vol-condition-reserve)/per_well + 1e-9)
+
+
+def plan_multi_dispense(max_vol, per_well, n_wells, condition_vol=None, reserve=None,
+                        min_dispense=0, max_wells=None):
+    """Aspirations needed to put `per_well` ul into `n_wells` wells.
+
+    max_vol: tip capacity (200 for the 200ul filter tips on a p300)
+    condition_vol: dispensed back to the source before the first well
+        (defaults to per_well, like the hand-written loops)
+    reserve: left in the tip after the last well so every dispense is a
+        full-accuracy one (defaults to per_well)
+    min_dispense: smallest volume the pipette dispenses accurately
+    max_wells: cap on wells per aspiration (e.g. 8 for one column)
+    """
+    condition = per_well if condition_vol is None else condition_vol
+    reserve = per_well if reserve is None else reserve
+    if per_well < min_dispense:
+        raise ValueError('{0}ul per well is below the {1}ul accuracy limit'.format(per_well, min_dispense))
+    per_asp = wells_per_aspiration(max_vol, per_well, condition, reserve)
+    if max_wells:
+        per_asp = min(per_asp, max_wells)
+    if per_asp < 1:
+        raise ValueError('{0}ul per well plus {1}ul conditioning and {2}ul reserve exceeds {3}ul'.format(
+            per_well, condition, reserve, max_vol))
+    plan = []
+    left = n_wells
+    while left > 0:
+        k = min(per_asp, left)
+        plan.append(Aspiration(condition+k*per_well+reserve, k, condition, reserve))
+        left -= k
+    return plan
+
+
+def multi_dispense(pipette, source, dests, per_well, plan=None, max_vol=None,
+                   dest_loc=None, rate=1.0, after_dispense=None):
+    """Run a multi-dispense plan with `pipette` (tip already attached).
+
+    source: Well/Location to aspirate from, or a callable taking the
+        aspiration index and returning one (e.g. from a heights list)
+    dest_loc: callable mapping a destination well to its dispense Location
+        (default: the well itself)
+    after_dispense: optional callable(well), e.g. to pause or touch off
+    """
+    dests = list(dests)
+    if plan is None:
+        plan = plan_multi_dispense(max_vol or pipette.max_volume, per_well, len(dests))
+    wells = iter(dests)
+    for i, asp in enumerate(plan):
+        src = source(i) if callable(source) else source
+        pipette.aspirate(asp.volume, src, rate=rate)
+        if asp.condition:
+            pipette.dispense(asp.condition, src, rate=rate)  # condition the tip
+        for _ in range(asp.wells):
+            well = next(wells)
+            pipette.dispense(per_well, dest_loc(well) if dest_loc else well, rate=rate)
+            if after_dispense is not None:
+                after_dispense(well)
+        if asp.reserve:
+            pipette.dispense(asp.reserve, src)  # return the reserve
+        pipette.blow_out(well_of(src).top() if well_of(src) is not None else src)
+    return plan
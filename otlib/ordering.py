@@ -0,0 +1,116 @@
+# Visit order for destination wells that keeps gantry travel short.
+# Nearest-neighbour walk from the source, then 2-opt until no segment
+# reversal shortens the path. Distances are XY only; z is the same arc
+# height for every well-to-well hop. refill_groups() plans round trips:
+# each group starts and ends at the source, so wells are grouped by
+# where they are (farthest well first, then its nearest neighbours)
+# before each trip is ordered.
+#
+#   for dest in travel_order(wells, start=mmix):
+#       p300.dispense(dispVol, dest.bottom(2))
+#
+#   for group in refill_groups(wells, start=mmix, per_refill=8):
+#       p300.aspirate(...)        # one aspiration per group
+#       for dest in group: ...
+import math
+
+
+def xy(item):
+    """(x, y) of a Well, Location or (x, y[, z]) tuple."""
+    if hasattr(item, 'well_name'):
+        item = item.top()
+    point = getattr(item, 'point', item)
+    return (point[0], point[1])
+
+
+def _dist(a, b):
+    return math.hypot(a[0]-b[0], a[1]-b[1])
+
+
+def path_length(items, start=None, key=xy):
+    pts = ([key(start)] if start is not None else []) + [key(i) for i in items]
+    return sum(_dist(a, b) for a, b in zip(pts, pts[1:]))
+
+
+def _nearest_neighbour(pts, start):
+    todo = list(range(len(pts)))
+    order = []
+    here = start if start is not None else pts[0]
+    while todo:
+        nxt = min(todo, key=lambda i: (_dist(here, pts[i]), i))
+        todo.remove(nxt)
+        order.append(nxt)
+        here = pts[nxt]
+    return order
+
+
+def _two_opt(order, pts, start, end=None):
+    # open path; the start point (if any) stays fixed in front and the
+    # end point (if any) fixed at the back
+    path = ([start] if start is not None else []) + [pts[i] for i in order] + ([end] if end is not None else [])
+    idx = ([None] if start is not None else []) + list(order) + ([None] if end is not None else [])
+    first = 1 if start is not None else 0
+    last = len(path)-1 if end is not None else len(path)
+    n = len(path)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(first, last-1):
+            for j in range(i+1, last):
+                a = path[i-1] if i > 0 else None
+                b, c = path[i], path[j]
+                d = path[j+1] if j+1 < n else None
+                before = (_dist(a, b) if a is not None else 0) + (_dist(c, d) if d is not None else 0)
+                after = (_dist(a, c) if a is not None else 0) + (_dist(b, d) if d is not None else 0)
+                if after < before - 1e-9:
+                    path[i:j+1] = path[i:j+1][::-1]
+                    idx[i:j+1] = idx[i:j+1][::-1]
+                    improved = True
+    return idx[first:last]
+
+
+def plan_order(wells, start=None, key=xy, two_opt=True):
+    """`wells` reordered to shorten the walk from `start` through all of them."""
+    wells = list(wells)
+    if len(wells) < 2:
+        return wells
+    pts = [key(w) for w in wells]
+    origin = key(start) if start is not None else None
+    order = _nearest_neighbour(pts, origin)
+    if two_opt:
+        order = _two_opt(order, pts, origin)
+    return [wells[i] for i in order]
+
+
+def travel_order(wells, start=None, key=xy):
+    """Iterate over `wells` in the planned order."""
+    return iter(plan_order(wells, start, key))
+
+
+def trips_length(groups, start, key=xy):
+    """Travel of source -> group -> source round trips, one per group."""
+    return sum(path_length(list(g) + [start], start, key) for g in groups)
+
+
+def refill_groups(wells, start, per_refill, key=xy):
+    """`wells` in groups of `per_refill`, one aspiration and round trip each.
+
+    Each group is seeded with the well farthest from `start` and filled
+    with the wells nearest to it, then ordered as a closed trip from and
+    back to `start`; the groups come nearest trip first.
+    """
+    wells = list(wells)
+    pts = [key(w) for w in wells]
+    origin = key(start)
+    todo = set(range(len(wells)))
+    groups = []
+    while todo:
+        seed = max(todo, key=lambda i: (_dist(origin, pts[i]), -i))
+        group = sorted(todo, key=lambda i: (_dist(pts[seed], pts[i]), i))[:per_refill]
+        todo -= set(group)
+        order = _nearest_neighbour([pts[i] for i in group], origin)
+        order = _two_opt(order, [pts[i] for i in group], origin, origin)
+        groups.append([group[i] for i in order])
+    groups.sort(key=lambda g: (path_length([pts[i] for i in g] + [origin], origin, key=lambda p: p), g))
+    for g in groups:
+        yield [wells[i] for i in g]
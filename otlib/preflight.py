@@ -0,0 +1,177 @@
+# Pre-flight checks on a simulated run, before reagents go on the deck.
+#
+#   python -m otlib.preflight "BioER MiniS 16-well qPCR device/LT Variable rxn V1.3.1.py"
+#   python -m otlib.preflight                      # every protocol, in parallel
+#
+# Replays the command stream from otlib.sim and reports:
+#   - aspirate/dispense without a tip, more ul in the tip than it holds
+#     (tip size from the tip rack name) or dispensing more than is in it
+#   - heights below the well bottom, or aspirating above the well top
+#   - wells filled by the robot that are overfilled, or drawn below what
+#     the robot put in (a warning: the tube may be pre-loaded by hand), and
+#     aspirating above the liquid surface of a modelled tube (the symptom
+#     of a stale index into a heights list)
+#   - hand-loaded sources whose total draw exceeds the well
+#   - more tips used than the racks loaded
+# Errors make the run exit 1; warnings are printed only.
+import argparse
+import os
+import re
+import sys
+from collections import namedtuple
+
+from otlib.decktime import leaves
+from otlib.heights import liquid_height
+from otlib.ledger import TUBE_SIZES
+from otlib.tips import tip_budget
+
+Issue = namedtuple('Issue', 'level index command message')
+
+SURFACE_MARGIN = 1.0  # mm above the modelled surface before it counts as air
+TOLERANCE = 0.01  # ul
+
+
+def _tube(cmd):
+    max_vol = cmd.get('well_max_volume') or 0
+    for lo, hi, tube in TUBE_SIZES:
+        if lo < max_vol <= hi:
+            return tube
+    return None
+
+
+def _tip_volumes(deck):
+    """mount -> ul the loaded tips hold, from names like ..._filtertiprack_200ul."""
+    slots = {lw['slot']: lw['load_name'] for lw in deck.get('labware', [])}
+    out = {}
+    for mount, pip in deck.get('pipettes', {}).items():
+        for slot in pip.get('tip_racks', []):
+            m = re.search(r'_(\d+)ul', slots.get(slot, ''))
+            if m:
+                out[mount] = min(out.get(mount, pip['max_volume']), int(m.group(1)))
+    return out
+
+
+def _where(cmd):
+    return '{0} of {1} on {2}'.format(cmd.get('well'), cmd.get('labware'), cmd.get('slot'))
+
+
+def check(commands, deck=None):
+    """Issues found replaying `commands` (sim records) on `deck`."""
+    deck = deck or {}
+    issues = []
+    tip_vol = _tip_volumes(deck)
+    has_tip, in_tip = {}, {}
+    robot = {}  # well -> ul, for wells the robot filled (first touched by a dispense)
+    drawn = {}  # well -> [net ul drawn, most drawn, command], for hand-loaded sources
+    preload = {}  # robot-filled well -> [ul that must already be in it, index, command]
+
+    def add(level, i, cmd, msg):
+        issues.append(Issue(level, i, cmd['name'], msg))
+
+    leaf = {id(c) for c in leaves(commands)}
+    for i, cmd in enumerate(commands):
+        if id(cmd) not in leaf:
+            continue
+        name, mount = cmd['name'], str(cmd.get('mount'))
+        if name == 'pick_up_tip':
+            has_tip[mount], in_tip[mount] = True, 0.0
+            continue
+        if name in ('drop_tip', 'return_tip'):
+            has_tip[mount], in_tip[mount] = False, 0.0
+            continue
+        if name == 'blow_out':
+            in_tip[mount] = 0.0
+            continue
+        if name not in ('aspirate', 'dispense'):
+            continue
+        vol = cmd.get('volume') or 0.0
+        if not has_tip.get(mount):
+            add('error', i, cmd, '{0} without a tip at {1}'.format(name, _where(cmd)))
+        h, depth = cmd.get('height'), cmd.get('well_depth')
+        if h is not None and h < 0:
+            add('error', i, cmd, 'height {0} mm is below the bottom of {1}'.format(h, _where(cmd)))
+        if name == 'aspirate' and h is not None and depth is not None and h > depth:
+            add('error', i, cmd, 'aspirating {0} mm above the top of {1}'.format(round(h-depth, 1), _where(cmd)))
+        key = (cmd.get('slot'), cmd.get('labware'), cmd.get('well'))
+        if name == 'aspirate':
+            in_tip[mount] = in_tip.get(mount, 0.0) + vol
+            cap = tip_vol.get(mount, cmd.get('max_volume'))
+            if cap and in_tip[mount] > cap + TOLERANCE:
+                add('error', i, cmd, '{0:.1f} ul in a {1} ul tip'.format(in_tip[mount], cap))
+            if cmd.get('well') is None:
+                continue
+            if key not in robot:
+                d = drawn.setdefault(key, [0.0, 0.0, cmd])
+                d[0] += vol
+                d[1:] = max(d[1], d[0]), cmd
+            else:
+                if vol > robot[key] + TOLERANCE:
+                    # more than the robot put in: liquid was loaded by hand as well
+                    preload[key] = [preload.get(key, [0.0])[0] + vol-robot[key], i, cmd]
+                    robot[key] = vol
+                tube = _tube(cmd)
+                if key not in preload and tube and h is not None \
+                        and h > liquid_height(tube, robot[key]) + SURFACE_MARGIN:
+                    add('warning', i, cmd, 'aspirating at {0} mm, surface of {1:.0f} ul is at {2:.1f} mm in {3}'.format(
+                        h, robot[key], liquid_height(tube, robot[key]), _where(cmd)))
+                robot[key] -= vol
+        else:
+            if vol > in_tip.get(mount, 0.0) + TOLERANCE:
+                add('error', i, cmd, 'dispensing {0:.1f} ul with {1:.1f} ul in the tip'.format(vol, in_tip.get(mount, 0.0)))
+            in_tip[mount] = max(0.0, in_tip.get(mount, 0.0)-vol)
+            if cmd.get('well') is None:
+                continue
+            if key in drawn:  # back into a source, e.g. mixing
+                drawn[key][0] -= vol
+                continue
+            robot[key] = robot.get(key, 0.0) + vol
+            max_vol = cmd.get('well_max_volume')
+            if max_vol and robot[key] > max_vol + TOLERANCE:
+                add('error', i, cmd, '{0} overfilled: {1:.0f} ul in a {2:.0f} ul well'.format(_where(cmd), robot[key], max_vol))
+
+    for key, (_, total, cmd) in drawn.items():
+        max_vol = cmd.get('well_max_volume')
+        if max_vol and total > max_vol + TOLERANCE:
+            add('error', len(commands), cmd, '{0} ul drawn from {1}, which holds {2:.0f} ul'.format(
+                round(total, 1), _where(cmd), max_vol))
+    for key, (ul, i, cmd) in preload.items():
+        add('warning', i, cmd, '{0} must hold {1:.1f} ul before the robot fills it (or is drawn below empty)'.format(
+            _where(cmd), ul))
+    for mount, r in tip_budget(commands, deck).items():
+        if r['tips'] > r['available']:
+            issues.append(Issue('error', len(commands), 'pick_up_tip', '{0} uses {1} tips, {2} loaded'.format(
+                r['pipette'], r['tips'], r['available'])))
+    return issues
+
+
+def main(argv=None):
+    from otlib import batch, sim
+    parser = argparse.ArgumentParser(description='Pre-flight checks of simulated protocols.')
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    parser.add_argument('--limit', type=int, default=10, help='issues shown per protocol and kind')
+    args = parser.parse_args(argv)
+    status = 0
+    for result in sorted(batch.run_batch(batch.expand(args.paths), args.jobs), key=lambda r: r['path']):
+        name = os.path.relpath(result['path'], sim.ROOT)
+        if not result['ok']:
+            print('{0}: simulation failed: {1}'.format(name, result['error']))
+            status = 1
+            continue
+        issues = check(result['commands'], result['deck'])
+        errors = [x for x in issues if x.level == 'error']
+        print('{0}: {1}'.format(name, 'ok' if not issues else '{0} errors, {1} warnings'.format(
+            len(errors), len(issues)-len(errors))))
+        shown = {}
+        for x in issues:
+            kind = (x.level, x.command)
+            shown[kind] = shown.get(kind, 0) + 1
+            if shown[kind] <= args.limit:
+                print('  {0:<7} #{1:<5} {2}'.format(x.level, x.index, x.message))
+        if errors:
+            status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# Long-lived simulation server: pay the opentrons import and custom labware
+# read once, then check protocols in well under a second each.
+#
+#   python -m otlib.server                         # listens on 127.0.0.1:31960
+#   python -m otlib.server check "BioER MiniS 16-well qPCR device/LT Variable rxn V1.4 Q16 Validation HK and ER.py"
+#   curl -s -X POST 'localhost:31960/simulate?path=/abs/path/protocol.py'
+#   curl -s -X POST --data-binary @protocol.py localhost:31960/simulate
+#
+# POST /simulate takes ?path= (a file the server can read) or the protocol
+# source as the request body and returns the sim.simulate_file() result
+# with the decktime estimate under 'decktime' (add &commands=0 to leave the
+# command list out). Results are cached by file content and the otlib
+# sources, so re-checking an unchanged file is free; after an edit to
+# otlib/*.py the otlib modules are re-imported and the cache starts over.
+# GET /health answers {"ok": true}.
+#
+# Requests are handled one at a time: the simulator is not thread-safe.
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from otlib import decktime, sim
+
+HOST, PORT = '127.0.0.1', 31960
+CACHE_SIZE = 64
+OTLIB = os.path.dirname(os.path.abspath(__file__))
+
+
+def otlib_version():
+    """Digest of the otlib sources (names, sizes, mtimes); changes with any edit."""
+    h = hashlib.sha1()
+    for name in sorted(os.listdir(OTLIB)):
+        if name.endswith('.py') and name != 'server.py':
+            st = os.stat(os.path.join(OTLIB, name))
+            h.update('{0}:{1}:{2};'.format(name, st.st_size, st.st_mtime_ns).encode())
+    return h.hexdigest()
+
+
+def reload_otlib():
+    """Re-import the otlib modules (all but this one) so edits take effect."""
+    global decktime, sim
+    for name in [m for m in sys.modules if m.startswith('otlib.') and m != 'otlib.server']:
+        del sys.modules[name]
+    importlib.invalidate_caches()
+    sim = importlib.import_module('otlib.sim')
+    decktime = importlib.import_module('otlib.decktime')
+
+
+class Simulator:
+    """Warm simulator with a small result cache keyed by protocol and otlib source."""
+
+    def __init__(self, root=sim.ROOT):
+        self.labware = sim.warm_up(root)
+        self.cache = {}
+        self.otlib = otlib_version()
+
+    def check(self, path=None, source=None):
+        if source is None:
+            with open(path, 'rb') as f:
+                source = f.read()
+        version = otlib_version()
+        if version != self.otlib:
+            reload_otlib()
+            self.cache.clear()
+            self.otlib = version
+        key = hashlib.sha1(source + version.encode()).hexdigest()
+        if key in self.cache:
+            return dict(self.cache[key], cached=True, path=path or self.cache[key]['path'])
+        if path is None:
+            with tempfile.NamedTemporaryFile('wb', suffix='.py', delete=False) as f:
+                f.write(source)
+            try:
+                result = sim.simulate_file(f.name, self.labware)
+            finally:
+                os.unlink(f.name)
+            result['path'] = '<posted>'
+        else:
+            result = sim.simulate_file(path, self.labware)
+        if result['ok']:
+            result['decktime'] = decktime.estimate(result['commands'], result['deck'])
+        if len(self.cache) >= CACHE_SIZE:
+            self.cache.pop(next(iter(self.cache)))
+        self.cache[key] = result
+        return dict(result, cached=False)
+
+
+class Handler(BaseHTTPRequestHandler):
+    simulator = None  # set by serve()
+
+    def _reply(self, status, body):
+        data = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if urllib.parse.urlsplit(self.path).path == '/health':
+            return self._reply(200, {'ok': True, 'cached': len(self.simulator.cache)})
+        self._reply(404, {'error': 'not found'})
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != '/simulate':
+            return self._reply(404, {'error': 'not found'})
+        query = urllib.parse.parse_qs(url.query)
+        length = int(self.headers.get('Content-Length') or 0)
+        source = self.rfile.read(length) if length else None
+        path = query.get('path', [None])[0]
+        if path is None and source is None:
+            return self._reply(400, {'error': 'need ?path= or the protocol source as the body'})
+        try:
+            result = self.simulator.check(path, None if path else source)
+        except OSError as e:
+            return self._reply(400, {'error': str(e)})
+        if query.get('commands', ['1'])[0] == '0':
+            result.pop('commands', None)
+        self._reply(200, result)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(host=HOST, port=PORT, root=sim.ROOT):
+    start = time.perf_counter()
+    if root not in sys.path:
+        sys.path.insert(0, root)  # protocols import otlib
+    sys.stdin = open(os.devnull)  # input() in a protocol fails instead of hanging
+    Handler.simulator = Simulator(root)
+    server = HTTPServer((host, port), Handler)
+    print('otlib.server on http://{0}:{1} (warm in {2:.1f}s)'.format(host, port, time.perf_counter()-start))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def check(path, host=HOST, port=PORT):
+    """Ask a running server to simulate `path`; returns the result dict."""
+    url = 'http://{0}:{1}/simulate?commands=0&path={2}'.format(
+        host, port, urllib.parse.quote(os.path.abspath(path)))
+    with urllib.request.urlopen(urllib.request.Request(url, data=b'', method='POST')) as resp:
+        return json.load(resp)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Warm protocol simulation server.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    sub = parser.add_subparsers(dest='cmd')
+    sub.add_parser('serve')
+    p_check = sub.add_parser('check', help='simulate files on a running server')
+    p_check.add_argument('paths', nargs='+')
+    args = parser.parse_args(argv)
+    if args.cmd != 'check':
+        serve(args.host, args.port)
+        return 0
+    status = 0
+    for path in args.paths:
+        result = check(path, args.host, args.port)
+        if not result['ok']:
+            print('{0}: simulation failed: {1}'.format(path, result['error']))
+            status = 1
+            continue
+        print(decktime.report(result['decktime'], path))
+        print('  simulated in {0:.2f}s{1}'.format(result['wall_time'], ' (cached)' if result['cached'] else ''))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+# In-process protocol simulation.
+# simulate_file() runs a protocol against the opentrons simulator and
+# returns its command stream as plain dicts (picklable, json-able), so the
+# batch runner, deck-time estimator and checkers never touch opentrons
+# objects. opentrons is imported on first use; call warm_up() once per
+# process to pay the import and custom labware cost up front.
+import contextlib
+import glob
+import io
+import json
+import os
+import time
+
+from otlib.ledger import well_of
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_API_LEVEL = '2.11'
+
+_labware = None
+
+
+def load_custom_labware(root=ROOT):
+    """Custom labware definitions under Labware/, keyed by uri."""
+    defs = {}
+    for path in sorted(glob.glob(os.path.join(root, 'Labware', '**', '*.json'), recursive=True)):
+        with open(path) as f:
+            d = json.load(f)
+        if 'parameters' not in d or 'loadName' not in d['parameters']:
+            continue
+        uri = '{0}/{1}/{2}'.format(d['namespace'], d['parameters']['loadName'], d['version'])
+        defs[uri] = d
+    return defs
+
+
+def warm_up(root=ROOT):
+    """Import opentrons and read custom labware once for this process."""
+    global _labware
+    import opentrons.simulate  # noqa: F401
+    if _labware is None:
+        _labware = load_custom_labware(root)
+    return _labware
+
+
+def is_protocol(path):
+    """True for python files that look like OT-2 protocols (metadata + run)."""
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            src = f.read()
+    except OSError:
+        return False
+    return 'def run(' in src and 'metadata' in src
+
+
+def find_protocols(root=ROOT):
+    paths = []
+    for path in sorted(glob.glob(os.path.join(root, '**', '*.py'), recursive=True)):
+        rel = os.path.relpath(path, root)
+        if rel.startswith('otlib' + os.sep):
+            continue
+        if is_protocol(path):
+            paths.append(path)
+    return paths
+
+
+def _slot(labware):
+    parent = getattr(labware, 'parent', None)
+    while parent is not None and not isinstance(parent, str):  # labware on a module
+        parent = getattr(parent, 'parent', None)
+    return parent
+
+
+def _where(location):
+    # Well or Location -> point, labware and well details
+    if location is None:
+        return {}
+    well = well_of(location)
+    point = location.top().point if hasattr(location, 'well_name') else getattr(location, 'point', None)
+    rec = {}
+    if point is not None:
+        rec['point'] = (round(point.x, 2), round(point.y, 2), round(point.z, 2))
+    if well is not None:
+        labware = well.parent
+        bottom = well.bottom().point.z
+        rec.update({
+            'labware': getattr(labware, 'load_name', str(labware)),
+            'slot': _slot(labware),
+            'well': well.well_name,
+            'well_depth': round(well.top().point.z-bottom, 2),
+            'well_max_volume': getattr(well, 'max_volume', None),
+        })
+        if point is not None:
+            rec['height'] = round(point.z-bottom, 2)
+    return rec
+
+
+def to_record(message, depth=0):
+    """Flatten a broker 'before' message into a plain dict."""
+    payload = message.get('payload', {})
+    rec = {'name': message['name'].split('.')[-1].lower(), 'depth': depth,
+           'text': payload.get('text', '')}
+    instr = payload.get('instrument')
+    if instr is not None:
+        rec['pipette'] = getattr(instr, 'name', str(instr))
+        rec['mount'] = getattr(instr, 'mount', None)
+        rec['max_volume'] = getattr(instr, 'max_volume', None)
+        rec['current_volume'] = getattr(instr, 'current_volume', None)
+        flow = getattr(instr, 'flow_rate', None)
+        if flow is not None and rec['name'] in ('aspirate', 'dispense', 'blow_out'):
+            base = getattr(flow, 'aspirate' if rec['name'] == 'aspirate' else rec['name'])
+            rec['flow_rate'] = base*(payload.get('rate') or 1.0)
+    for key in ('volume', 'rate', 'repetitions'):
+        if payload.get(key) is not None:
+            rec[key] = payload[key]
+    if rec['name'] == 'delay':
+        rec['seconds'] = (payload.get('minutes') or 0)*60 + (payload.get('seconds') or 0)
+    loc = payload.get('location')
+    if loc is None and isinstance(payload.get('locations'), (list, tuple)) and payload['locations']:
+        loc = payload['locations'][0]
+    rec.update(_where(loc))
+    return rec
+
+
+def _deck(ctx):
+    labware = []
+    for slot, item in sorted(ctx.loaded_labwares.items(), key=lambda kv: str(kv[0])):
+        labware.append({
+            'slot': str(slot),
+            'load_name': getattr(item, 'load_name', str(item)),
+            'is_tiprack': bool(getattr(item, 'is_tiprack', False)),
+            'wells': len(item.wells()),
+            'height': round(item.highest_z, 2) if hasattr(item, 'highest_z') else None,
+        })
+    modules = [{'slot': str(slot), 'module': type(mod).__name__}
+               for slot, mod in sorted(ctx.loaded_modules.items(), key=lambda kv: str(kv[0]))]
+    pipettes = {}
+    for mount, instr in ctx.loaded_instruments.items():
+        if instr is None:
+            continue
+        pipettes[str(mount)] = {
+            'name': instr.name,
+            'max_volume': instr.max_volume,
+            'channels': getattr(instr, 'channels', 1),
+            'tip_racks': [str(_slot(rack)) for rack in instr.tip_racks],
+        }
+    speeds = {}
+    try:
+        speeds = {str(axis): s for axis, s in dict(ctx.max_speeds).items()}
+    except Exception:
+        pass
+    return {'labware': labware, 'modules': modules, 'pipettes': pipettes, 'max_speeds': speeds}
+
+
+def simulate_file(path, extra_labware=None, quiet=True):
+    """Simulate one protocol file.
+
+    Returns {'path', 'ok', 'error', 'commands', 'deck', 'wall_time', 'output'}.
+    Protocol exceptions are caught and reported, not raised.
+    """
+    from opentrons import simulate
+    from opentrons.commands import types as command_types
+
+    if extra_labware is None:
+        extra_labware = warm_up()
+    start = time.perf_counter()
+    result = {'path': path, 'ok': False, 'error': None, 'commands': [], 'deck': {}}
+    commands = result['commands']
+    depth = [0]
+
+    def on_message(message):
+        if message.get('$') == 'before':
+            commands.append(to_record(message, depth[0]))
+            depth[0] += 1
+        else:
+            depth[0] -= 1
+
+    out = io.StringIO()
+    redirect = contextlib.redirect_stdout(out) if quiet else contextlib.nullcontext()
+    with redirect:
+        ctx = None
+        unsubscribe = None
+        try:
+            with open(path, encoding='utf-8') as f:
+                src = f.read()
+            ns = {'__name__': '__protocol__', '__file__': path}
+            exec(compile(src, path, 'exec'), ns)
+            level = str(ns.get('metadata', {}).get('apiLevel', DEFAULT_API_LEVEL))
+            ctx = simulate.get_protocol_api(level, extra_labware=extra_labware)
+            unsubscribe = ctx.broker.subscribe(command_types.COMMAND, on_message)
+            ns['run'](ctx)
+            result['ok'] = True
+        except BaseException as e:  # protocol errors, SystemExit, timeouts
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            result['error'] = '{0}: {1}'.format(type(e).__name__, e)
+        finally:
+            if unsubscribe is not None:
+                unsubscribe()
+            if ctx is not None:
+                try:
+                    result['deck'] = _deck(ctx)
+                except Exception:
+                    pass
+    result['output'] = out.getvalue() if quiet else ''
+    result['wall_time'] = time.perf_counter()-start
+    return result
@@ -0,0 +1,82 @@
+# Pre-chill without the manual 10-15 minutes before the run.
+# start() sets the tempdeck target without blocking, so reagent prep that
+# never touches the block runs while it ramps; the wrapped pipettes call
+# wait() only when they first reach for a well on the block.
+#
+#   chill = TempSchedule(tempdeck, 4)
+#   chill.start()                      # right after load_module/load_labware
+#   p300 = chill.guard(p300)
+#   p20 = chill.guard(p20)
+#   ...                                # tube prep runs during the ramp
+#   p20.wait_before(plate['A1'])       # waits for 4C here, once, with an empty tip
+#   p20.aspirate(20, mix_tube)
+#   p20.dispense(20, plate['A1'])      # would wait here, with 20ul in the tip
+#
+# The guard alone only sees the dispense, so call wait_before() (or
+# chill.wait()) before aspirating liquid bound for the block; run_plan()
+# does this per transfer.
+#
+# Needs apiLevel 2.3+ (start_set_temperature / await_temperature).
+from otlib.ledger import well_of
+
+# pipette methods that take locations (positional or keyword)
+MOVES = ('aspirate', 'dispense', 'mix', 'blow_out', 'touch_tip', 'air_gap', 'move_to',
+         'transfer', 'distribute', 'consolidate')
+
+
+class TempSchedule:
+    """Non-blocking ramp of one temperature module, awaited on first use."""
+
+    def __init__(self, module, celsius):
+        self.module = module
+        self.celsius = celsius
+        self.started = False
+        self.reached = False
+
+    def start(self):
+        if not self.started:
+            self.module.start_set_temperature(self.celsius)
+            self.started = True
+        return self
+
+    def wait(self):
+        if not self.started:
+            self.start()
+        if not self.reached:
+            self.module.await_temperature(self.celsius)
+            self.reached = True
+
+    def on_block(self, location):
+        """True if `location` (Well, Location or a list of them) is on the module."""
+        if isinstance(location, (list, tuple)):
+            return any(self.on_block(loc) for loc in location)
+        well = well_of(location)
+        labware = self.module.labware
+        return well is not None and labware is not None and well.parent == labware
+
+    def guard(self, pipette):
+        return ChilledPipette(pipette, self)
+
+
+class ChilledPipette:
+    """InstrumentContext wrapper that awaits the block before touching it."""
+
+    def __init__(self, pipette, schedule):
+        self._pipette = pipette
+        self.schedule = schedule
+
+    def wait_before(self, location):
+        """Wait for the block now if `location` is on it: call before the aspirate."""
+        if self.schedule.on_block(location):
+            self.schedule.wait()
+
+    def __getattr__(self, name):
+        attr = getattr(self._pipette, name)
+        if name not in MOVES or self.schedule.reached:
+            return attr
+
+        def checked(*args, **kwargs):
+            if any(self.schedule.on_block(a) for a in list(args)+list(kwargs.values())):
+                self.schedule.wait()
+            return attr(*args, **kwargs)
+        return checked
@@ -0,0 +1,150 @@
+# Tip budget and tip reuse.
+#
+# plan_tips() decides, for a list of transfers, where a fresh tip is
+# really needed: a tip is kept while it goes back to the same source for
+# the same liquid and has only touched clean destinations (empty wells or
+# wells holding that same liquid). It returns the tip-change points and
+# the tips and racks each pipette needs before the run starts.
+#
+#   python -m otlib.tips "Exp803.22 WBE Protocols"
+#
+# does the same from a simulated run: tips used per pipette against the
+# racks loaded, and tip changes that could have been skipped.
+import argparse
+import math
+import os
+import sys
+from collections import namedtuple
+
+TIPS_PER_RACK = 96
+
+Transfer = namedtuple('Transfer', 'source dest volume liquid pipette touches_dest')
+Transfer.__new__.__defaults__ = (None, 'p300', True)
+
+# new_tip: per transfer, pick up a fresh tip first?
+# risks: per transfer, 'first', 'new_source', 'dirty_tip' or 'reuse'
+TipPlan = namedtuple('TipPlan', 'new_tip risks tips racks')
+
+
+def plan_tips(transfers, tips_per_rack=TIPS_PER_RACK, channels=None):
+    """Tip-change points and tip/rack counts for `transfers` in order."""
+    channels = channels or {}
+    contents = {}  # well -> liquids in it
+    tip = {}  # pipette -> (source, liquid, dirty)
+    new_tip, risks = [], []
+    tips = {}
+    for t in transfers:
+        liquid = t.liquid if t.liquid is not None else t.source
+        cur = tip.get(t.pipette)
+        if cur is None:
+            risk = 'first'
+        elif cur[0] != t.source or cur[1] != liquid:
+            risk = 'new_source'
+        elif cur[2]:
+            risk = 'dirty_tip'
+        else:
+            risk = 'reuse'
+        risks.append(risk)
+        new_tip.append(risk != 'reuse')
+        if risk != 'reuse':
+            tips[t.pipette] = tips.get(t.pipette, 0) + 1
+        dest_liquids = contents.setdefault(t.dest, set())
+        dirty = t.touches_dest and bool(dest_liquids - {liquid})
+        dest_liquids.add(liquid)
+        tip[t.pipette] = (t.source, liquid, dirty)
+    racks = {p: math.ceil(n*channels.get(p, 1)/tips_per_rack) for p, n in tips.items()}
+    return TipPlan(new_tip, risks, tips, racks)
+
+
+def check_budget(plan, racks_loaded):
+    """Messages for pipettes whose plan needs more racks than are loaded."""
+    problems = []
+    for p, need in plan.racks.items():
+        have = racks_loaded.get(p, 0)
+        if need > have:
+            problems.append('{0} needs {1} tips ({2} racks) but has {3} rack(s)'.format(
+                p, plan.tips[p], need, have))
+    return problems
+
+
+def _key(cmd):
+    return (cmd.get('slot'), cmd.get('labware'), cmd.get('well'))
+
+
+def tip_segments(commands):
+    """Per tip: the pipette mount, wells aspirated from and wells dispensed into."""
+    segments = []
+    open_seg = {}
+    for cmd in commands:
+        mount = cmd.get('mount')
+        if cmd['name'] == 'pick_up_tip':
+            open_seg[mount] = {'mount': mount, 'sources': [], 'dests': []}
+            segments.append(open_seg[mount])
+        elif cmd['name'] in ('drop_tip', 'return_tip'):
+            open_seg.pop(mount, None)
+        elif cmd['name'] in ('aspirate', 'dispense') and mount in open_seg and cmd.get('well'):
+            near_top = cmd.get('height') is not None and cmd.get('well_depth') is not None \
+                and cmd['height'] >= cmd['well_depth']-2
+            item = (_key(cmd), not near_top)
+            open_seg[mount]['sources' if cmd['name'] == 'aspirate' else 'dests'].append(item)
+    return segments
+
+
+def tip_budget(commands, deck):
+    """Tips used and available per mount, and tip changes that could be skipped."""
+    used, avoidable = {}, {}
+    contents = {}
+    last = {}  # mount -> (source, dirty) of the previous tip
+    for seg in tip_segments(commands):
+        mount = seg['mount']
+        used[mount] = used.get(mount, 0) + 1
+        sources = {s for s, _ in seg['sources']}
+        src = next(iter(sources)) if len(sources) == 1 else None
+        prev = last.get(mount)
+        if src is not None and prev is not None and prev[0] == src and not prev[1]:
+            avoidable[mount] = avoidable.get(mount, 0) + 1
+        dirty = False
+        for dest, touches in seg['dests']:
+            liquids = contents.setdefault(dest, set())
+            if touches and dest != src and liquids - {src}:
+                dirty = True
+            liquids.add(src)
+        last[mount] = (src, dirty)
+    slots = {lw['slot']: lw for lw in deck.get('labware', [])}
+    report = {}
+    for mount, pip in deck.get('pipettes', {}).items():
+        racks = [slots[s] for s in pip['tip_racks'] if s in slots]
+        per_tip = pip.get('channels', 1)
+        available = sum(r['wells'] for r in racks)//per_tip
+        report[mount] = {
+            'pipette': pip['name'],
+            'tips': used.get(mount, 0),
+            'available': available,
+            'racks_loaded': len(racks),
+            'racks_needed': math.ceil(used.get(mount, 0)*per_tip/TIPS_PER_RACK),
+            'avoidable': avoidable.get(mount, 0),
+        }
+    return report
+
+
+def main(argv=None):
+    from otlib import batch, sim
+    parser = argparse.ArgumentParser(description='Tip usage and reuse opportunities.')
+    parser.add_argument('paths', nargs='*')
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    args = parser.parse_args(argv)
+    status = 0
+    for result in batch.run_batch(batch.expand(args.paths), args.jobs):
+        name = os.path.relpath(result['path'], sim.ROOT)
+        if not result['ok']:
+            print('{0}: simulation failed: {1}'.format(name, result['error']))
+            status = 1
+        for mount, r in tip_budget(result['commands'], result['deck']).items():
+            flag = '  OUT OF TIPS' if r['tips'] > r['available'] else ''
+            print('{0}: {1} {2} tips / {3} loaded ({4} racks needed), {5} avoidable changes{6}'.format(
+                name, r['pipette'], r['tips'], r['available'], r['racks_needed'], r['avoidable'], flag))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
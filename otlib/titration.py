@@ -0,0 +1,211 @@
+# Three-factor F x R x P (primer/probe) titration on one or more plates.
+# The probe matrix scripts titrate P with F and R fixed, so a full
+# optimization took separate runs. Titration lays out any list of runs
+# (full factorial or a Latin square fraction) over as many plates as
+# needed and plans the tubes once for the whole run:
+#
+#   - one intermediate tube per factor level, diluted so every well gets
+#     the same ul of it (the level at stock concentration uses the stock)
+#   - one mix tube per combination of the two factors with the fewest
+#     distinct combinations (base mix + DNA + those two intermediates)
+#   - per cell: mix tube and the third factor into the first well, which
+#     is then split to its replicates (as in create_primer_matrix.py)
+#
+#   t = Titration(full_factorial([300, 400, 500], [300, 400, 500], [50, 100, 200, 400]))
+#   t.tubes()              # tube name -> (contents, ul) for the prep sheet
+#   run_plan(t.transfers(), resolve, {'p20': p20, 'p300': p300})
+#
+#   python -m otlib.titration -F 300 400 500 -R 300 400 500 -P 50 100 200 --latin
+import argparse
+import itertools
+import sys
+from collections import namedtuple
+
+from otlib.matrix import ROWS, per_rxn, pipette_for, plate_well, stocks_needed
+from otlib.tips import Transfer
+
+FACTORS = ('F', 'R', 'P')
+
+Run = namedtuple('Run', 'F R P')
+
+
+def full_factorial(F, R, P):
+    return [Run(f, r, p) for f, r, p in itertools.product(F, R, P)]
+
+
+def latin_square(F, R, P):
+    """n*n runs for n levels each; every pair of levels of two factors meets once."""
+    n = len(F)
+    if len(R) != n or len(P) != n:
+        raise ValueError('a Latin square needs the same number of F, R and P levels')
+    return [Run(F[i], R[j], P[(i+j) % n]) for i in range(n) for j in range(n)]
+
+
+class Titration:
+    """Layout, tubes and transfers for a list of F/R/P runs."""
+
+    def __init__(self, runs, reps=2, stocks=None, rxn_base=14.8, tot_rxn_vol=20, dna_per_rxn=2,
+                 percent_waste=0.20, min_int_vol=50, plate_rows=8, plate_cols=12):
+        self.runs = list(runs)
+        if not self.runs:
+            raise ValueError('no runs to titrate')
+        if reps > plate_cols:
+            raise ValueError('{0} replicates do not fit a {1}-column row'.format(reps, plate_cols))
+        self.reps = reps
+        self.stocks = dict({'F': 10, 'R': 10, 'P': 10}, **(stocks or {}))  # uM
+        self.tot_rxn_vol, self.dna_per_rxn = tot_rxn_vol, dna_per_rxn
+        self.waste = 1+percent_waste
+        self.min_int_vol = min_int_vol
+        self.plate_rows, self.plate_cols = plate_rows, plate_cols
+
+        # ul of each factor's intermediate per well: enough stock for the top level
+        self.vol_per_rxn = {x: per_rxn(max(getattr(r, x) for r in self.runs), self.stocks[x], tot_rxn_vol)
+                            for x in FACTORS}
+        self.base_per_rxn = rxn_base
+        self.water_per_rxn = tot_rxn_vol-dna_per_rxn-rxn_base-sum(self.vol_per_rxn.values())
+        if self.water_per_rxn < -1e-9:
+            raise ValueError('top F, R and P levels need {0:.2f}ul more than the reaction holds'.format(
+                -self.water_per_rxn))
+
+        # the two factors premixed per tube: fewest distinct combinations
+        pairs = list(itertools.combinations(FACTORS, 2))
+        self.mixed = min(pairs, key=lambda p: len({(getattr(r, p[0]), getattr(r, p[1])) for r in self.runs}))
+        self.per_well = [x for x in FACTORS if x not in self.mixed][0]
+        key = self.mix_key
+        self.runs.sort(key=lambda r: (key(r), getattr(r, self.per_well)))
+
+    def mix_key(self, run):
+        return tuple(getattr(run, x) for x in self.mixed)
+
+    def int_name(self, factor, conc):
+        return '{0}_{1:g}'.format(factor, conc)
+
+    def mix_name(self, run):
+        return 'mix_' + '_'.join('{0}{1:g}'.format(x, getattr(run, x)) for x in self.mixed)
+
+    def source(self, factor, conc):
+        """Tube the factor is drawn from at `conc`: the stock if no dilution is needed."""
+        if abs(self.int_conc(factor, conc)-self.stocks[factor]) < 1e-9:
+            return '{0}_stock'.format(factor)
+        return self.int_name(factor, conc)
+
+    def int_conc(self, factor, conc):
+        """uM of the intermediate so vol_per_rxn of it gives `conc` nM."""
+        return conc/1000*self.tot_rxn_vol/self.vol_per_rxn[factor]
+
+    def layout(self):
+        """(plate, well name) -> (run index, rep); a cell never wraps a row."""
+        wells = {}
+        plate, row, col = 0, 0, 0
+        for i in range(len(self.runs)):
+            if col+self.reps > self.plate_cols:
+                row, col = row+1, 0
+            if row >= self.plate_rows:
+                plate, row, col = plate+1, 0, 0
+            for r in range(self.reps):
+                wells[(plate, ROWS[row]+str(col+r+1))] = (i, r)
+            col += self.reps
+        return wells
+
+    def plates(self):
+        return max(p for p, _ in self.layout())+1
+
+    def _uses(self):
+        """ul of each tube drawn over the run (without waste)."""
+        uses = {}
+        for run in self.runs:
+            for x in FACTORS:
+                name = self.source(x, getattr(run, x))
+                uses[name] = uses.get(name, 0)+self.vol_per_rxn[x]*self.reps
+        return uses
+
+    def tubes(self):
+        """Intermediate and mix tubes: name -> ([(source, ul), ...], total ul)."""
+        tubes = {}
+        uses = self._uses()
+        for x in FACTORS:
+            for conc in sorted({getattr(r, x) for r in self.runs}):
+                name = self.source(x, conc)
+                if name.endswith('_stock'):
+                    continue
+                vol = max(uses[name]*self.waste, self.min_int_vol)
+                primer = self.int_conc(x, conc)*vol/self.stocks[x]
+                tubes[name] = ([('{0}_stock'.format(x), primer), ('water', vol-primer)], vol)
+        groups = {}
+        for run in self.runs:
+            groups.setdefault(self.mix_key(run), []).append(run)
+        for runs in groups.values():
+            n = len(runs)*self.reps*self.waste
+            contents = [('base_mix', (self.base_per_rxn+self.water_per_rxn)*n), ('dna', self.dna_per_rxn*n)]
+            contents += [(self.source(x, getattr(runs[0], x)), self.vol_per_rxn[x]*n) for x in self.mixed]
+            tubes[self.mix_name(runs[0])] = (contents, sum(v for _, v in contents))
+        return tubes
+
+    def transfers(self):
+        """The run as Transfer steps; plate wells are plate_well(name, plate)."""
+        steps = []
+
+        def add(source, dest, volume, touches_dest=True):
+            if volume > 1e-9:
+                steps.append(Transfer(source, dest, volume, source, pipette_for(volume), touches_dest))
+
+        tubes = self.tubes()
+        # diluent first (clean tubes, one tip), then each stock, then the mixes
+        ints = [name for name in tubes if not name.startswith('mix_')]
+        mixes = [name for name in tubes if name.startswith('mix_')]
+        for name in ints:
+            add('water', name, dict(tubes[name][0])['water'], touches_dest=False)
+        for name in ints:
+            for src, vol in tubes[name][0]:
+                if src != 'water':
+                    add(src, name, vol)
+        for name in mixes:
+            for src, vol in tubes[name][0]:
+                add(src, name, vol, touches_dest=src != 'base_mix')
+        cells = {}
+        for (plate, well), (i, r) in self.layout().items():
+            cells.setdefault(i, []).append((r, plate, well))
+        mix_vol = self.tot_rxn_vol-self.vol_per_rxn[self.per_well]
+        for i, run in enumerate(self.runs):
+            wells = [plate_well(w, p) for _, p, w in sorted(cells[i])]
+            add(self.mix_name(run), wells[0], mix_vol*self.reps, touches_dest=False)
+        for i, run in enumerate(self.runs):
+            wells = [plate_well(w, p) for _, p, w in sorted(cells[i])]
+            add(self.source(self.per_well, getattr(run, self.per_well)), wells[0],
+                self.vol_per_rxn[self.per_well]*self.reps)
+            for well in wells[1:]:
+                add(wells[0], well, self.tot_rxn_vol)
+        return steps
+
+    def stocks_needed(self):
+        """ul drawn from the tubes prepared by hand (stocks, water, base mix, DNA)."""
+        return stocks_needed(self.transfers())
+
+
+def main(argv=None):
+    from otlib.tips import plan_tips
+    parser = argparse.ArgumentParser(description='Plan an F x R x P titration.')
+    for x in FACTORS:
+        parser.add_argument('-'+x, type=float, nargs='+', required=True, help='{0} levels (nM)'.format(x))
+    parser.add_argument('--latin', action='store_true', help='Latin square instead of full factorial')
+    parser.add_argument('--reps', type=int, default=2)
+    args = parser.parse_args(argv)
+    design = latin_square if args.latin else full_factorial
+    try:
+        t = Titration(design(args.F, args.R, args.P), reps=args.reps)
+    except ValueError as err:
+        parser.error(str(err))
+    steps = t.transfers()
+    print('{0} runs x {1} reps on {2} plate(s); {3} premixed, {4} added per cell'.format(
+        len(t.runs), t.reps, t.plates(), '+'.join(t.mixed), t.per_well))
+    for name, (contents, total) in t.tubes().items():
+        print('  {0:<22} {1:7.1f}ul  '.format(name, total)
+              + ', '.join('{0} {1:.1f}'.format(src, v) for src, v in contents))
+    for name, vol in sorted(t.stocks_needed().items()):
+        print('  need {0:<17} {1:7.1f}ul'.format(name, vol))
+    print('  {0} transfers, tips {1}'.format(len(steps), plan_tips(steps).tips))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# Command timing trace for real runs.
+#
+#   from otlib.trace import trace
+#   def run(protocol):
+#       tracer = trace(protocol)    # first line of run(); None unless enabled
+#       ...
+#       if tracer:
+#           tracer.close()          # last line of run()
+#
+# Tracing is off unless OTLIB_TRACE is set (or trace() is given `out`):
+#
+#   OTLIB_TRACE=1            TRACE_DIR/<protocol>-<date>.jsonl on the robot,
+#                            stdout when simulating; only the newest KEEP
+#                            files are kept
+#   OTLIB_TRACE=-            stdout
+#   OTLIB_TRACE=trace.jsonl  appended to that file
+#
+# Every command the protocol publishes (aspirate, mix, delay, touch_tip,
+# ...) becomes one JSON line with a monotonic start time, the elapsed
+# seconds and its self time (elapsed minus nested commands, e.g. a mix
+# minus its aspirates/dispenses).
+#
+#   python -m otlib.trace trace.jsonl [more.jsonl]
+#
+# aggregates the self time by command type and by section (a section
+# starts at each protocol.comment()).
+import argparse
+import json
+import os
+import sys
+import time
+
+from otlib.sim import to_record
+
+TRACE_DIR = '/data/user_storage/traces'
+KEEP = 20  # trace files kept in TRACE_DIR
+
+
+def _prune(directory, keep=KEEP):
+    files = sorted((os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.jsonl')),
+                   key=os.path.getmtime)
+    for path in files[:-keep] if keep else files:
+        os.remove(path)
+
+
+def _default_out(protocol, name):
+    """Where OTLIB_TRACE sends the trace, or None when tracing is off."""
+    setting = os.environ.get('OTLIB_TRACE')
+    if not setting:
+        return None
+    if setting == '-' or (setting == '1' and protocol.is_simulating()):
+        return sys.stdout
+    if setting != '1':
+        return open(setting, 'a')
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    _prune(TRACE_DIR, KEEP-1)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return open(os.path.join(TRACE_DIR, '{0}-{1}.jsonl'.format(name or 'protocol', stamp)), 'a')
+
+
+class Tracer:
+    """Broker subscriber writing one JSON line per finished command."""
+
+    def __init__(self, protocol, out, own=False):
+        from opentrons.commands import types as command_types
+        self.out = out
+        self._own = own  # close out on close()
+        self.start = time.monotonic()
+        self.section = 'start'
+        self._stack = []  # [record, start, nested seconds]
+        self._unsubscribe = protocol.broker.subscribe(command_types.COMMAND, self._on_message)
+
+    def _on_message(self, message):
+        now = time.monotonic()
+        if message.get('$') == 'before':
+            rec = to_record(message, len(self._stack))
+            if rec['name'] == 'comment':
+                self.section = rec.get('text') or self.section
+            rec['section'] = self.section
+            rec['t'] = round(now-self.start, 4)
+            self._stack.append([rec, now, 0.0])
+        elif self._stack:
+            rec, began, nested = self._stack.pop()
+            elapsed = now-began
+            rec['elapsed'] = round(elapsed, 4)
+            rec['self'] = round(elapsed-nested, 4)
+            if self._stack:
+                self._stack[-1][2] += elapsed
+            self.out.write(json.dumps(rec, default=str) + '\n')
+            self.out.flush()
+
+    def close(self):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._own:
+            self.out.close()
+
+
+def trace(protocol, out=None, name=None):
+    """Start tracing `protocol` to `out` or per OTLIB_TRACE; the Tracer, or None when off."""
+    if out is not None:
+        return Tracer(protocol, out)
+    out = _default_out(protocol, name or _protocol_name())
+    if out is None:
+        return None
+    return Tracer(protocol, out, own=out is not sys.stdout)
+
+
+def _protocol_name():
+    # the calling protocol's file name, for the trace file name
+    frame = sys._getframe(2)
+    path = frame.f_globals.get('__file__') or ''
+    return os.path.splitext(os.path.basename(path))[0].replace(' ', '_') or None
+
+
+def read(paths):
+    records = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('{'):
+                    records.append(json.loads(line))
+    return records
+
+
+def aggregate(records, key):
+    """{key value: [count, self seconds]} sorted by time, largest first."""
+    totals = {}
+    for rec in records:
+        k = rec.get(key)
+        entry = totals.setdefault(k, [0, 0.0])
+        entry[0] += 1
+        entry[1] += rec.get('self', 0.0)
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1][1]))
+
+
+def report(records):
+    total = sum(r.get('self', 0.0) for r in records)
+    lines = ['{0} commands, {1:.1f} min traced'.format(len(records), total/60)]
+    for title, key in (('by command', 'name'), ('by section', 'section')):
+        lines.append('  ' + title + ':')
+        for k, (n, secs) in aggregate(records, key).items():
+            share = 100*secs/total if total else 0
+            lines.append('    {0:7.1f} s {1:5.1f}% {2:6d}x  {3}'.format(secs, share, n, k))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarize command timing traces.')
+    parser.add_argument('paths', nargs='+')
+    args = parser.parse_args(argv)
+    print(report(read(args.paths)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# Splitting a volume into equal aspirations.
+# split_asp() is the closed-form replacement for the while-loop version
+# copied into the primer/probe matrix scripts. That version returned three
+# parts for anything between max_vol and 2*max_vol; this one returns the
+# fewest equal parts that fit, ceil(tot/max_vol).
+#
+# plan_transfer() also picks the pipette: give it the p20 and p300 and it
+# returns a TransferPlan to compute once and reuse inside loops:
+#
+#   plan = plan_transfer(BWP_mix_xfer_sN_mix, p20, p300)
+#   for j, amt in enumerate(plan.parts):
+#       plan.pipette.aspirate(amt, ...)
+import math
+from collections import namedtuple
+
+
+def n_parts(tot, max_vol):
+    """Fewest equal aspirations of at most max_vol that add up to tot."""
+    return max(1, math.ceil(tot/max_vol - 1e-9))
+
+
+def split_asp(tot, max_vol):
+    """tot split into equal parts no bigger than max_vol (list of volumes)."""
+    n = n_parts(tot, max_vol)
+    return [tot/n]*n
+
+
+class TransferPlan(namedtuple('TransferPlan', 'pipette total n part')):
+    """Which pipette moves `total` ul, in `n` aspirations of `part` ul."""
+
+    @property
+    def parts(self):
+        return [self.part]*self.n
+
+    def cumulative(self):
+        """Volume moved after each aspiration, e.g. for destination heights."""
+        return [self.part*(j+1) for j in range(self.n)]
+
+
+def capacity(pipette):
+    """Usable volume per aspiration: pipette max, limited by its tips."""
+    vol = pipette.max_volume
+    racks = getattr(pipette, 'tip_racks', None) or []
+    if racks:
+        tip_vol = getattr(racks[0].wells()[0], 'max_volume', None)
+        if tip_vol:
+            vol = min(vol, tip_vol)
+    return vol
+
+
+def plan_transfer(total, *pipettes, max_vols=None):
+    """TransferPlan for the pipette that needs the fewest aspirations.
+
+    Parts smaller than a pipette's min_volume rule it out; on a tie the
+    smaller pipette wins since it is more accurate. max_vols optionally
+    overrides the capacity per pipette, in the same order.
+    """
+    best = None
+    for i, pip in enumerate(pipettes):
+        max_vol = max_vols[i] if max_vols else capacity(pip)
+        n = n_parts(total, max_vol)
+        part = total/n
+        if part < getattr(pip, 'min_volume', 0):
+            continue
+        key = (n, max_vol)
+        if best is None or key < best[0]:
+            best = (key, TransferPlan(pip, total, n, part))
+    if best is None:
+        raise ValueError('no pipette can move {0}ul'.format(total))
+    return best[1]
@@ -0,0 +1,5 @@
+# otlib lives at the repo root, next to the protocol folders
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
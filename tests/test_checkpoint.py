@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from otlib.checkpoint import Checkpoint
+from otlib.ledger import VolumeLedger
+
+
+class Protocol:
+    def __init__(self):
+        self.paused = []
+
+    def is_simulating(self):
+        return True
+
+    def pause(self, msg=None):
+        self.paused.append(msg)
+
+
+class Well:
+    def __init__(self, name, labware='plate'):
+        self.well_name = name
+        self.labware = labware
+
+    def __repr__(self):
+        return '{0} of {1}'.format(self.well_name, self.labware)
+
+
+class TipRack:
+    def __init__(self, names):
+        self.wells = {name: Well(name, 'tips') for name in names}
+        self.used = 0
+
+    def __getitem__(self, name):
+        return self.wells[name]
+
+    def next_tip(self):
+        names = list(self.wells)
+        return self.wells[names[self.used]] if self.used < len(names) else None
+
+
+class Instrument:
+    def __init__(self, racks):
+        self.tip_racks = racks
+        self.starting_tip = None
+
+
+class Wrapper:
+    def __init__(self, pipette):
+        self._pipette = pipette
+
+    def __getattr__(self, name):
+        return getattr(self._pipette, name)
+
+
+DESTS = [Well(name) for name in ('A1', 'A2', 'A3', 'A4')]
+
+
+def run(path, fail_after=None):
+    """Fill DESTS with 100ul each from a tracked tube; stop after `fail_after` wells."""
+    protocol = Protocol()
+    ledger = VolumeLedger()
+    tube = ledger.track(Well('A1', 'tubes'), 1000, tube='1.5ml')
+    racks = [TipRack(['A1', 'B1']), TipRack(['A1', 'B1', 'C1'])]
+    pipette = Wrapper(Instrument(racks))
+    ckpt = Checkpoint(protocol, 'test', ledger=ledger, pipette=pipette, path=str(path))
+    filled = []
+    for dest in ckpt.pending(DESTS, 'fill'):
+        if fail_after is not None and len(filled) == fail_after:
+            return protocol, ledger, tube, pipette, filled
+        ledger.remove(tube, 100)
+        tips = racks[0].used+racks[1].used+1  # one tip per well
+        racks[0].used, racks[1].used = min(2, tips), max(0, tips-2)
+        filled.append(dest.well_name)
+        ckpt.save(dest, 'fill')
+    ckpt.finish()
+    return protocol, ledger, tube, pipette, filled
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'ck.json'
+    protocol, _, _, _, filled = run(path, fail_after=3)
+    assert filled == ['A1', 'A2', 'A3'] and not protocol.paused
+    state = json.loads(path.read_text())
+    assert state['completed'] == 3 and state['last'] == 'fill: A3'
+    assert state['tip'] == [1, 'B1']
+
+    protocol, ledger, tube, pipette, filled = run(path)
+    assert filled == ['A4']
+    assert ledger.volume(tube) == 600
+    assert pipette._pipette.starting_tip is pipette.tip_racks[1]['B1']
+    assert len(protocol.paused) == 1 and 'fill: A3 (3 steps done)' in protocol.paused[0]
+    assert not path.exists()  # finish() forgets a completed run
+
+
+def test_no_file_runs_everything(tmp_path):
+    protocol, ledger, tube, _, filled = run(tmp_path / 'ck.json')
+    assert filled == ['A1', 'A2', 'A3', 'A4']
+    assert ledger.volume(tube) == 600
+    assert not protocol.paused
+
+
+def test_simulation_without_a_path_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.delenv('OTLIB_CHECKPOINT', raising=False)
+    monkeypatch.chdir(tmp_path)
+    ckpt = Checkpoint(Protocol(), 'test')
+    assert ckpt.path is None
+    ckpt.save('A1')
+    assert ckpt.done == 1 and not list(tmp_path.iterdir())
+
+
+def test_mismatched_step_raises(tmp_path):
+    path = tmp_path / 'ck.json'
+    run(path, fail_after=2)
+    ckpt = Checkpoint(Protocol(), 'test', path=str(path))
+    with pytest.raises(ValueError, match="stops at 'fill: A2'"):
+        ckpt.pending(DESTS, 'transfer')
@@ -0,0 +1,56 @@
+import pytest
+
+from otlib.dilution import DilutionSeries, prefill
+
+
+class Spot:
+    def __init__(self, name):
+        self.name = name
+
+    def bottom(self, z):
+        return (self.name, z)
+
+
+class Recorder:
+    """Just enough pipette for prefill(): records aspirate/dispense calls."""
+
+    max_volume = 300
+    tip_racks = []
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name,) + args)
+
+
+def test_series_volumes_for_the_qpcr_standards():
+    s = DilutionSeries(10, 15, 900)
+    assert s.transfer_vol == pytest.approx(100)
+    assert s.mixed_vol == pytest.approx(1000)
+    assert s.diluent_needed() == 13500
+    assert s.final_volumes() == [900]*14 + [1000]
+    assert s.concentrations(10)[:3] == pytest.approx([1, 0.1, 0.01])
+
+
+@pytest.mark.parametrize('factor, points', [(1, 5), (0.5, 5), (10, 0)])
+def test_series_rejects(factor, points):
+    with pytest.raises(ValueError):
+        DilutionSeries(factor, points, 900)
+
+
+def test_prefill_draws_at_the_exp800_04_heights():
+    # the script drew aspiration k at waterH[k+1], waterH = fifteen_ml_heights(15000, 76, 180)
+    pip = Recorder()
+    tubes = [Spot('std_{0}'.format(i+1)) for i in range(15)]
+    prefill(pip, DilutionSeries(10, 15, 900), tubes, Spot('water'), 15000, '15ml', capacity=200)
+    draws = [c[2][1] for c in pip.calls if c[0] == 'aspirate']
+    assert len(draws) == 75
+    assert draws[:4] == [105.5, 104.2, 102.8, 101.6]
+    assert draws[-3:] == [20.1, 18.7, 17.2]
+    assert all(c[1] == pytest.approx(180) for c in pip.calls if c[0] == 'aspirate')
+    filled = {}
+    for c in pip.calls:
+        if c[0] == 'dispense':
+            filled[c[2][0]] = filled.get(c[2][0], 0)+c[1]
+    assert filled == pytest.approx({t.name: 900 for t in tubes})
@@ -0,0 +1,43 @@
+# Expected lists were produced by the per-protocol height functions the
+# shared model replaced (tree before otlib), with the same arguments.
+import pytest
+
+from otlib.heights import fifteen_ml_heights, fifty_ml_heights, heights, liquid_height, tip_heights, tip_heightsEpp
+
+
+def test_tip_heights_matches_exp803_10():
+    h = tip_heights(1056, 48, 20)
+    assert len(h) == 48
+    assert h[:6] == [21.3, 20.9, 20.6, 20.3, 19.9, 19.6]
+    assert h[-3:] == [1, 1, 1]
+
+
+def test_fifteen_ml_heights_matches_exp803_13():
+    h = fifteen_ml_heights(15000, 76, 180)
+    assert h[:5] == [106.9, 105.5, 104.2, 102.8, 101.6]
+    assert h[-3:] == [20.1, 18.7, 17.2]
+
+
+def test_fifty_ml_heights_with_exp803_10_offsets():
+    h = fifty_ml_heights(40000, 10, 3500, offset=15, offset_full=14, floor=17.5, bottom=2)
+    assert h == [81.0, 72.6, 64.2, 55.8, 47.4, 39.0, 30.6, 22.2, 2, 2]
+
+
+def test_2ml_heights_with_lyobead_offsets():
+    h = tip_heightsEpp(1531.2, 24, 58, offset=8, floor=6, bottom=1)
+    assert h[:14] == [18.3, 17.3, 16.4, 15.4, 14.5, 13.5, 12.6, 11.7, 10.7, 9.8, 8.9, 8.0, 7.0, 6.1]
+    assert h[14:] == [1]*10
+
+
+def test_2ml_needs_an_offset():
+    with pytest.raises(ValueError, match='offset='):
+        tip_heightsEpp(1500, 3, 100)
+
+
+def test_heights_never_rise():
+    h = heights('1.5ml', 1400, 10, 100)
+    assert h == sorted(h, reverse=True)
+
+
+def test_liquid_height_grows_with_volume():
+    assert liquid_height('15ml', 5000) < liquid_height('15ml', 10000)
@@ -0,0 +1,46 @@
+from otlib.layout import MODULE_SLOTS, optimise, transitions, travel
+
+
+def stream(*slots):
+    return [{'name': 'aspirate', 'slot': s, 'depth': 0} for s in slots]
+
+
+def deck(*slots, modules=()):
+    return {'labware': [{'slot': s, 'load_name': 'lw' + s} for s in slots],
+            'modules': [{'slot': s, 'module': kind} for s, kind in modules]}
+
+
+def test_transitions_count_unordered_slot_pairs():
+    counts = transitions(stream('1', '1', '9', '1', '12', '9'))
+    assert counts == {('1', '9'): 2, ('1', '12'): 1, ('9', '12'): 1}
+
+
+def test_busy_pair_ends_up_adjacent():
+    counts = {('1', '9'): 50, ('9', '12'): 5}
+    layout, cost = optimise(counts, deck('1', '9'))
+    assert cost < travel(counts, {})
+    assert layout.get('12', '12') == '12'
+    assert len(set(layout.values())) == len(layout)
+    assert cost == travel(counts, layout)
+    assert travel({('1', '9'): 1}, layout) == 90.5  # front-to-back neighbours are closest
+
+
+def test_modules_stay_on_module_slots_and_fixed_slots_stay():
+    counts = {('1', '9'): 50, ('3', '9'): 20}
+    layout, _ = optimise(counts, deck('1', '3', '9', modules=[('3', 'temperature module gen2')]), fixed=['9'])
+    assert '9' not in layout  # fixed slots are not moved
+    assert layout['3'] in MODULE_SLOTS
+
+
+def test_thermocycler_slots_stay():
+    counts = {('2', '10'): 30, ('7', '2'): 30}
+    layout, _ = optimise(counts, deck('2', '7', modules=[('7', 'thermocyclerModuleV1')]))
+    assert '7' not in layout and '10' not in layout
+    assert layout['2'] not in {'7', '8', '10', '11'}
+
+
+def test_current_layout_kept_when_nothing_is_shorter():
+    counts = {('1', '4'): 10}
+    layout, cost = optimise(counts, deck('1', '4'))
+    assert all(old == new for old, new in layout.items())
+    assert cost == travel(counts, {})
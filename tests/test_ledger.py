@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+from otlib.heights import heights
+from otlib.ledger import TrackedPipette, VolumeLedger, tube_for, well_of
+
+
+class Well:
+    def __init__(self, name, max_volume=200):
+        self.well_name = name
+        self.max_volume = max_volume
+
+    def bottom(self, z=0):
+        return SimpleNamespace(labware=self, z=z)
+
+    def top(self, z=0):
+        return SimpleNamespace(labware=self, z=100+z)
+
+
+class Pipette:
+    max_volume = 300
+
+    def __init__(self):
+        self.current_volume = 0
+        self.calls = []
+
+    def aspirate(self, volume, location, rate=1.0):
+        self.current_volume += volume
+        self.calls.append(('aspirate', volume, location.z))
+
+    def dispense(self, volume, location, rate=1.0):
+        self.current_volume -= volume
+        self.calls.append(('dispense', volume, location.z))
+
+
+@pytest.mark.parametrize('max_volume, tube', [(1500, '1.5ml'), (2000, '2ml'), (15000, '15ml'),
+                                              (50000, '50ml'), (200, None)])
+def test_tube_for(max_volume, tube):
+    assert tube_for(Well('A1', max_volume)) == tube
+
+
+def test_well_of():
+    well = Well('A1')
+    assert well_of(well) is well
+    assert well_of(well.bottom(2)) is well
+    assert well_of(None) is None
+
+
+def test_heights_follow_the_volume():
+    ledger = VolumeLedger()
+    buffer = ledger.track(Well('A1', 50000), 41250)
+    dest = Well('B1')
+    p = TrackedPipette(Pipette(), ledger)
+    for _ in range(3):
+        p.aspirate(200, buffer)
+        p.dispense(200, dest.top())
+    # the same heights as walking a heights() list with a counter
+    assert [c[2] for c in p.calls if c[0] == 'aspirate'] == heights('50ml', 41250, 3, 200)
+    assert ledger.volume(buffer) == 40650
+    assert ledger.volume(dest) == 600
+
+
+def test_location_keeps_its_height():
+    ledger = VolumeLedger()
+    tube = ledger.track(Well('A1', 1500), 1000)
+    p = TrackedPipette(Pipette(), ledger)
+    p.aspirate(100, tube.bottom(3))
+    assert p.calls == [('aspirate', 100, 3)]
+    assert ledger.volume(tube) == 900
+
+
+def test_dead_volume():
+    ledger = VolumeLedger()
+    tube = ledger.track(Well('A1', 1500), 300, dead_vol=100)
+    ledger.remove(tube, 200)
+    with pytest.raises(ValueError, match='only 0ul above dead volume'):
+        ledger.remove(tube, 1)
+
+
+def test_missing_height_kwargs_fail_at_track():
+    with pytest.raises(ValueError, match='no default offset'):
+        VolumeLedger().track(Well('A1', 2000), 1500, tube='2ml')
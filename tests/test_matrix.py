@@ -0,0 +1,88 @@
+# Expected values were computed by the scalar calcs of
+# create_primer_matrix.py before otlib.matrix (6 F x 6 R, defaults).
+import pytest
+
+from otlib.matrix import PrimerMatrix, pipette_for, stocks_needed
+
+CONCS = [50, 100, 200, 400, 600, 800]
+
+
+@pytest.fixture
+def m():
+    return PrimerMatrix(CONCS, CONCS)
+
+
+def test_counts(m):
+    assert (m.tot_stds, m.tot_NTCs, m.tot_samp, m.tot_rxns, m.R_reps) == (21, 3, 72, 96, 12)
+
+
+def test_per_reaction_volumes_match_the_script(m):
+    assert m.P_per_rxn == pytest.approx(0.6)
+    assert m.water_per_rxn == pytest.approx(3.0)
+    assert m.BPW_rxn == pytest.approx(14.8)
+    assert m.BPW_sN_rxn == pytest.approx(18.0)
+    assert m.bpwd_rxn == pytest.approx(16.8)
+    assert m.R_mix_rxn == pytest.approx(18.4)
+
+
+def test_mix_volumes_match_the_script(m):
+    assert m.BWP_mix_xfer_sN_mix == pytest.approx(417.36)
+    assert m.std_woff_add_to_sN_mix == pytest.approx(56.4)
+    assert m.F_add_to_sN_mix == pytest.approx(16.92)
+    assert m.R_add_to_sN_mix == pytest.approx(16.92)
+    assert m.sN_mix_xfer_to_stds_mix == pytest.approx(63.288)
+    assert m.std_DNA_xfer_to_stds_mix == pytest.approx(7.032)
+    assert m.bpw_mix_xfer_bpwd_mix == pytest.approx(1244.6208)
+    assert m.std_DNA_xfer_to_bpwd_mix == pytest.approx(168.192)
+    assert m.dna_XFR_bpwd_mix == pytest.approx(16.8192)
+    assert m.water_XFR_bpwd_mix == pytest.approx(151.3728)
+    assert m.bpwd_mix_xfer_R_mix == pytest.approx(221.76)
+
+
+def test_tube_totals_match_the_script(m):
+    assert m.BPW_mix_tot == pytest.approx(1704.96)
+    assert m.sN_mix_tot == pytest.approx(507.6)
+    assert m.bpwd_mix_tot == pytest.approx(1412.8128)
+    assert m.R_mix_tot == pytest.approx([242.88]*6)
+
+
+def test_R_and_F_tubes_match_the_script(m):
+    assert m.R_mix_primer == pytest.approx([1.32, 2.64, 5.28, 10.56, 15.84, 21.12])
+    assert m.F_mix_primer == pytest.approx([6.25, 12.5, 25.0, 50.0, 75.0, 100.0])
+    assert m.F_mix_water == pytest.approx([93.75, 87.5, 75.0, 50.0, 25.0, 0.0])
+
+
+def test_layout_6x6(m):
+    wells = m.layout()
+    assert len(wells) == 96
+    assert wells['A1'] == ('sample', 0, 0, 0)
+    assert wells['A2'] == ('sample', 0, 0, 1)
+    assert wells['F12'] == ('sample', 5, 5, 1)
+    assert [wells['G{0}'.format(c)] for c in (1, 3, 4)] == [('std', 0, 0), ('std', 0, 2), ('std', 1, 0)]
+    assert wells['H10'] == ('NTC', 0)
+
+
+def test_smaller_grid_fits():
+    wells = PrimerMatrix([100, 400, 800], [100, 800]).layout()
+    assert sum(1 for w in wells.values() if w[0] == 'sample') == 12
+    assert sum(1 for w in wells.values() if w[0] == 'std') == 21
+
+
+def test_grid_too_big_for_the_plate():
+    with pytest.raises(ValueError, match='does not fit'):
+        PrimerMatrix(CONCS + [1000], CONCS).layout()
+    with pytest.raises(ValueError, match='free wells'):
+        PrimerMatrix(CONCS, CONCS + [900, 1000]).layout()
+
+
+def test_too_much_primer_for_the_reaction():
+    with pytest.raises(ValueError, match='more than the reaction holds'):
+        PrimerMatrix([2000], [2000])
+
+
+def test_transfers_cover_every_plate_well(m):
+    steps = m.transfers()
+    plate = {t.dest for t in steps if isinstance(t.dest, tuple)}
+    assert len(plate) == 96
+    assert all(t.pipette == pipette_for(t.volume) for t in steps)
+    assert stocks_needed(steps) == m.stocks_needed()
@@ -0,0 +1,44 @@
+import pytest
+
+from otlib.mixing import MAX_CYCLES, MIN_CYCLES, MIX_BOTTOM, TARGET, mix_plan
+
+
+def test_small_volume_mixes_the_minimum():
+    plan = mix_plan(None, 40, 200)
+    assert sum(plan.cycles) == MIN_CYCLES
+    assert plan.volume == 20
+    assert plan.heights == [MIX_BOTTOM]
+    assert plan.residual == 0
+
+
+def test_standard_tube_plan():
+    plan = mix_plan('1.5ml', 1000, 200)
+    assert plan.volume == 200
+    assert plan.residual <= TARGET
+    assert len(plan.heights) == len(plan.cycles) > 1
+    assert plan.heights[0] == MIX_BOTTOM and plan.heights == sorted(plan.heights)
+    assert plan.cycles[-1] == max(plan.cycles)  # most cycles at the top
+
+
+def test_mix_volume_stays_within_the_tip():
+    plan = mix_plan('50ml', 30000, 200)
+    assert plan.volume == 200
+    assert MIN_CYCLES <= sum(plan.cycles) <= MAX_CYCLES
+
+
+def test_unreachable_target_reports_the_residual():
+    plan = mix_plan('50ml', 40000, 20, liquid='beads')
+    assert sum(plan.cycles) == MAX_CYCLES
+    assert plan.residual > TARGET
+
+
+def test_viscous_liquids_need_more_cycles():
+    water = mix_plan('15ml', 10000, 1000)
+    beads = mix_plan('15ml', 10000, 1000, liquid='beads')
+    assert sum(beads.cycles) > sum(water.cycles)
+    assert beads.rate < water.rate
+
+
+@pytest.mark.parametrize('target', [0.1, 0.01])
+def test_target(target):
+    assert mix_plan('1.5ml', 1400, 100, target=target).residual <= target
@@ -0,0 +1,43 @@
+import pytest
+
+from otlib.multidispense import Aspiration, plan_multi_dispense, wells_per_aspiration
+
+
+def test_bioer_plate_plan():
+    # 20ul into 96 wells from 200ul tips: 8 wells plus 20ul conditioning and 20ul reserve
+    plan = plan_multi_dispense(200, 20, 96, min_dispense=14.5)
+    assert len(plan) == 12
+    assert set(plan) == {Aspiration(200, 8, 20, 20)}
+
+
+def test_last_aspiration_takes_the_rest():
+    plan = plan_multi_dispense(200, 14.5, 20)
+    assert [a.wells for a in plan] == [11, 9]
+    assert plan[-1].volume == pytest.approx(14.5 + 9*14.5 + 14.5)
+    assert sum(a.wells for a in plan) == 20
+
+
+def test_max_wells_caps_a_column():
+    plan = plan_multi_dispense(200, 10, 16, max_wells=8)
+    assert [a.wells for a in plan] == [8, 8]
+
+
+def test_no_condition_or_reserve():
+    assert wells_per_aspiration(200, 20, condition_vol=0, reserve=0) == 10
+    plan = plan_multi_dispense(200, 20, 10, condition_vol=0, reserve=0)
+    assert plan == [Aspiration(200, 10, 0, 0)]
+
+
+def test_volume_never_exceeds_the_tip():
+    for per_well in (3, 7.5, 14.5, 20, 45, 60):
+        assert all(a.volume <= 200 + 1e-9 for a in plan_multi_dispense(200, per_well, 96))
+
+
+def test_below_accuracy_limit():
+    with pytest.raises(ValueError, match='accuracy'):
+        plan_multi_dispense(200, 10, 8, min_dispense=14.5)
+
+
+def test_does_not_fit_the_tip():
+    with pytest.raises(ValueError, match='exceeds'):
+        plan_multi_dispense(200, 90, 8)
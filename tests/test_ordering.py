@@ -0,0 +1,51 @@
+from otlib.ordering import path_length, plan_order, refill_groups, trips_length
+
+# a 96-well plate by column (A1, B1, ... H1, A2, ...) at 9 mm pitch, source off to the left
+PLATE = [(9*col, -9*row) for col in range(12) for row in range(8)]
+SOURCE = (-60, 20)
+
+
+def by_column(wells, n):
+    return [wells[i:i+n] for i in range(0, len(wells), n)]
+
+
+def test_plan_order_is_a_permutation():
+    order = plan_order(PLATE, start=SOURCE, key=lambda p: p)
+    assert sorted(order) == sorted(PLATE)
+
+
+def test_plan_order_not_longer_than_input_order():
+    snake = PLATE[::-1]
+    key = lambda p: p
+    assert path_length(plan_order(snake, SOURCE, key), SOURCE, key) <= path_length(snake, SOURCE, key)
+
+
+def test_plan_order_short_lists():
+    assert plan_order([], start=SOURCE, key=lambda p: p) == []
+    assert plan_order([(1, 1)], start=SOURCE, key=lambda p: p) == [(1, 1)]
+
+
+def test_refill_groups_cover_every_well_once():
+    for per_refill in (1, 5, 8, 11, 96, 200):
+        groups = list(refill_groups(PLATE, SOURCE, per_refill, key=lambda p: p))
+        assert sorted(w for g in groups for w in g) == sorted(PLATE)
+        assert all(0 < len(g) <= per_refill for g in groups)
+        assert len(groups) == -(-len(PLATE)//per_refill)
+
+
+def test_refill_groups_beat_column_order():
+    key = lambda p: p
+    for per_refill in (8, 11, 12):
+        groups = list(refill_groups(PLATE, SOURCE, per_refill, key))
+        assert trips_length(groups, SOURCE, key) < trips_length(by_column(PLATE, per_refill), SOURCE, key)
+
+
+def test_refill_groups_nearest_trip_first():
+    key = lambda p: p
+    groups = list(refill_groups(PLATE, SOURCE, 8, key))
+    lengths = [trips_length([g], SOURCE, key) for g in groups]
+    assert lengths == sorted(lengths)
+
+
+def test_refill_groups_empty():
+    assert list(refill_groups([], SOURCE, 8, key=lambda p: p)) == []
@@ -0,0 +1,69 @@
+from otlib.preflight import check
+
+DECK = {
+    'labware': [{'slot': '8', 'load_name': 'opentrons_96_filtertiprack_200ul', 'wells': 96}],
+    'pipettes': {'left': {'name': 'p300_single_gen2', 'max_volume': 300, 'tip_racks': ['8'], 'channels': 1}},
+}
+
+
+def cmd(name, volume=None, well=None, height=1, max_volume=1500, depth=0):
+    return {'name': name, 'mount': 'left', 'volume': volume, 'slot': '2', 'labware': 'tubes', 'well': well,
+            'height': height, 'well_depth': 40, 'well_max_volume': max_volume, 'max_volume': 300,
+            'depth': depth}
+
+
+def messages(commands, level=None):
+    return [x.message for x in check(commands, DECK) if level is None or x.level == level]
+
+
+def test_clean_run():
+    assert messages([cmd('pick_up_tip'), cmd('aspirate', 100, 'A1'), cmd('dispense', 100, 'B1'),
+                     cmd('drop_tip')]) == []
+
+
+def test_no_tip():
+    assert messages([cmd('aspirate', 100, 'A1')], 'error') == ['aspirate without a tip at A1 of tubes on 2']
+
+
+def test_over_tip_capacity_uses_the_rack_size():
+    found = messages([cmd('pick_up_tip'), cmd('aspirate', 150, 'A1'), cmd('aspirate', 100, 'A1')], 'error')
+    assert found == ['250.0 ul in a 200 ul tip']
+
+
+def test_dispensing_more_than_in_the_tip():
+    found = messages([cmd('pick_up_tip'), cmd('aspirate', 50, 'A1'), cmd('dispense', 60, 'B1')], 'error')
+    assert found == ['dispensing 60.0 ul with 50.0 ul in the tip']
+
+
+def test_heights_outside_the_well():
+    found = messages([cmd('pick_up_tip'), cmd('aspirate', 10, 'A1', height=45), cmd('dispense', 10, 'B1', height=-1)],
+                     'error')
+    assert found == ['aspirating 5 mm above the top of A1 of tubes on 2',
+                     'height -1 mm is below the bottom of B1 of tubes on 2']
+
+
+def test_overfilled_well():
+    commands = [cmd('pick_up_tip')]
+    for _ in range(8):
+        commands += [cmd('aspirate', 200, 'A1', max_volume=15000), cmd('dispense', 200, 'B1')]
+    assert messages(commands, 'error') == ['B1 of tubes on 2 overfilled: 1600 ul in a 1500 ul well']
+
+
+def test_aspirating_above_the_surface_of_a_robot_filled_tube():
+    commands = [cmd('pick_up_tip'), cmd('aspirate', 200, 'A1', max_volume=15000), cmd('dispense', 200, 'B1'),
+                cmd('aspirate', 100, 'B1', height=30)]
+    found = messages(commands, 'warning')
+    assert len(found) == 1 and found[0].startswith('aspirating at 30 mm, surface of 200 ul')
+
+
+def test_mix_parents_are_skipped():
+    # the mix record carries the volume too; counting it would double the tip contents
+    commands = [cmd('pick_up_tip'), cmd('mix', 150, 'A1'), cmd('aspirate', 150, 'A1', depth=1),
+                cmd('dispense', 150, 'A1', depth=1), cmd('aspirate', 150, 'A1', depth=1),
+                cmd('dispense', 150, 'A1', depth=1), cmd('drop_tip')]
+    assert messages(commands) == []
+
+
+def test_out_of_tips():
+    commands = [c for _ in range(97) for c in (cmd('pick_up_tip'), cmd('drop_tip'))]
+    assert messages(commands, 'error') == ['p300_single_gen2 uses 97 tips, 96 loaded']
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+from otlib.temperature import TempSchedule
+
+PLATE = SimpleNamespace(name='plate')
+RACK = SimpleNamespace(name='rack')
+
+
+def well(parent, name='A1'):
+    return SimpleNamespace(well_name=name, parent=parent)
+
+
+class Module:
+    def __init__(self):
+        self.labware = PLATE
+        self.calls = []
+
+    def start_set_temperature(self, celsius):
+        self.calls.append(('start', celsius))
+
+    def await_temperature(self, celsius):
+        self.calls.append(('await', celsius))
+
+
+class Pipette:
+    def __init__(self, log):
+        self.log = log
+
+    def aspirate(self, volume, location):
+        self.log.append(('aspirate', location.parent.name))
+
+    def dispense(self, volume, location):
+        self.log.append(('dispense', location.parent.name))
+
+
+def guarded():
+    module = Module()
+    chill = TempSchedule(module, 4).start()
+    return module, chill, chill.guard(Pipette(module.calls))
+
+
+def test_start_does_not_block():
+    module, chill, _ = guarded()
+    chill.start()
+    assert module.calls == [('start', 4)]
+    assert not chill.reached
+
+
+def test_guard_waits_once_on_first_block_touch():
+    module, _, p20 = guarded()
+    p20.aspirate(20, well(RACK))
+    p20.dispense(20, well(PLATE))
+    p20.dispense(20, well(PLATE, 'A2'))
+    assert module.calls == [('start', 4), ('aspirate', 'rack'), ('await', 4), ('dispense', 'plate'),
+                            ('dispense', 'plate')]
+
+
+def test_wait_before_waits_with_an_empty_tip():
+    module, _, p20 = guarded()
+    p20.wait_before(well(RACK))
+    assert module.calls == [('start', 4)]
+    p20.wait_before(well(PLATE))
+    p20.aspirate(20, well(RACK))
+    p20.dispense(20, well(PLATE))
+    assert module.calls == [('start', 4), ('await', 4), ('aspirate', 'rack'), ('dispense', 'plate')]
+
+
+def test_wait_starts_the_ramp_if_needed():
+    module = Module()
+    TempSchedule(module, 4).wait()
+    assert module.calls == [('start', 4), ('await', 4)]
@@ -0,0 +1,70 @@
+from otlib.tips import Transfer, check_budget, plan_tips, tip_budget
+
+
+def test_mastermix_into_empty_wells_keeps_one_tip():
+    plan = plan_tips([Transfer('mmix', 'A{0}'.format(i), 15, 'mmix', 'p20') for i in range(1, 33)])
+    assert plan.new_tip == [True] + [False]*31
+    assert plan.risks[:2] == ['first', 'reuse']
+    assert plan.tips == {'p20': 1}
+    assert plan.racks == {'p20': 1}
+
+
+def test_new_source_needs_a_new_tip():
+    plan = plan_tips([Transfer('s1', 'A1', 5, pipette='p20'), Transfer('s2', 'A1', 5, pipette='p20')])
+    assert plan.risks == ['first', 'new_source']
+
+
+def test_tip_that_touched_another_liquid_is_dirty():
+    steps = [
+        Transfer('mmix', 'A1', 15, 'mmix', 'p20'),
+        Transfer('dna', 'A1', 5, 'dna', 'p20'),   # A1 now holds mmix + dna
+        Transfer('dna', 'A2', 5, 'dna', 'p20'),
+    ]
+    assert plan_tips(steps).risks == ['first', 'new_source', 'dirty_tip']
+
+
+def test_dispensing_from_above_keeps_the_tip_clean():
+    steps = [
+        Transfer('mmix', 'A1', 15, 'mmix', 'p20'),
+        Transfer('dna', 'A1', 5, 'dna', 'p20', touches_dest=False),
+        Transfer('dna', 'A2', 5, 'dna', 'p20', touches_dest=False),
+    ]
+    assert plan_tips(steps).risks == ['first', 'new_source', 'reuse']
+
+
+def test_pipettes_are_planned_separately():
+    steps = [Transfer('w', 'A1', 100, pipette='p300'), Transfer('w', 'A2', 5, pipette='p20'),
+             Transfer('w', 'A3', 100, pipette='p300')]
+    plan = plan_tips(steps)
+    assert plan.new_tip == [True, True, False]
+    assert plan.tips == {'p300': 1, 'p20': 1}
+
+
+def test_racks_and_budget():
+    steps = [Transfer('s{0}'.format(i), 'A1', 10, pipette='p20') for i in range(100)]
+    plan = plan_tips(steps)
+    assert plan.tips == {'p20': 100}
+    assert plan.racks == {'p20': 2}
+    assert check_budget(plan, {'p20': 2}) == []
+    assert check_budget(plan, {'p20': 1}) == ['p20 needs 100 tips (2 racks) but has 1 rack(s)']
+    assert plan_tips(steps, channels={'p20': 8}).racks == {'p20': 9}
+
+
+def _cmd(name, well=None, mount='left', height=1, depth=40):
+    return {'name': name, 'mount': mount, 'slot': '1', 'labware': 'rack', 'well': well,
+            'height': height, 'well_depth': depth}
+
+
+def test_tip_budget_from_commands():
+    commands = []
+    for dest in ('A1', 'A2', 'A3'):  # three tips, same source, clean destinations
+        commands += [_cmd('pick_up_tip'), _cmd('aspirate', 'D1'), _cmd('dispense', dest), _cmd('drop_tip')]
+    deck = {
+        'labware': [{'slot': '8', 'wells': 96}],
+        'pipettes': {'left': {'name': 'p300_single_gen2', 'tip_racks': ['8'], 'channels': 1}},
+    }
+    report = tip_budget(commands, deck)['left']
+    assert report['tips'] == 3
+    assert report['available'] == 96
+    assert report['racks_needed'] == 1
+    assert report['avoidable'] == 2
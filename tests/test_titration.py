@@ -0,0 +1,84 @@
+import itertools
+
+import pytest
+
+from otlib.titration import Titration, full_factorial, latin_square, main
+
+
+def test_full_factorial():
+    runs = full_factorial([300, 400], [300, 400, 500], [50, 100])
+    assert len(runs) == 12
+    assert len(set(runs)) == 12
+
+
+def test_latin_square_pairs_meet_once():
+    levels = [100, 200, 300, 400]
+    runs = latin_square(levels, levels, levels)
+    assert len(runs) == 16
+    for a, b in itertools.combinations('FRP', 2):
+        assert len({(getattr(r, a), getattr(r, b)) for r in runs}) == 16
+
+
+def test_latin_square_needs_equal_levels():
+    with pytest.raises(ValueError, match='same number'):
+        latin_square([1, 2], [1, 2], [1, 2, 3])
+
+
+def test_top_level_is_drawn_from_the_stock():
+    t = Titration(full_factorial([300, 400, 500], [300, 400, 500], [50, 100, 200]))
+    assert t.vol_per_rxn['F'] == pytest.approx(1.0)  # 500 nM from 10 uM in 20 ul
+    assert t.source('F', 500) == 'F_stock'
+    assert t.source('F', 300) == 'F_300'
+    assert t.int_conc('F', 300) == pytest.approx(6.0)
+
+
+def test_intermediate_tubes_hold_their_concentration():
+    t = Titration(full_factorial([300, 400, 500], [300, 400, 500], [50, 100, 200]))
+    for name, (contents, total) in t.tubes().items():
+        if name.startswith('mix_'):
+            continue
+        factor, conc = name.split('_')
+        stock = dict(contents)['{0}_stock'.format(factor)]
+        assert stock/total*t.stocks[factor] == pytest.approx(t.int_conc(factor, float(conc)))
+        assert total >= t.min_int_vol
+
+
+def test_every_well_ends_with_one_reaction():
+    t = Titration(full_factorial([300, 500], [300, 500], [100, 200]), reps=3)
+    net = {}
+    for s in t.transfers():
+        if isinstance(s.dest, tuple):
+            net[s.dest] = net.get(s.dest, 0)+s.volume
+        if isinstance(s.source, tuple):
+            net[s.source] = net.get(s.source, 0)-s.volume
+    assert len(net) == 8*3
+    assert all(v == pytest.approx(t.tot_rxn_vol) for v in net.values())
+
+
+def test_layout_keeps_cells_on_one_row_and_spills_to_a_second_plate():
+    t = Titration(full_factorial([100, 200, 300, 400, 500], [100, 200, 300, 400, 500], [50, 100, 200]), reps=5)
+    wells = t.layout()
+    assert len(wells) == 75*5
+    rows = {}
+    for (plate, well), (i, _) in wells.items():
+        rows.setdefault(i, set()).add((plate, well[0]))
+    assert all(len(r) == 1 for r in rows.values())
+    assert t.plates() == 5  # 2 cells of 5 per 12-column row, 16 per plate: 75 cells
+
+
+def test_too_much_primer():
+    with pytest.raises(ValueError, match='more than the reaction holds'):
+        Titration(full_factorial([2000], [2000], [2000]))
+
+
+def test_cli_reports_errors_as_usage(capsys):
+    with pytest.raises(SystemExit) as exit:
+        main(['-F', '2000', '-R', '2000', '-P', '2000'])
+    assert exit.value.code == 2
+    assert 'more than the reaction holds' in capsys.readouterr().err
+
+
+def test_cli_prints_the_prep_sheet(capsys):
+    assert main(['-F', '300', '500', '-R', '300', '500', '-P', '100', '200']) == 0
+    out = capsys.readouterr().out
+    assert out.startswith('8 runs x 2 reps on 1 plate(s)')
@@ -0,0 +1,84 @@
+import pytest
+
+from otlib.liquids import LiquidPipette
+from otlib.touchtip import TouchTipPolicy
+
+
+class Pipette:
+    """Strict stand-in for an InstrumentContext: no liquid= keyword."""
+
+    def __init__(self):
+        self.current_volume = 0
+        self.touches = 0
+        self.calls = []
+
+    def aspirate(self, volume=None, location=None, rate=1.0):
+        self.current_volume += volume
+        self.calls.append(('aspirate', volume, rate))
+
+    def dispense(self, volume=None, location=None, rate=1.0):
+        self.current_volume -= volume
+        self.calls.append(('dispense', volume, rate))
+
+    def blow_out(self, location=None):
+        self.current_volume = 0
+
+    def touch_tip(self, *args, **kwargs):
+        self.touches += 1
+
+
+def multi_dispense(p, wells=4, per_well=20):
+    p.aspirate(per_well*wells, 'src')
+    p.touch_tip()
+    for _ in range(wells):
+        p.dispense(per_well, 'dest')
+        p.touch_tip()
+
+
+@pytest.mark.parametrize('mode, touches', [
+    ('always', 5),
+    ('never', 0),
+    ('per_aspiration', 1),
+    ('last_dispense', 2),  # at the source and after the dispense that empties the tip
+])
+def test_modes(mode, touches):
+    raw = Pipette()
+    policy = TouchTipPolicy(mode)
+    multi_dispense(policy.guard(raw))
+    assert raw.touches == touches
+    assert (policy.kept, policy.skipped) == (touches, 5-touches)
+
+
+def test_max_volume_skips_touches_after_big_dispenses():
+    raw = Pipette()
+    p = TouchTipPolicy('last_dispense', max_volume=50).guard(raw)
+    p.aspirate(100, 'src')
+    p.dispense(100, 'dest')
+    p.touch_tip()
+    assert raw.touches == 0
+
+
+def test_viscous_mode_reads_liquid_without_passing_it_on():
+    raw = Pipette()
+    p = TouchTipPolicy('viscous').guard(raw)
+    p.aspirate(20, 'src', liquid='beads')
+    p.touch_tip()
+    p.dispense(20, 'dest', liquid='beads')
+    p.aspirate(20, 'src', liquid='water')
+    p.touch_tip()
+    assert raw.touches == 1
+    assert [c[0] for c in raw.calls] == ['aspirate', 'dispense', 'aspirate']
+
+
+def test_liquid_reaches_a_liquid_pipette():
+    raw = Pipette()
+    p = TouchTipPolicy('never').guard(LiquidPipette(raw, protocol=None))
+    p.aspirate(20, 'src', liquid='water')
+    assert raw.calls == [('aspirate', 20, 1.0)]
+    p.aspirate(20, 'src')
+    assert raw.calls[-1] == ('aspirate', 20, 1.0)
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError, match='known: always'):
+        TouchTipPolicy('sometimes')
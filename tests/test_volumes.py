@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+from otlib.volumes import capacity, n_parts, plan_transfer, split_asp
+
+
+def pipette(max_volume, min_volume, tip_volume=None):
+    racks = []
+    if tip_volume is not None:
+        rack = SimpleNamespace(wells=lambda: [SimpleNamespace(max_volume=tip_volume)])
+        racks = [rack]
+    return SimpleNamespace(max_volume=max_volume, min_volume=min_volume, tip_racks=racks)
+
+
+def test_split_asp_fewest_equal_parts():
+    assert split_asp(150, 200) == [150]
+    assert split_asp(200, 200) == [200]
+    assert split_asp(201, 200) == [100.5, 100.5]
+    assert split_asp(900, 200) == [180]*5
+    assert split_asp(0, 200) == [0]
+
+
+def test_n_parts_tolerates_float_noise():
+    assert n_parts(0.1*3*200/0.3, 200) == 1
+
+
+def test_capacity_limited_by_tips():
+    assert capacity(pipette(300, 20, tip_volume=200)) == 200
+    assert capacity(pipette(300, 20)) == 300
+
+
+def test_plan_transfer_prefers_fewer_aspirations():
+    p20, p300 = pipette(20, 1, 20), pipette(300, 20, 200)
+    plan = plan_transfer(139.1, p20, p300)
+    assert plan.pipette is p300
+    assert (plan.n, plan.part) == (1, 139.1)
+
+
+def test_plan_transfer_tie_goes_to_the_smaller_pipette():
+    p20, p300 = pipette(20, 1, 20), pipette(300, 20, 200)
+    assert plan_transfer(15, p300, p20).pipette is p20
+
+
+def test_plan_transfer_respects_min_volume():
+    p300 = pipette(300, 20, 200)
+    assert plan_transfer(210, p300).parts == [105, 105]
+    with pytest.raises(ValueError, match='no pipette'):
+        plan_transfer(10, p300)
+
+
+def test_cumulative():
+    plan = plan_transfer(500, pipette(300, 20, 200))
+    assert plan.cumulative() == pytest.approx([500/3, 1000/3, 500])